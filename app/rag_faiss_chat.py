@@ -13,11 +13,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains import create_retrieval_chain
 from langchain.docstore.document import Document
+from utils.rag_index_store import current_index_dir
+from utils.rag_doc_store import load_faiss
+from utils.rag_index_factory import metric_of, score_threshold, similarity
+from utils.rag_bm25 import Bm25Index
+from utils.rag_date_filter import DateIndex
+from utils.rag_article_list import ArticleList, parse_listing
+from utils.rag_hybrid import HybridRetriever
+from utils.rag_context_pack import pack_context
 
 # 1) Keys / models
 api_key = os.getenv("OPENAI_API_KEY")
@@ -29,12 +36,19 @@ llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, api_key=api_key)
 
 # 2) Load FAISS
 INDEX_PATH = BASE_DIR / "mkhuda_faiss_index"
-vectorstore = FAISS.load_local(
-    str(INDEX_PATH),
-    embeddings,
-    allow_dangerous_deserialization=True
+vectorstore = load_faiss(current_index_dir(INDEX_PATH) or INDEX_PATH, embeddings)
+# chunk (vektor + BM25, digabung RRF), lalu digabung per artikel;
+# chunk vektor di bawah RETRIEVER_MIN_SCORE (kosinus) tidak masuk prompt;
+# pertanyaan berbatas waktu ("artikel bulan lalu") hanya mencari di rentang tanggalnya
+retriever = HybridRetriever(
+    vectorstore=vectorstore,
+    bm25=Bm25Index.open(current_index_dir(INDEX_PATH) or INDEX_PATH),
+    dates=DateIndex.open(current_index_dir(INDEX_PATH) or INDEX_PATH),
+    k=12,
+    score_threshold=score_threshold(vectorstore.index),
 )
-retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 4})
+# "artikel terbaru/terlama" dijawab langsung dari daftar artikel terurut tanggal
+articles = ArticleList.open(current_index_dir(INDEX_PATH) or INDEX_PATH)
 
 def debug_faiss_retriever(query):
     results = vectorstore.similarity_search_with_score(query, k=3)
@@ -43,10 +57,9 @@ def debug_faiss_retriever(query):
         meta = doc.metadata
         title = meta.get("title", "(tanpa judul)")
         url = meta.get("url", "-")
-        score_display = f"{score:.4f}"  # FAISS pakai L2 distance
-        # Biasanya FAISS pakai L2 distance (semakin kecil semakin mirip)
+        # skor mentah: inner product (index IP) atau jarak L2² (index lama); keduanya → kosinus
         print(f"{rank:02d}. {title}")
-        print(f"    Jarak : {score:.4f}")  # bukan similarity, tapi distance
+        print(f"    Skor  : {similarity(vectorstore.index, score):.4f} (kosinus, {metric_of(vectorstore.index)} {score:.4f})")
         print(f"    URL   : {url}\n")
     print("-" * 40)
 
@@ -102,8 +115,15 @@ while True:
         print("👋 Keluar.")
         break
 
+    # 0️⃣ daftar artikel terbaru/terlama: tanpa retrieval & tanpa LLM
+    listing = parse_listing(q) if articles is not None else None
+    if listing is not None:
+        print("\n🤖 Jawaban:\n", articles.render(listing), "\n")
+        continue
+
     # 1️⃣ ambil hasil dari retriever (versi baru)
-    docs = retriever.invoke(q)
+    # kalimat terbaik 4 artikel teratas dalam CONTEXT_TOKEN_BUDGET token
+    docs, _ = pack_context(retriever.invoke(q), q, max_articles=4, model=llm.model_name)
 
     ## debugging only: tampilkan hasil retrieval
     # debug_faiss_retriever(q)  
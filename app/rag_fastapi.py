@@ -3,10 +3,31 @@ RAG FastAPI mkhuda.com
 ----------------------
 - Self-healing: builds FAISS index on first run if missing.
 - Auto-updating: schedules a background job to rebuild the index every 2 days.
+- Non-blocking: the /ask path uses async clients end to end (AsyncOpenAI, ainvoke),
+  so one slow OpenAI round-trip does not stall other requests on the same worker.
+- Speculative retrieval: the query embedding + FAISS search start alongside intent
+  pre-reasoning and are dropped if the question turns out to be out of scope.
+- Local intent routing: a zero-network classifier decides rag_search/out_of_scope from
+  the query embedding; only low-confidence questions fall back to the LLM router.
+- Query-embedding cache: normalized query → vector, in-process LRU plus an optional
+  SQLite tier shared by all gunicorn workers (see /stats for hit/miss counters).
+- Semantic answer cache: near-duplicate questions reuse a stored reply as long as the
+  FAISS index version is unchanged; a rebuild invalidates it automatically.
+- Shared memory: index.faiss and the docstore are memory-mapped read-only (INDEX_MMAP),
+  so gunicorn workers share one copy of the index through the OS page cache.
+- Chunk retrieval: the index holds article chunks; hits are collapsed back to articles
+  and only their best-matching passages go into the prompt.
+- Hot-swap: a watcher follows the versioned index's CURRENT pointer, loads new versions
+  in the background and swaps them in without dropping in-flight requests.
+- Streaming: /ask/stream forwards gpt-4o-mini tokens as NDJSON as they arrive and logs
+  time-to-first-byte, which is the latency metric the widget cares about.
 """
 import os
 import sys
 import re
+import asyncio
+import json
+import time
 import threading
 import datetime
 from pathlib import Path
@@ -17,6 +38,7 @@ import logging
 logger = logging.getLogger("uvicorn")
 
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -31,8 +53,19 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
-from utils.rag_pre_reasoning import pre_reasoning
-from utils.rag_prompts import mkhuda_system_prompt
+from utils.rag_pre_reasoning import apre_reasoning
+from utils.rag_intent_classifier import LocalIntentClassifier
+from utils.rag_embedding_cache import QueryEmbeddingCache, CachedQueryEmbeddings
+from utils.rag_answer_cache import SemanticAnswerCache
+from utils.rag_index_store import current_version, version_dir, gc_old_versions
+from utils.rag_doc_store import load_faiss
+from utils.rag_index_factory import RETRIEVER_MIN_SCORE, score_threshold
+from utils.rag_bm25 import Bm25Index
+from utils.rag_hybrid import HybridRetriever, fuse, scoped_search
+from utils.rag_date_filter import DateIndex, parse_date_filters
+from utils.rag_article_list import ArticleList, parse_listing
+from utils.rag_context_pack import CONTEXT_TOKEN_BUDGET, pack_context
+from utils.rag_prompts import MKHUDA_HUMAN_PROMPT, mkhuda_system_prompt, today_str
 
 # ---------- SETUP & PATHS ----------
 load_dotenv()
@@ -41,10 +74,42 @@ api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
     raise ValueError("❌ OPENAI_API_KEY tidak ditemukan di .env")
 
-INDEX_PATH = BASE_DIR / "mkhuda_faiss_index"
+# FAISS_INDEX_PATH can point the API at another index (e.g. the load test in utils/bench_ask_load.py)
+INDEX_PATH = Path(os.getenv("FAISS_INDEX_PATH", BASE_DIR / "mkhuda_faiss_index"))
 BUILDER_PATH = BASE_DIR / "builder" / "rag_faiss_builder.py"
 scheduler = BackgroundScheduler()
 
+# How often each worker checks the CURRENT pointer, and how long retired versions are kept
+INDEX_WATCH_INTERVAL = float(os.getenv("INDEX_WATCH_INTERVAL", "30"))
+INDEX_GC_GRACE_SECONDS = float(os.getenv("INDEX_GC_GRACE_SECONDS", "3600"))
+# Memory-map index.faiss + the docstore so all gunicorn workers share one copy via the page cache
+INDEX_MMAP = os.getenv("INDEX_MMAP", "1") != "0"
+
+# Start retrieval concurrently with pre-reasoning (set SPECULATIVE_RETRIEVAL=0 to run them serially)
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "1") == "1"
+
+# Intent routing: "local" (embedding classifier, LLM only when unsure) or "llm" (always gpt-4o-mini)
+INTENT_ROUTER = os.getenv("INTENT_ROUTER", "local").lower()
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.04"))
+INTENT_LLM_FALLBACK = os.getenv("INTENT_LLM_FALLBACK", "1") == "1"
+
+# Query-embedding cache; EMBED_CACHE_PATH="" disables the shared (cross-worker) tier
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", str(BASE_DIR / "mkhuda_query_cache.sqlite"))
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "2048"))
+EMBED_CACHE_MAX_MB = float(os.getenv("EMBED_CACHE_MAX_MB", "32"))
+EMBED_CACHE_TTL = float(os.getenv("EMBED_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Semantic answer cache (ANSWER_CACHE=0 disables it); distance is cosine distance (1 - similarity)
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "1") == "1"
+ANSWER_CACHE_MAX_DISTANCE = float(os.getenv("ANSWER_CACHE_MAX_DISTANCE", "0.05"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(24 * 3600)))
+answer_cache = SemanticAnswerCache(
+    max_distance=ANSWER_CACHE_MAX_DISTANCE,
+    max_entries=ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=ANSWER_CACHE_TTL,
+) if ANSWER_CACHE else None
+
 # ---------- FAISS INDEX & SCHEDULER LOGIC ----------
 def build_faiss_index():
     """Builds or rebuilds the FAISS index by running the builder script."""
@@ -53,6 +118,10 @@ def build_faiss_index():
         # Use sys.executable to ensure we're using the python from the correct venv
         subprocess.run([sys.executable, str(BUILDER_PATH)], check=True, capture_output=True, text=True)
         print("✅ FAISS index built successfully.")
+        if answer_cache is not None:
+            answer_cache.invalidate()
+            print("🧹 Semantic answer cache invalidated.")
+        swap_index_if_changed()
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to build FAISS index. Error: {e.stderr}")
     except Exception as e:
@@ -60,11 +129,21 @@ def build_faiss_index():
 
 def ensure_faiss_index():
     """Ensures FAISS index is available, building it automatically if not."""
-    if not INDEX_PATH.exists() or not any(INDEX_PATH.iterdir()):
+    if current_version(INDEX_PATH) is None:
         print("⚙️ FAISS index not found — building automatically (this may take a moment)...")
         build_faiss_index() # This is a blocking call for the very first startup
     else:
         print("🧠 FAISS index found — ready to use.")
+    swap_index_if_changed()
+
+async def watch_index():
+    """Polls the CURRENT pointer and hot-swaps new index versions in the background."""
+    while True:
+        await asyncio.sleep(INDEX_WATCH_INTERVAL)
+        try:
+            await asyncio.to_thread(swap_index_if_changed)
+        except Exception as e:
+            logger.error(f"❌ Failed to hot-swap FAISS index: {type(e).__name__}: {e}")
 
 def scheduled_rebuild_job():
     """Wrapper function for the scheduler to run the build process."""
@@ -85,11 +164,15 @@ async def lifespan(app: FastAPI):
     # 3. Start the background scheduler.
     scheduler.start()
     print(f"✅ Scheduler started. Next FAISS rebuild is scheduled in 2 days.")
+
+    # 4. Follow new index versions published by any builder run.
+    watcher = asyncio.create_task(watch_index())
     
     try:
         yield
     finally:
-        # 4. On shutdown, cleanly stop the scheduler.
+        # 5. On shutdown, cleanly stop the watcher and the scheduler.
+        watcher.cancel()
         print("🛑 Shutting down scheduler...")
         scheduler.shutdown()
 
@@ -124,33 +207,110 @@ app.add_event_handler("startup", lambda: print("✅ FastAPI app is up and runnin
 
 # ---------- MODEL & RETRIEVER ----------
 # This part remains the same
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, api_key=api_key)
-
-vectorstore = FAISS.load_local(str(INDEX_PATH), embeddings, allow_dangerous_deserialization=True)
-retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 2})
+query_cache = QueryEmbeddingCache(
+    max_entries=EMBED_CACHE_MAX_ENTRIES,
+    max_bytes=int(EMBED_CACHE_MAX_MB * 1024 * 1024),
+    ttl_seconds=EMBED_CACHE_TTL,
+    shared_path=EMBED_CACHE_PATH or None,
+)
+embeddings = CachedQueryEmbeddings(
+    OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key), query_cache
+)
+# stream_usage keeps token accounting working for /ask/stream
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, api_key=api_key, stream_usage=True)
+
+# The index stores chunks: fetch RETRIEVER_CHUNK_K of them, then keep the best RETRIEVER_K
+# articles with their best sentences, CONTEXT_TOKEN_BUDGET tokens in total (utils/rag_context_pack.py)
+RETRIEVER_K = int(os.getenv("RETRIEVER_K", "2"))
+RETRIEVER_CHUNK_K = int(os.getenv("RETRIEVER_CHUNK_K", "8"))
+# Chunks below RETRIEVER_MIN_SCORE cosine similarity (env, default 0.25) never reach the
+# prompt; score_threshold translates it to the index's raw IP/L2 score. -1 disables it.
+
+class IndexState:
+    """Everything derived from one FAISS index version; replaced as a whole on hot-swap."""
+
+    def __init__(self, version: str, vectorstore: FAISS, intent_classifier: LocalIntentClassifier | None):
+        self.version = version
+        self.vectorstore = vectorstore
+        # query embeddings shortened to this version's index dimensions (EMBED_DIMENSIONS)
+        self.embeddings = vectorstore.embedding_function
+        self.score_threshold = score_threshold(vectorstore.index, RETRIEVER_MIN_SCORE)
+        # keyword index written next to index.faiss; None for versions built before BM25
+        self.bm25 = Bm25Index.open(version_dir(INDEX_PATH, version))
+        # post dates sorted → FAISS rows, for date-scoped questions; None for older versions
+        self.dates = DateIndex.open(version_dir(INDEX_PATH, version))
+        # date-sorted article list for "artikel terbaru/terlama" answered without OpenAI
+        self.articles = ArticleList.open(version_dir(INDEX_PATH, version))
+        self.retriever = HybridRetriever(
+            vectorstore=vectorstore, bm25=self.bm25, dates=self.dates,
+            k=RETRIEVER_CHUNK_K, score_threshold=self.score_threshold,
+        )
+        self.intent_classifier = intent_classifier
+
+index_state: IndexState | None = None
+index_swap_lock = threading.Lock()
+
+def load_index_state(version: str, previous: IndexState | None = None) -> IndexState:
+    vs = load_faiss(version_dir(INDEX_PATH, version), embeddings, mmap=INDEX_MMAP)
+    classifier = None
+    if INTENT_ROUTER == "local":
+        same_dims = previous is not None and previous.vectorstore.index.d == vs.index.d
+        if same_dims and previous.intent_classifier is not None:
+            classifier = previous.intent_classifier.with_vectorstore(vs)
+        else:
+            classifier = LocalIntentClassifier.from_vectorstore(
+                vs, vs.embedding_function, threshold=INTENT_CONFIDENCE_THRESHOLD
+            )
+    return IndexState(version, vs, classifier)
+
+def swap_index_if_changed() -> bool:
+    """
+    Loads the version CURRENT points at (if it differs from the served one) and swaps
+    the global reference. In-flight requests keep using the IndexState they started with.
+    """
+    global index_state
+    with index_swap_lock:
+        version = current_version(INDEX_PATH)
+        if version is None or (index_state is not None and index_state.version == version):
+            return False
+        new_state = load_index_state(version, previous=index_state)
+        old_version = index_state.version if index_state else None
+        index_state = new_state
+    logger.info(f"🔁 FAISS index version {old_version} → {version} ({new_state.vectorstore.index.ntotal} vectors)")
+    removed = gc_old_versions(INDEX_PATH, grace_seconds=INDEX_GC_GRACE_SECONDS)
+    if removed:
+        logger.info(f"🧹 Removed old index versions: {', '.join(removed)}")
+    return True
+
+# Load at import when an index already exists; otherwise lifespan builds one first
+swap_index_if_changed()
+if INTENT_ROUTER == "local":
+    logger.info(f"🧭 Local intent router active (threshold {INTENT_CONFIDENCE_THRESHOLD}, LLM fallback: {INTENT_LLM_FALLBACK})")
 
 # ---------- PROMPT ----------
-# This part remains the same
-today = datetime.datetime.now().strftime("%Y-%m-%d")
-system_prompt = mkhuda_system_prompt(today)
+# The system prompt is byte-identical across requests and days, so OpenAI's automatic
+# prompt caching reuses it; today's date, the context and the question follow it
+system_prompt = mkhuda_system_prompt()
 
 prompt = ChatPromptTemplate.from_messages([
     ("system", system_prompt),
-    ("human", "Pertanyaan: {input}\n\nKonteks:\n{context}")
+    ("human", MKHUDA_HUMAN_PROMPT)
 ])
 
+# Cumulative prompt-cache accounting for the answer LLM (see /stats)
+prompt_cache_stats = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
 combine_docs_chain = create_stuff_documents_chain(
     llm=llm, prompt=prompt, document_variable_name="context"
 )
 
 # ---------- HELPER ----------
 # This part remains the same
-def format_docs_with_meta(docs, max_chars=1000):
+def format_docs_with_meta(docs):
     parts = []
     for d in docs:
         m = d.metadata
-        text = d.page_content.strip()[:max_chars]
+        text = d.page_content.strip()  # already packed to the token budget
         date = m.get("date", "(tanpa tanggal)")[:10]
         parts.append(
             f"Judul: {m.get('title','(tanpa judul)')}\n"
@@ -160,6 +320,14 @@ def format_docs_with_meta(docs, max_chars=1000):
         )
     return "\n---\n".join(parts)
 
+def cancel_speculative(task: asyncio.Task | None):
+    """Cancels a speculative retrieval whose result is no longer needed."""
+    if task is None or task.done():
+        return
+    task.cancel()
+    # swallow the CancelledError/exception so asyncio doesn't warn about it
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
 # get IP address and user agent from request
 def get_request_info(request: Request):
     ip = request.client.host
@@ -174,36 +342,206 @@ async def root():
         "message": "🤖 mkhuda.com RAG API aktif",
         "status": "ok",
         "faiss_rebuild_scheduler": "active",
-        "next_scheduled_rebuild": next_run
+        "next_scheduled_rebuild": next_run,
+        "index_version": index_state.version if index_state else None,
     }
 
-@app.post("/ask")
-async def ask(request: Request):
-    # This part remains the same
-    ip, user_agent = get_request_info(request)
-    data = await request.json()
-    message = data.get("message", "").strip()
-    if not message:
-        return {"reply": "Tolong masukkan pertanyaan."}
-    
-    intent, usage_metadata = pre_reasoning(message)
-    logger.info(f"🧠 [PRE-REASONING] Tokens used: {usage_metadata.total_tokens}")
+@app.get("/stats")
+async def stats():
+    return {
+        "query_embedding_cache": query_cache.stats(),
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "prompt_cache": {**prompt_cache_stats, "hit_rate": round(prompt_cache_hit_rate(), 4)},
+    }
+
+async def prepare_rag(message: str, ip: str, user_agent: str):
+    """
+    Shared front half of /ask and /ask/stream: answer cache, intent routing, retrieval.
+    Returns (reply, None) when the request is answered without generation,
+    otherwise (None, state) with everything the generation step needs.
+    """
+    idx = index_state  # pin one index version for the whole request
+    # recency/listing questions ("artikel terbaru", "artikel bulan Juli 2024") are not a
+    # similarity signal: answer them straight from the date-sorted article list, no OpenAI call
+    listing = parse_listing(message) if idx.articles is not None else None
+    if listing is not None:
+        logger.info(f"📰 [ARTICLE LIST] {listing} answered without OpenAI | from {ip} - {user_agent}")
+        return idx.articles.render(listing), None
+
+    intent_classifier = idx.intent_classifier
+    intent, query_vector, pre_tokens = None, None, 0
+    if intent_classifier is not None or answer_cache is not None:
+        # the query embedding is reused for retrieval, so routing/caching costs no extra call
+        query_vector = await idx.embeddings.aembed_query(message)
+
+    index_version = idx.version
+    # resolved once per request: scopes the answer cache and restricts retrieval below
+    filters = parse_date_filters(message)
+    cache_scope = SemanticAnswerCache.scope_of(filters)
+    if answer_cache is not None:
+        # "artikel Juli 2024" and "artikel Juni 2024" embed almost identically; the resolved
+        # date range keeps them (and "bulan lalu" across a month boundary) from sharing answers
+        cached = answer_cache.lookup(query_vector, index_version, cache_scope)
+        if cached is not None:
+            logger.info(
+                f"🧾 [ANSWER CACHE] hit (distance {cached.distance:.4f}) | Tokens saved: {cached.tokens} "
+                f"| hit rate: {answer_cache.hit_rate:.1%} | total saved: {answer_cache.tokens_saved} | from {ip} - {user_agent}"
+            )
+            return cached.reply, None
+
+    if intent_classifier is not None:
+        intent, confidence = intent_classifier.classify(query_vector)
+        logger.info(f"🧭 [LOCAL ROUTER] {intent['intent']} (confidence {confidence:.3f})")
+        if not intent_classifier.is_confident(confidence) and INTENT_LLM_FALLBACK:
+            intent = None
+
+    async def start_retrieval():
+        if query_vector is None:
+            return await idx.retriever.ainvoke(message)
+        # "artikel bulan lalu" → search only rows inside that date range (IDSelector, not post-filtering)
+        if filters and idx.dates is not None:
+            rows = idx.dates.rows_for(filters)
+            logger.info(f"📅 [RETRIEVER] Date filter {filters['date']} → {len(rows)} candidate chunks")
+            return scoped_search(idx.vectorstore, idx.bm25, message, query_vector, rows, RETRIEVER_CHUNK_K)
+        vector_chunks = await idx.vectorstore.asimilarity_search_by_vector(
+            query_vector, k=RETRIEVER_CHUNK_K, score_threshold=idx.score_threshold
+        )
+        # BM25 catches exact product names the embedding blurs; fused by reciprocal rank
+        return fuse(idx.vectorstore, idx.bm25, message, vector_chunks, RETRIEVER_CHUNK_K)
+
+    retrieval_task = None
+    if intent is None:
+        retrieval_task = asyncio.create_task(start_retrieval()) if SPECULATIVE_RETRIEVAL else None
+        try:
+            intent, usage_metadata = await apre_reasoning(message)
+        except BaseException:
+            cancel_speculative(retrieval_task)
+            raise
+        pre_tokens = usage_metadata.total_tokens
+        logger.info(f"🧠 [PRE-REASONING] Tokens used: {pre_tokens}")
 
     if intent["intent"] == "out_of_scope":
-        return {"reply": intent.get("message", "Pertanyaan di luar cakupan mkhuda.com.")}
+        cancel_speculative(retrieval_task)
+        return intent.get("message", "Pertanyaan di luar cakupan mkhuda.com."), None
     
-    docs = retriever.invoke(message)
+    chunks = await (retrieval_task or start_retrieval())
+    if not chunks:
+        logger.info(f"🔎 [RETRIEVER] No chunk above min score {RETRIEVER_MIN_SCORE} and no keyword hit")
+    docs, pack = pack_context(chunks, message, CONTEXT_TOKEN_BUDGET, max_articles=RETRIEVER_K, model=llm.model_name)
     context_text = format_docs_with_meta(docs)
+    logger.info(
+        f"📦 [CONTEXT] {pack.tokens}/{CONTEXT_TOKEN_BUDGET} passage tokens, {pack.sentences} sentences "
+        f"from {len(docs)} articles ({pack.duplicates} duplicate, {pack.dropped} over budget)"
+    )
     context_doc = [Document(page_content=context_text)]
-    
-    with get_openai_callback() as cb:
-        answer = combine_docs_chain.invoke({"context": context_doc, "input": message})
+    return None, {
+        "chain_input": {"context": context_doc, "input": message, "today": today_str()},
+        "query_vector": query_vector,
+        "index_version": index_version,
+        "pre_tokens": pre_tokens,
+        "cache_scope": cache_scope,
+    }
 
-    logger.info(f"🧾 [RAG ANSWER] Tokens used: {cb.total_tokens}")
-    logger.info(f"🧾 [ALL] Tokens used: {cb.total_tokens + usage_metadata.total_tokens} | from {ip} - {user_agent}")
+def prompt_cache_hit_rate() -> float:
+    """Share of answer-LLM prompt tokens served from OpenAI's prompt cache since start."""
+    total = prompt_cache_stats["prompt_tokens"]
+    return prompt_cache_stats["cached_tokens"] / total if total else 0.0
+
+def finish_rag(state: dict, answer: str, cb, ip: str, user_agent: str) -> str:
+    """Shared back half: token logging and answer-cache bookkeeping."""
+    pre_tokens = state["pre_tokens"]
+    logger.info(
+        f"🧾 [RAG ANSWER] Tokens used: {cb.total_tokens} (prompt {cb.prompt_tokens}, completion {cb.completion_tokens})"
+    )
+    # usage.prompt_tokens_details.cached_tokens, surfaced by langchain as input_token_details.cache_read
+    prompt_cache_stats["requests"] += 1
+    prompt_cache_stats["prompt_tokens"] += cb.prompt_tokens
+    prompt_cache_stats["cached_tokens"] += cb.prompt_tokens_cached
+    logger.info(
+        f"🗄️ [PROMPT CACHE] cached tokens: {cb.prompt_tokens_cached}/{cb.prompt_tokens} "
+        f"| cumulative hit rate: {prompt_cache_hit_rate():.1%}"
+    )
+    cache_info = f" | answer cache hit rate: {answer_cache.hit_rate:.1%}" if answer_cache is not None else ""
+    logger.info(f"🧾 [ALL] Tokens used: {cb.total_tokens + pre_tokens}{cache_info} | from {ip} - {user_agent}")
 
     response_text = re.sub(r'\\n', '\n', answer).strip()
-    return {"reply": response_text}
+    if answer_cache is not None:
+        answer_cache.store(state["query_vector"], response_text, cb.total_tokens + pre_tokens, state["index_version"], state["cache_scope"])
+    return response_text
+
+async def read_message(request: Request) -> str:
+    data = await request.json()
+    return data.get("message", "").strip()
+
+@app.post("/ask")
+async def ask(request: Request):
+    ip, user_agent = get_request_info(request)
+    message = await read_message(request)
+    if not message:
+        return {"reply": "Tolong masukkan pertanyaan."}
+
+    reply, state = await prepare_rag(message, ip, user_agent)
+    if reply is not None:
+        return {"reply": reply}
+
+    with get_openai_callback() as cb:
+        answer = await combine_docs_chain.ainvoke(state["chain_input"])
+    return {"reply": finish_rag(state, answer, cb, ip, user_agent)}
+
+def ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+@app.post("/ask/stream")
+async def ask_stream(request: Request):
+    """
+    Streams the answer as NDJSON events while gpt-4o-mini generates it:
+    {"type": "token", "data": "..."} ... {"type": "done"} (or {"type": "error"}).
+    """
+    ip, user_agent = get_request_info(request)
+    message = await read_message(request)
+    t_start = time.perf_counter()
+
+    async def events():
+        if not message:
+            yield ndjson({"type": "token", "data": "Tolong masukkan pertanyaan."})
+            yield ndjson({"type": "done"})
+            return
+        try:
+            reply, state = await prepare_rag(message, ip, user_agent)
+            if reply is not None:
+                logger.info(f"⏱️ [STREAM] TTFB {(time.perf_counter() - t_start) * 1000:.0f} ms (no generation)")
+                yield ndjson({"type": "token", "data": reply})
+                yield ndjson({"type": "done"})
+                return
+
+            parts, carry, ttfb = [], "", None
+            with get_openai_callback() as cb:
+                async for chunk in combine_docs_chain.astream(state["chain_input"]):
+                    parts.append(chunk)
+                    # keep a trailing backslash so an escaped "\n" split across chunks is still unescaped
+                    text = carry + chunk
+                    carry = "\\" if text.endswith("\\") else ""
+                    text = re.sub(r'\\n', '\n', text[: len(text) - len(carry)])
+                    if not text:
+                        continue
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - t_start
+                        logger.info(f"⏱️ [STREAM] TTFB {ttfb * 1000:.0f} ms")
+                    yield ndjson({"type": "token", "data": text})
+            if carry:
+                yield ndjson({"type": "token", "data": carry})
+            finish_rag(state, "".join(parts), cb, ip, user_agent)
+            logger.info(f"⏱️ [STREAM] total {(time.perf_counter() - t_start) * 1000:.0f} ms")
+            yield ndjson({"type": "done"})
+        except Exception as e:
+            logger.error(f"❌ [STREAM] {type(e).__name__}: {e}")
+            yield ndjson({"type": "error", "data": "Terjadi kesalahan saat memproses jawaban."})
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.post("/rebuild")
 def manual_rebuild():
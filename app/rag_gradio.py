@@ -12,15 +12,19 @@ load_dotenv()
 import os
 import gradio as gr
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.docstore.document import Document
 from rag_pre_reasoning import pre_reasoning
-from utils.rag_prompts import mkhuda_system_prompt
-
-from datetime import datetime
-today = datetime.now().strftime("%Y-%m-%d")
+from utils.rag_prompts import MKHUDA_HUMAN_PROMPT, mkhuda_system_prompt, today_str
+from utils.rag_index_store import current_index_dir
+from utils.rag_doc_store import load_faiss
+from utils.rag_index_factory import score_threshold
+from utils.rag_bm25 import Bm25Index
+from utils.rag_date_filter import DateIndex
+from utils.rag_article_list import ArticleList, parse_listing
+from utils.rag_hybrid import HybridRetriever
+from utils.rag_context_pack import pack_context
 
 # ---------- SETUP ----------
 api_key = os.getenv("OPENAI_API_KEY")
@@ -31,15 +35,27 @@ embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
 llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, api_key=api_key)
 
 INDEX_PATH = "mkhuda_faiss_index"
-vectorstore = FAISS.load_local(INDEX_PATH, embeddings, allow_dangerous_deserialization=True)
-retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 2})
+vectorstore = load_faiss(current_index_dir(INDEX_PATH) or INDEX_PATH, embeddings)
+# chunk (vektor + BM25, digabung RRF), lalu digabung per artikel;
+# chunk vektor di bawah RETRIEVER_MIN_SCORE (kosinus) tidak masuk prompt;
+# pertanyaan berbatas waktu ("artikel bulan lalu") hanya mencari di rentang tanggalnya
+retriever = HybridRetriever(
+    vectorstore=vectorstore,
+    bm25=Bm25Index.open(current_index_dir(INDEX_PATH) or INDEX_PATH),
+    dates=DateIndex.open(current_index_dir(INDEX_PATH) or INDEX_PATH),
+    k=8,
+    score_threshold=score_threshold(vectorstore.index),
+)
+# "artikel terbaru/terlama" dijawab langsung dari daftar artikel terurut tanggal
+articles = ArticleList.open(current_index_dir(INDEX_PATH) or INDEX_PATH)
 
 # ---------- PROMPT ----------
-system_prompt = mkhuda_system_prompt(today)
+# system prompt statis (prompt caching); tanggal, konteks & pertanyaan di pesan user
+system_prompt = mkhuda_system_prompt()
 
 prompt = ChatPromptTemplate.from_messages([
     ("system", system_prompt),
-    ("human", "Pertanyaan: {input}\n\nKonteks:\n{context}")
+    ("human", MKHUDA_HUMAN_PROMPT)
 ])
 
 combine_docs_chain = create_stuff_documents_chain(
@@ -47,11 +63,11 @@ combine_docs_chain = create_stuff_documents_chain(
 )
 
 # ---------- HELPER ----------
-def format_docs_with_meta(docs, max_chars=1000):
+def format_docs_with_meta(docs):
     parts = []
     for d in docs:
         meta = d.metadata
-        text = d.page_content.strip()[:max_chars]
+        text = d.page_content.strip()
         date_str = meta.get("date", "(tanpa tanggal)")[:10]  # potong jamnya
         parts.append(
             f"Judul: {meta.get('title','(tanpa judul)')}\n"
@@ -62,6 +78,11 @@ def format_docs_with_meta(docs, max_chars=1000):
     return "\n---\n".join(parts)
 
 def rag_answer(message, history):
+    # daftar artikel terbaru/terlama: langsung dari daftar artikel, tanpa panggilan OpenAI
+    listing = parse_listing(message) if articles is not None else None
+    if listing is not None:
+        return articles.render(listing)
+
     # 0️⃣ Cek maksud dulu
     intent_result = pre_reasoning(message)
     if intent_result.get("intent") == "out_of_scope":
@@ -70,10 +91,11 @@ def rag_answer(message, history):
             "Maaf, saya hanya bisa membantu menjawab pertanyaan seputar teknologi dan artikel di mkhuda.com."
         )
     
-    docs = retriever.invoke(message)
+    # kalimat terbaik 2 artikel teratas dalam CONTEXT_TOKEN_BUDGET token
+    docs, _ = pack_context(retriever.invoke(message), message, max_articles=2, model=llm.model_name)
     context_text = format_docs_with_meta(docs)
     context_doc = [Document(page_content=context_text)]
-    answer = combine_docs_chain.invoke({"context": context_doc, "input": message})
+    answer = combine_docs_chain.invoke({"context": context_doc, "input": message, "today": today_str()})
     return answer  # langsung string HTML-friendly
 
 
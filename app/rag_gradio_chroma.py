@@ -12,20 +12,19 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os, gradio as gr
-from datetime import datetime
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.docstore.document import Document
 from rag_pre_reasoning2 import pre_reasoning
-from utils.rag_prompts import mkhuda_system_prompt
+from utils.rag_prompts import MKHUDA_HUMAN_PROMPT, mkhuda_system_prompt, today_str
+from utils.rag_context_pack import pack_context
 
 
 # ---------- KONFIGURASI ----------
 chroma_dir = "mkhuda_chroma"
 collection_name = "mkhuda_articles"
-today = datetime.now().strftime("%Y-%m-%d")
 
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
@@ -42,10 +41,11 @@ vectorstore = Chroma(
 )
 
 # ---------- PROMPT ----------
-system_prompt = mkhuda_system_prompt(today)
+# system prompt statis (prompt caching); tanggal, konteks & pertanyaan di pesan user
+system_prompt = mkhuda_system_prompt()
 prompt = ChatPromptTemplate.from_messages([
     ("system", system_prompt),
-    ("human", "Pertanyaan: {input}\n\nKonteks:\n{context}")
+    ("human", MKHUDA_HUMAN_PROMPT)
 ])
 combine_docs_chain = create_stuff_documents_chain(
     llm=llm, prompt=prompt, document_variable_name="context"
@@ -53,12 +53,12 @@ combine_docs_chain = create_stuff_documents_chain(
 
 
 # ---------- HELPER ----------
-def format_docs_with_meta(docs, max_chars=400):
+def format_docs_with_meta(docs):
     """Format isi dokumen hasil Chroma."""
     parts = []
     for d in docs:
         meta = d.metadata or {}
-        text = d.page_content.strip()[:max_chars]
+        text = d.page_content.strip()
         parts.append(
             f"📝 **{meta.get('title','(tanpa judul)')}**\n"
             f"📅 {meta.get('date','(tanpa tanggal)')[:10]}\n"
@@ -78,7 +78,8 @@ def rag_answer(message, history):
 
     # 2️⃣ Cari konteks dengan similarity search
     try:
-        docs = vectorstore.similarity_search(message, k=3)
+        # kalimat terbaik 3 hasil teratas dalam CONTEXT_TOKEN_BUDGET token
+        docs, _ = pack_context(vectorstore.similarity_search(message, k=3), message, max_articles=3, model=llm.model_name)
     except Exception as e:
         return f"❌ Gagal mencari artikel: {e}"
 
@@ -89,7 +90,7 @@ def rag_answer(message, history):
     context_text = format_docs_with_meta(docs)
     context_doc = [Document(page_content=context_text)]
     try:
-        answer = combine_docs_chain.invoke({"context": context_doc, "input": message})
+        answer = combine_docs_chain.invoke({"context": context_doc, "input": message, "today": today_str()})
     except Exception as e:
         return f"⚠️ Gagal memproses jawaban: {e}"
 
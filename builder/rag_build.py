@@ -3,6 +3,12 @@ RAG Index Builder untuk mkhuda.com
 ----------------------------------
 Ambil data dari database WordPress, bersihkan teks,
 buat embedding menggunakan OpenAI, dan simpan ke FAISS vectorstore.
+
+Hanya untuk layout lama (index.faiss langsung di `mkhuda_faiss_index/`).
+Setelah builder/rag_faiss_builder.py mempublish layout berversi (CURRENT +
+versions/), builder ini berhenti dengan pesan jelas: API selalu melayani
+versi CURRENT, dan index berversi (chunk + IndexIDMap2) tidak boleh ditimpa
+index per artikel.
 """
 
 from dotenv import load_dotenv
@@ -10,11 +16,9 @@ load_dotenv()
 
 import json
 import os
-import re
-import pandas as pd
+import sys
+from pathlib import Path
 import mysql.connector
-from bs4 import BeautifulSoup
-from tqdm import tqdm
 import faiss
 
 # --- Compatibility patch untuk FAISS >= 1.11 ---
@@ -35,7 +39,15 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 from langchain_community.docstore import InMemoryDocstore
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.rag_embed_pipeline import embed_texts, add_to_faiss
+from utils.rag_embed_dims import shorten, target_dimensions
+from utils.rag_vector_cache import default_vector_cache
+from utils.rag_wp_source import fetch_published_ids, fetch_posts, WP_POST_URL
+from utils.rag_chunking import post_id_of
+from utils.rag_html_clean import clean_stream
+from utils.rag_index_store import LEGACY_VERSION, current_version
 
 # --- 1️⃣ Ambil variabel environment ---
 api_key = os.getenv("OPENAI_API_KEY")
@@ -50,9 +62,16 @@ if not api_key:
 
 embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
 index_path = "mkhuda_faiss_index"
+dim = target_dimensions("text-embedding-3-small")  # 1536, atau EMBED_DIMENSIONS
 
 # --- 2️⃣ Load vectorstore lama (jika ada) ---
-if os.path.exists(index_path):
+loaded_version = current_version(index_path)
+if loaded_version not in (None, LEGACY_VERSION):
+    sys.exit(
+        f"❌ {index_path} sudah memakai layout berversi (versi {loaded_version}); "
+        "builder lama ini tidak mendukungnya. Jalankan: uv run python builder/rag_faiss_builder.py"
+    )
+if loaded_version == LEGACY_VERSION:
     print("📂 Memuat vectorstore lama...")
     vectorstore = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
     indexed_urls = {m.metadata.get("url") for m in vectorstore.docstore._dict.values() if m.metadata.get("url")}
@@ -60,7 +79,6 @@ if os.path.exists(index_path):
 else:
     print("🆕 Tidak ada index lama, membuat index baru...")
     # Buat index FAISS manual dengan dimensi sesuai model embedding
-    dim = 1536  # untuk model text-embedding-3-small
     index = faiss.IndexFlatL2(dim)
     docstore = InMemoryDocstore({})  # ✅ docstore yang bisa di-append
     vectorstore = FAISS(
@@ -82,37 +100,26 @@ conn = mysql.connector.connect(
     database = mysql_database
 )
 
-query = """
-SELECT ID, post_title, post_content, post_date
-FROM wp_posts
-WHERE post_status = 'publish' AND post_type = 'post' 
-ORDER BY post_date DESC;
-"""
-
-df = pd.read_sql(query, conn)
+# hanya ID dulu (tanpa body), lalu ambil isi post yang belum ter-index saja
+indexed_ids = {post_id_of({"url": url}) for url in indexed_urls} - {None}
+published_ids = fetch_published_ids(conn)
+rows = fetch_posts(conn, ids=published_ids - indexed_ids)
 conn.close()
-print(f"✅ {len(df)} post berhasil dimuat dari database.\n")
-
-# # --- 3️⃣ Bersihkan konten HTML & shortcode ---
-def clean_html(text):
-    text = re.sub(r'\[.*?\]', '', text)  # hapus shortcode [gallery], dll
-    text = BeautifulSoup(text, "html.parser").get_text()
-    return text.strip()
-
-df["clean_content"] = df["post_content"].apply(clean_html)
-df["url"] = "https://mkhuda.com/?p=" + df["ID"].astype(str)
+print(f"✅ {len(published_ids)} post publish, {len(rows)} belum di-index dimuat dari database.\n")
 
+# # --- 3️⃣ Bersihkan konten HTML & shortcode (utils/rag_html_clean.py) ---
 # # --- 4️⃣ Split menjadi potongan teks ---
 # --- 4️⃣ Filter artikel baru ---
 new_docs = []
-for _, row in df.iterrows():
-    if row.url not in indexed_urls:
+for row, text in clean_stream(rows, lambda r: r["post_content"]):
+    url = f"{WP_POST_URL}{row['ID']}"
+    if url not in indexed_urls:
         new_docs.append({
-            "page_content": row.clean_content,
+            "page_content": text,
             "metadata": {
-                "title": row.post_title,
-                "url": row.url,
-                "date": str(row.post_date)
+                "title": row["post_title"],
+                "url": url,
+                "date": row["post_date"]
             }
         })
 
@@ -128,25 +135,22 @@ if not new_docs:
 
 print(f"🧩 Menemukan {len(new_docs)} artikel baru untuk ditambahkan ke index.")
 
-# --- 5️⃣ Embedding dengan progress halus ---
+# --- 5️⃣ Embedding paralel (batch per token, adaptif 429) lalu satu insert FAISS ---
 total = len(new_docs)
-batch_size = 10
 
 print("🧠 Membuat embedding dan menambahkan ke FAISS...")
 
-for i in range(0, total, batch_size):
-    batch = new_docs[i:i+batch_size]
-    texts = [d["page_content"] for d in batch]
-    metas = [d["metadata"] for d in batch]
+docs_all = [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in new_docs]
 
-    # buat objek Document baru
-    docs_batch = [Document(page_content=t, metadata=m) for t, m in zip(texts, metas)]
-    
-    # tambahkan langsung ke vectorstore
-    vectorstore.add_documents(docs_batch, embedding=embeddings)
+def print_progress(done, total):
+    pct = (done / total) * 100
+    print(f"\rProgress: {done}/{total} ({pct:.1f}%)", end="")
 
-    pct = ((i + len(batch)) / total) * 100
-    print(f"\rProgress: {i + len(batch)}/{total} ({pct:.1f}%)", end="")
+vectors, stats = embed_texts(
+    [d.page_content for d in docs_all], progress=print_progress, cache=default_vector_cache("text-embedding-3-small")
+)
+vectorstore = add_to_faiss(vectorstore, docs_all, shorten(vectors, dim), embeddings)
+print(f"\n⚡ {stats['cache_hits']} dari cache, {stats['requests']} request, {stats['rate_limited']}× 429")
 
 print("\n✅ Embedding selesai, menyimpan kembali FAISS index...")
 
@@ -3,24 +3,41 @@ RAG Index Builder untuk mkhuda.com (versi LlamaIndex)
 ------------------------------------------------------
 Ambil data dari database WordPress, bersihkan teks,
 buat embedding menggunakan OpenAI, dan simpan ke FAISS vectorstore.
+Embedding dokumen melewati cache content-hash (utils/rag_vector_cache.py) dan
+dikirim per jendela `LLAMA_EMBED_WINDOW` dokumen lewat pipeline paralel
+(utils/rag_embed_pipeline.py: batch per token, concurrency AIMD), lalu node
+yang sudah membawa vektornya dimasukkan sekali per jendela (`insert_nodes`).
+Post di-stream dari DB lewat cursor unbuffered (utils/rag_wp_source.py), tanpa pandas.
+Index disimpan di direktori sendiri (`LLAMA_INDEX_PATH`, default `mkhuda_llama_index/`):
+`mkhuda_faiss_index/` memakai layout berversi (CURRENT + versions/) milik
+builder/rag_faiss_builder.py, dan `index.faiss` tanpa docstore di root-nya
+akan terbaca sebagai versi "legacy" yang tidak bisa dimuat API.
 """
 
 from dotenv import load_dotenv
 load_dotenv()
 
-import os, re, json
-import pandas as pd
+import os, sys
+from itertools import islice
 import mysql.connector
-from bs4 import BeautifulSoup
 from tqdm import tqdm
 from pathlib import Path
 
 # LlamaIndex imports
-from llama_index.core import Document, VectorStoreIndex, StorageContext
+from llama_index.core import Document, VectorStoreIndex, StorageContext, Settings
+from llama_index.core.schema import MetadataMode
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.vector_stores.faiss import FaissVectorStore
 import faiss
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.rag_vector_cache import default_vector_cache, embed_with_cache
+from utils.rag_embed_pipeline import embed_texts
+from utils.rag_embed_dims import shorten, target_dimensions
+from utils.rag_wp_source import iter_posts, WP_POST_URL
+from utils.rag_snapshot import JsonArrayWriter, tee
+from utils.rag_html_clean import clean_stream
+
 # --- 1️⃣ Load ENV ---
 api_key = os.getenv("OPENAI_API_KEY")
 mysql_database = os.getenv("MYSQL_DATABASE")
@@ -32,10 +49,28 @@ mysql_port = os.getenv("MYSQL_PORT", "3306")
 if not api_key:
     raise ValueError("❌ OPENAI_API_KEY tidak ditemukan di file .env")
 
-index_path = Path(__file__).resolve().parent.parent / "mkhuda_faiss_index"
+index_path = Path(os.getenv("LLAMA_INDEX_PATH") or Path(__file__).resolve().parent.parent / "mkhuda_llama_index")
 
 # --- 2️⃣ Setup embedding dan FAISS vectorstore ---
-embed_model = OpenAIEmbedding(model="text-embedding-3-small", api_key=api_key)
+vector_cache = default_vector_cache("text-embedding-3-small")
+# cache menyimpan vektor penuh; dipotong ke EMBED_DIMENSIONS (utils/rag_embed_dims.py)
+dim = target_dimensions("text-embedding-3-small")
+LLAMA_EMBED_WINDOW = int(os.getenv("LLAMA_EMBED_WINDOW", "256"))  # dokumen per jendela embedding
+
+class CachedOpenAIEmbedding(OpenAIEmbedding):
+    """OpenAIEmbedding yang mengecek cache content-hash sebelum memanggil OpenAI."""
+
+    def _get_text_embeddings(self, texts):
+        vectors, _ = embed_with_cache(texts, vector_cache, super()._get_text_embeddings)
+        return shorten(vectors, dim).tolist()
+
+    def _get_text_embedding(self, text):
+        return self._get_text_embeddings([text])[0]
+
+    def _get_query_embedding(self, query):
+        return shorten([super()._get_query_embedding(query)], dim)[0].tolist()
+
+embed_model = CachedOpenAIEmbedding(model="text-embedding-3-small", api_key=api_key)
 
 # Jika index lama ada → load; jika tidak → buat baru
 index_file = index_path / "index.faiss"
@@ -44,11 +79,9 @@ if index_file.exists():
     faiss_index = faiss.read_index(str(index_file))
     vector_store = FaissVectorStore(faiss_index=faiss_index)
     storage_context = StorageContext.from_defaults(vector_store=vector_store)
-    index = VectorStoreIndex.from_vector_store(vector_store)
+    index = VectorStoreIndex.from_vector_store(vector_store, embed_model=embed_model)
 else:
     print("🆕 Tidak ada index lama, membuat index baru...")
-    # OpenAI embedding dimension: 1536 for "text-embedding-3-small"
-    dim = 1536  
     faiss_index = faiss.IndexFlatL2(dim)
     vector_store = FaissVectorStore(faiss_index=faiss_index)
     storage_context = StorageContext.from_defaults(vector_store=vector_store)
@@ -64,43 +97,43 @@ conn = mysql.connector.connect(
     database=mysql_database
 )
 
-query = """
-SELECT ID, post_title, post_content, post_date
-FROM wp_posts
-WHERE post_status = 'publish' AND post_type = 'post'
-ORDER BY post_date DESC;
-"""
-df = pd.read_sql(query, conn)
-conn.close()
-print(f"✅ {len(df)} post berhasil dimuat dari database.\n")
-
-# --- 4️⃣ Bersihkan konten ---
-def clean_html(text):
-    text = re.sub(r'\[.*?\]', '', text)
-    text = BeautifulSoup(text, "html.parser").get_text()
-    return text.strip()
-
-df["clean_content"] = df["post_content"].apply(clean_html)
-df["url"] = "https://mkhuda.com/?p=" + df["ID"].astype(str)
-
-# --- 5️⃣ Convert ke dokumen baru ---
-new_docs = [
-    Document(
-        text=row.clean_content,
-        metadata={"title": row.post_title, "url": row.url, "date": str(row.post_date)}
-    )
-    for _, row in df.iterrows()
-    if row.clean_content.strip()
-]
-
-with open("docs.json", "w", encoding="utf-8") as f:
-    json.dump([d.to_dict() for d in new_docs], f, ensure_ascii=False, indent=2)
-
-print(f"🧩 Menemukan {len(new_docs)} artikel untuk ditambahkan ke index.")
-
-# --- 6️⃣ Tambahkan ke index dengan progress bar ---
-for doc in tqdm(new_docs, desc="Embedding dokumen..."):
-    index.insert(doc)
+# --- 4️⃣ + 5️⃣ Stream post → bersihkan HTML (multi-proses, utils/rag_html_clean.py) → dokumen ---
+def iter_new_docs(rows):
+    for row, text in clean_stream(rows, lambda r: r["post_content"]):
+        if text.strip():
+            yield Document(
+                text=text,
+                metadata={"title": row["post_title"], "url": f"{WP_POST_URL}{row['ID']}", "date": row["post_date"]},
+            )
+
+def windows(items, size):
+    it = iter(items)
+    while window := list(islice(it, size)):
+        yield window
+
+def embed_nodes(docs):
+    """Satu jendela dokumen → node (node parser LlamaIndex) yang sudah membawa vektornya."""
+    nodes = Settings.node_parser.get_nodes_from_documents(docs)
+    # teks yang sama dengan yang di-embed `index.insert` (metadata mode EMBED)
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    vectors, stats = embed_texts(texts, cache=vector_cache)
+    for node, vector in zip(nodes, shorten(vectors, dim)):
+        node.embedding = vector.tolist()
+    return nodes, stats
+
+# --- 6️⃣ Tambahkan ke index per jendela sambil menulis docs.json per dokumen ---
+cache_hits = requests = 0
+try:
+    with JsonArrayWriter("docs.json") as writer, tqdm(desc="Embedding dokumen...") as bar:
+        source = tee(iter_new_docs(iter_posts(conn)), writer, lambda d: d.to_dict())
+        for window in windows(source, LLAMA_EMBED_WINDOW):
+            nodes, stats = embed_nodes(window)
+            index.insert_nodes(nodes)
+            cache_hits, requests = cache_hits + stats["cache_hits"], requests + stats["requests"]
+            bar.update(len(window))
+finally:
+    conn.close()
+print(f"✅ {writer.count} artikel di-embed dari database ({cache_hits} dari cache, {requests} request).")
 
 # --- 7️⃣ Simpan FAISS index ---
 index_path.mkdir(parents=True, exist_ok=True)
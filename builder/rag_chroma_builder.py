@@ -5,15 +5,20 @@ RAG Index Builder mkhuda.com — Versi ChromaDB Final (Stable)
 • Explicit collection_name ("mkhuda_articles")
 • Menyimpan metadata build (jumlah dokumen, tanggal)
 • Auto rebuild jika index kosong / tidak kompatibel
+• Embedding lewat cache content-hash + pipeline paralel (teks lama tidak di-embed ulang)
+• Incremental upsert/delete: artikel dengan `post_modified`/content hash berbeda
+  diganti, artikel yang tidak lagi publish dihapus dari koleksi (hanya bila
+  korpus datang dari DB)
+• Ekstraksi incremental: hanya post dengan `post_modified`/ID melewati
+  high-water mark (disimpan di mkhuda_chroma_meta.json) yang diambil dari DB,
+  ditambah satu query ID untuk mendeteksi post yang dihapus
 """
 
 from dotenv import load_dotenv
 load_dotenv()
 
-import os, json, re
-import pandas as pd
+import os, json, sys
 import mysql.connector
-from bs4 import BeautifulSoup
 from pathlib import Path
 from datetime import datetime
 
@@ -22,6 +27,17 @@ from langchain_core.documents import Document
 from langchain_chroma import Chroma
 from chromadb import PersistentClient
 
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.rag_embed_pipeline import embed_texts, EMBED_MODEL
+from utils.rag_vector_cache import CachedDocumentEmbeddings, default_vector_cache
+from utils.rag_faiss_sync import article_states, stamp_articles, plan_changes
+from utils.rag_chunking import post_id_of, article_key
+from utils.rag_wp_source import fetch_posts, fetch_changes, high_water_mark, WP_POST_URL
+from utils.rag_html_clean import clean_stream
+
 # === Konfigurasi dasar ===
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
@@ -33,16 +49,22 @@ mysql_user = os.getenv("MYSQL_USER")
 mysql_password = os.getenv("MYSQL_PASSWORD")
 mysql_port = os.getenv("MYSQL_PORT", "3306")
 
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
+# embed_documents: cek cache content-hash dulu, sisanya lewat pipeline paralel
+embeddings = CachedDocumentEmbeddings(
+    OpenAIEmbeddings(model=EMBED_MODEL, api_key=api_key),
+    default_vector_cache(EMBED_MODEL),
+    embed_fn=lambda texts: embed_texts(texts)[0],
+)
 
-BASE_DIR = Path(__file__).resolve().parent.parent
 CHROMA_DIR = BASE_DIR / "mkhuda_chroma"
 CHROMA_DOCS_PATH = BASE_DIR / "docs_chroma.json"
+CHROMA_META_PATH = BASE_DIR / "mkhuda_chroma_meta.json"
 
 collection_name = "mkhuda_articles"
 
 # === Coba deteksi koleksi yang sudah ada ===
-indexed_urls = set()
+indexed: dict[int, tuple] = {}      # post_id → (post_modified, content_hash)
+ids_by_post: dict[int, list] = {}   # post_id → id dokumen Chroma
 client = PersistentClient(path=str(CHROMA_DIR))
 collections = [c.name for c in client.list_collections()]
 
@@ -53,22 +75,21 @@ if collection_name in collections:
         persist_directory=str(CHROMA_DIR),
         embedding_function=embeddings,
     )
-    all_docs = vectorstore.get()
-    for meta in all_docs["metadatas"]:
-        if meta and "url" in meta:
-            indexed_urls.add(meta["url"])
-    print(f"✅ Koleksi dimuat ({len(indexed_urls)} dokumen sudah di-index).")
+    all_docs = vectorstore.get(include=["metadatas"])
+    metas = [meta or {} for meta in all_docs["metadatas"]]
+    for doc_id, meta in zip(all_docs["ids"], metas):
+        post_id = post_id_of(meta)
+        if post_id is not None:
+            ids_by_post.setdefault(post_id, []).append(doc_id)
+    indexed = article_states(Document(page_content="", metadata=meta) for meta in metas)
+    print(f"✅ Koleksi dimuat ({len(indexed)} dokumen sudah di-index).")
 else:
     print("🆕 Koleksi baru akan dibuat...")
     vectorstore = None
 
 # === Siapkan dokumen ===
-def clean_html(text):
-    text = re.sub(r"\[.*?\]", "", text or "")
-    return BeautifulSoup(text, "html.parser").get_text().strip()
-
-
-def fetch_posts_from_db():
+def fetch_posts_from_db(since=None):
+    """(dokumen, post_id yang tidak lagi publish, high-water mark baru); `since` → incremental."""
     print("📡 Menghubungkan ke database WordPress...")
     conn = None
     try:
@@ -79,71 +100,92 @@ def fetch_posts_from_db():
             password=mysql_password,
             database=mysql_database,
         )
-        df = pd.read_sql(
-            """
-            SELECT ID, post_title, post_content, post_date
-            FROM wp_posts
-            WHERE post_status='publish' AND post_type='post'
-            ORDER BY post_date DESC;
-            """,
-            conn,
-        )
-        print(f"✅ {len(df)} post berhasil dimuat dari database.")
-        df["clean_content"] = df["post_content"].apply(clean_html)
-        df["url"] = "https://mkhuda.com/?p=" + df["ID"].astype(str)
+        if since:
+            rows, deleted_ids = fetch_changes(conn, since, indexed)
+            print(f"✅ {len(rows)} post berubah sejak {since['post_modified']}, {len(deleted_ids)} tidak lagi publish.")
+        else:
+            rows, deleted_ids = fetch_posts(conn), set()
+            print(f"✅ {len(rows)} post berhasil dimuat dari database.")
         candidate_docs = [
             {
-                "page_content": row.clean_content,
+                "page_content": text,
                 "metadata": {
-                    "title": row.post_title,
-                    "url": row.url,
-                    "date": str(row.post_date),
+                    "title": row["post_title"],
+                    "url": f"{WP_POST_URL}{row['ID']}",
+                    "date": row["post_date"],
+                    "post_id": row["ID"],
+                    "post_modified": row["post_modified"],
                 },
             }
-            for _, row in df.iterrows()
+            for row, text in clean_stream(rows, lambda r: r["post_content"])
         ]
-        return candidate_docs
+        return candidate_docs, deleted_ids, high_water_mark(rows, since)
     finally:
         if conn:
             conn.close()
 
 
+# high-water mark hanya berlaku untuk koleksi yang sama dengan build sebelumnya
+since = None
+if vectorstore is not None and CHROMA_META_PATH.exists():
+    with open(CHROMA_META_PATH, "r", encoding="utf-8") as f:
+        since = json.load(f).get("high_water_mark")
+
+# korpus penuh dari DB → artikel yang hilang boleh dihapus;
+# incremental → yang dihapus hanya hasil query ID
+authoritative = since is None
 try:
-    candidate_docs = fetch_posts_from_db()
+    candidate_docs, deleted_ids, mark = fetch_posts_from_db(since)
 except mysql.connector.Error as err:
     if CHROMA_DOCS_PATH.exists():
         print(f"⚠️  Gagal mengambil data dari database ({err}).")
-        print(f"📄 Menggunakan cadangan {CHROMA_DOCS_PATH}...")
+        print(f"📄 Menggunakan cadangan {CHROMA_DOCS_PATH} (tanpa penghapusan)...")
+        authoritative, deleted_ids, mark = False, set(), since
         with open(CHROMA_DOCS_PATH, "r", encoding="utf-8") as f:
             candidate_docs = json.load(f)
     else:
         raise
 
-new_docs = [
-    doc for doc in candidate_docs if doc["metadata"].get("url") not in indexed_urls
-]
+articles = stamp_articles(
+    [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in candidate_docs]
+)
+docs_objs, to_remove, deleted = plan_changes(indexed, articles, authoritative=authoritative)
+deleted |= deleted_ids & set(indexed)
+to_remove |= deleted
+new = sum(1 for d in docs_objs if d.metadata.get("post_id") not in indexed)
+print(f"🔎 {new} artikel baru, {len(docs_objs) - new} diedit, {len(deleted)} dihapus/unpublish.")
 
 with open(CHROMA_DOCS_PATH, "w", encoding="utf-8") as f:
-    json.dump(new_docs, f, ensure_ascii=False, indent=2)
+    json.dump(
+        [{"page_content": d.page_content, "metadata": d.metadata} for d in docs_objs],
+        f, ensure_ascii=False, indent=2,
+    )
 
-if not new_docs:
-    print("🎉 Tidak ada artikel baru untuk di-index.")
+if not docs_objs and not to_remove:
+    print("🎉 Tidak ada artikel yang berubah.")
     exit()
 
-docs_objs = [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in new_docs]
+# id dokumen = post_id (atau url) → stabil antar build
+doc_ids = [str(article_key(d.metadata)) for d in docs_objs]
 
-# === Tambah atau buat index ===
-if vectorstore is None:
+# === Hapus versi lama, lalu tambah atau buat index ===
+if vectorstore is not None and to_remove:
+    stale_ids = [doc_id for post_id in to_remove for doc_id in ids_by_post.get(post_id, [])]
+    print(f"🗑️ Menghapus {len(stale_ids)} dokumen lama...")
+    vectorstore.delete(ids=stale_ids)
+
+if docs_objs and vectorstore is None:
     print("🧱 Membuat koleksi baru...")
     vectorstore = Chroma.from_documents(
         documents=docs_objs,
         embedding=embeddings,
         persist_directory=str(CHROMA_DIR),
         collection_name=collection_name,
+        ids=doc_ids,
     )
-else:
+elif docs_objs:
     print("🧠 Menambahkan embedding ke koleksi...")
-    vectorstore.add_documents(docs_objs)
+    vectorstore.add_documents(docs_objs, ids=doc_ids)
 
 # vectorstore.persist()
 print(f"💾 Index tersimpan di: {CHROMA_DIR}/{collection_name}")
@@ -151,13 +193,15 @@ print(f"💾 Index tersimpan di: {CHROMA_DIR}/{collection_name}")
 # === Simpan metadata build ===
 meta_info = {
     "collection_name": collection_name,
-    "total_indexed": len(indexed_urls) + len(new_docs),
-    "new_added": len(new_docs),
+    "total_indexed": len(indexed) + new - len(deleted),
+    "new_added": new,
+    "updated": len(docs_objs) - new,
+    "deleted": len(deleted),
+    "high_water_mark": mark,
     "build_time": datetime.now().isoformat(),
 }
-meta_path = BASE_DIR / "mkhuda_chroma_meta.json"
-with open(meta_path, "w", encoding="utf-8") as f:
+with open(CHROMA_META_PATH, "w", encoding="utf-8") as f:
     json.dump(meta_info, f, ensure_ascii=False, indent=2)
 
-print(f"📘 Metadata build disimpan di {meta_path}")
+print(f"📘 Metadata build disimpan di {CHROMA_META_PATH}")
 print("🎯 Selesai — index Chroma siap digunakan lintas-device.")
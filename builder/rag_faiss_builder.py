@@ -1,30 +1,91 @@
 # rag_index_builder_json.py
 """
 RAG Index Builder mkhuda.com — Cross-Platform + Self-Healing
-- Selalu tulis docs.json (FULL korpus) dari DB.
+- Selalu tulis docs.snap (FULL korpus) dari DB.
 - Jika FAISS lama gagal diload, rebuild dari:
-  1) mkhuda_faiss_backup.json (jika ada)
-  2) docs.json
-  3) DB (full export)
+  1) DB (full export)
+  2) docs.snap
+  3) mkhuda_faiss_backup.snap
+- Index ditulis sebagai versi baru di mkhuda_faiss_index/versions/<versi>
+  lalu pointer CURRENT diganti atomik → API bisa hot-swap tanpa restart.
+- Tiap versi berisi index.faiss + docstore kolumnar (utils/rag_doc_store.py),
+  tanpa index.pkl → API memuatnya lewat mmap tanpa pickle.
+- Artikel dipecah jadi chunk (CHUNK_SIZE/CHUNK_OVERLAP, utils/rag_chunking.py)
+  sebelum embedding; tiap chunk menyimpan post_id, chunk_index, start_index.
+- Embedding lewat pipeline paralel (utils/rag_embed_pipeline.py): batch per
+  token, beberapa request in-flight, adaptif terhadap 429, satu insert FAISS.
+- Cache embedding content-hash (utils/rag_vector_cache.py): rebuild penuh
+  hanya meng-embed teks yang belum pernah di-embed.
+- Incremental = upsert + delete per artikel (utils/rag_faiss_sync.py):
+  index `IndexIDMap2` dengan id (post_id << 16) | chunk_index; artikel yang
+  `post_modified`/content hash-nya berubah di-embed ulang, artikel yang tidak
+  lagi publish dihapus. Korpus diambil dari DB dulu (fallback docs.snap).
+- Tipe index di dalam IndexIDMap2 dipilih lewat `FAISS_INDEX_TYPE` (flat, hnsw,
+  ivf-flat, ivf-pq, opq+ivf-pq; utils/rag_index_factory.py) dan dilatih dari
+  vektor yang sudah ada di akhir build.
+- Metrik index `FAISS_METRIC` (default `ip`: inner product atas vektor satuan,
+  skor kosinus di [−1, 1]); index L2 lama dikonversi dari vektor tersimpan
+  tanpa embed ulang (atau lewat utils/migrate_faiss_metric.py tanpa DB).
+- `EMBED_DIMENSIONS` (utils/rag_embed_dims.py) memotong vektor ke 256/512/…
+  dimensi; `FAISS_VECTOR_CODEC` menyimpannya sebagai float16/int8. Cache
+  embedding tetap berisi vektor penuh, jadi mengubah keduanya cukup rebuild
+  dari cache.
+- Ekstraksi DB incremental (utils/rag_wp_source.py): high-water mark
+  (`post_modified` + ID) disimpan di sync_state.json tiap versi; build
+  berikutnya hanya menarik baris yang berubah + satu query ID untuk deteksi hapus.
+- Pipeline streaming: cursor MySQL unbuffered → bersihkan HTML → docs.snap
+  (ditulis per dokumen) → chunk per jendela `BUILD_WINDOW_CHUNKS` → embed →
+  insert. Tanpa pandas; memori puncak builder tidak lagi tumbuh dengan ukuran
+  korpus (selain index FAISS itu sendiri).
+- Korpus & backup disimpan sebagai snapshot JSONL terkompresi (zstd/gzip,
+  utils/rag_snapshot.py) dengan header jumlah record + sha256; dibaca ulang
+  sebagai stream. docs.json / mkhuda_faiss_backup.json lama masih dibaca bila
+  snapshot belum ada.
 """
 
 from dotenv import load_dotenv
 load_dotenv()
 
-import os, re, json
+import os, json, sys
+from itertools import groupby
 from pathlib import Path
-import pandas as pd
 import mysql.connector
-from bs4 import BeautifulSoup
 
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.rag_index_store import (
+    current_version, current_index_dir, staging_dir, publish_version, gc_old_versions, LEGACY_VERSION,
+)
+from utils.rag_doc_store import load_faiss, save_faiss, iter_documents
+from utils.rag_wp_source import (
+    iter_posts, fetch_changes, HighWaterMark, read_sync_state, write_sync_state, WP_POST_URL,
+)
+from utils.rag_snapshot import SnapshotWriter, SnapshotError, read_snapshot, snapshot_info, tee
+from utils.rag_html_clean import clean_stream
+from utils.rag_chunking import post_id_of, article_key, merge_chunks, is_chunked, CHUNK_SIZE, CHUNK_OVERLAP
+from utils.rag_embed_pipeline import embed_texts, EMBED_CONCURRENCY, EMBED_MODEL
+from utils.rag_embed_dims import shorten, target_dimensions
+from utils.rag_index_factory import convert_index, factory_string, index_spec, target_spec
+from utils.rag_faiss_sync import (
+    faiss_store, add_chunks, remove_posts, article_states, stamp_articles, iter_changed, chunk_windows, is_id_mapped,
+)
+from utils.rag_bm25 import has_bm25
+from utils.rag_date_filter import has_date_index
+from utils.rag_article_list import has_article_list
+from utils.rag_vector_cache import default_vector_cache
+
 INDEX_DIR = BASE_DIR / "mkhuda_faiss_index"
-DOCS_JSON = BASE_DIR / "docs.json"                   # full korpus
-BACKUP_JSON = BASE_DIR / "mkhuda_faiss_backup.json"  # dump dari FAISS terakhir
+INDEX_GC_GRACE_SECONDS = float(os.getenv("INDEX_GC_GRACE_SECONDS", "3600"))
+DOCS_SNAPSHOT = BASE_DIR / "docs.snap"                   # full korpus
+BACKUP_SNAPSHOT = BASE_DIR / "mkhuda_faiss_backup.snap"  # dump dari FAISS terakhir
+DOCS_JSON = BASE_DIR / "docs.json"                       # format lama (hanya dibaca)
+BACKUP_JSON = BASE_DIR / "mkhuda_faiss_backup.json"      # format lama (hanya dibaca)
+BUILD_WINDOW_CHUNKS = int(os.getenv("BUILD_WINDOW_CHUNKS", "2000"))  # chunk per embed + insert
 
 # --- ENV ---
 api_key = os.getenv("OPENAI_API_KEY")
@@ -37,128 +98,246 @@ mysql_user     = os.getenv("MYSQL_USER")
 mysql_password = os.getenv("MYSQL_PASSWORD")
 mysql_port     = int(os.getenv("MYSQL_PORT", "3306"))
 
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
-
-def clean_html(text: str) -> str:
-    text = re.sub(r"\[.*?\]", "", text)  # hapus shortcode
-    return BeautifulSoup(text or "", "html.parser").get_text().strip()
+embeddings = OpenAIEmbeddings(model=EMBED_MODEL, api_key=api_key)
+vector_cache = default_vector_cache(EMBED_MODEL)
+embed_dimensions = target_dimensions(EMBED_MODEL)
 
-def fetch_full_corpus_from_db() -> list[dict]:
+def connect_db():
     if not all([mysql_database, mysql_host, mysql_user]) or mysql_password is None:
         raise RuntimeError("❌ Variabel koneksi MySQL belum lengkap.")
-    conn = mysql.connector.connect(
+    return mysql.connector.connect(
         host=mysql_host, port=mysql_port, user=mysql_user,
         password=mysql_password, database=mysql_database
     )
-    query = """
-      SELECT ID, post_title, post_content, post_date
-      FROM wp_posts
-      WHERE post_status='publish' AND post_type='post'
-      ORDER BY post_date DESC;
-    """
-    df = pd.read_sql(query, conn)
-    conn.close()
-
-    df["clean_content"] = df["post_content"].apply(clean_html)
-    df["url"] = "https://mkhuda.com/?p=" + df["ID"].astype(str)
-    docs = []
-    for _, r in df.iterrows():
-        docs.append({
-            "page_content": r.clean_content,
-            "metadata": {"title": r.post_title, "url": r.url, "date": str(r.post_date)}
-        })
-    return docs
+
+def iter_row_docs(rows):
+    """Baris wp_posts → dict dokumen; HTML dibersihkan paralel (utils/rag_html_clean.py)."""
+    for r, text in clean_stream(rows, lambda row: row["post_content"]):
+        yield {
+            "page_content": text,
+            "metadata": {
+                "title": r["post_title"], "url": f"{WP_POST_URL}{r['ID']}", "date": r["post_date"],
+                "post_id": r["ID"], "post_modified": r["post_modified"],
+            }
+        }
 
 def load_docs_from_json(path: Path) -> list[dict]:
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def save_docs_json(docs: list[dict], path: Path):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(docs, f, ensure_ascii=False, indent=2)
+def open_corpus(snapshot: Path, legacy_json: Path):
+    """(jumlah dokumen, stream dokumen) dari snapshot; fallback JSON format lama."""
+    if snapshot.exists():
+        return snapshot_info(snapshot)["count"], read_snapshot(snapshot)
+    if legacy_json.exists():
+        docs = load_docs_from_json(legacy_json)
+        return len(docs), docs
+    return 0, None
 
-def docs_to_objects(docs: list[dict]) -> list[Document]:
-    return [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in docs]
+def patch_corpus(changed: list[dict], deleted_ids: set[int]) -> int | None:
+    """
+    Snapshot korpus lama → snapshot baru sambil di-stream: post yang berubah
+    ditimpa, yang dihapus dibuang, sisanya (post baru) ditambahkan di akhir.
+    """
+    _, old = open_corpus(DOCS_SNAPSHOT, DOCS_JSON)
+    if old is None:
+        return None
+    pending = {d["metadata"]["post_id"]: d for d in changed}
+    with SnapshotWriter(DOCS_SNAPSHOT) as out:
+        for d in old:
+            post_id = post_id_of(d["metadata"])
+            if post_id not in deleted_ids:
+                out.write(pending.pop(post_id, d))
+        for d in pending.values():
+            out.write(d)
+    return out.count
+
+def iter_articles(docs):
+    """dict dokumen → Document dengan post_id + content_hash (satu per satu)."""
+    for d in docs:
+        doc = stamp_articles([Document(page_content=d["page_content"], metadata=d["metadata"])])[0]
+        if doc.metadata.get("post_id") is None:
+            raise RuntimeError(f"❌ Artikel tanpa post_id ({doc.metadata.get('url')}) — tidak bisa diberi id FAISS.")
+        yield doc
+
+def print_progress(done: int, total: int):
+    print(f"\rProgress: {done}/{total} chunk", end="", flush=True)
+
+def embed_into(vectorstore, chunks: list[Document]):
+    """Embed semua chunk secara paralel lalu masukkan ke FAISS dalam satu insert."""
+    vectors, stats = embed_texts([c.page_content for c in chunks], progress=print_progress, cache=vector_cache)
+    print(
+        f"\n⚡ {stats['cache_hits']}/{len(chunks)} dari cache, {stats['batches']} batch, "
+        f"{stats['requests']} request, {stats['rate_limited']}× 429 "
+        f"(concurrency {EMBED_CONCURRENCY} → {stats['final_concurrency']})"
+    )
+    return add_chunks(vectorstore, chunks, shorten(vectors, embed_dimensions), embeddings)
 
 # 1) Coba load FAISS lama untuk incremental
 vectorstore = None
-indexed_urls: set[str] = set()
-if INDEX_DIR.exists():
+indexed: dict[int, tuple] = {}
+loaded_version = current_version(INDEX_DIR)
+if loaded_version:
     try:
-        print("📂 Memuat FAISS lama…")
-        vectorstore = FAISS.load_local(
-            str(INDEX_DIR), embeddings, allow_dangerous_deserialization=True
-        )
-        indexed_urls = {
-            d.metadata.get("url")
-            for d in vectorstore.docstore._dict.values()
-            if d.metadata.get("url")
-        }
-        print(f"✅ FAISS lama dimuat ({len(indexed_urls)} dokumen).")
+        print(f"📂 Memuat FAISS lama (versi {loaded_version})…")
+        vectorstore = load_faiss(current_index_dir(INDEX_DIR), embeddings, writable=True)
+        old_docs = list(iter_documents(vectorstore))
+        if old_docs and not (is_id_mapped(vectorstore.index) and all(is_chunked(d) for d in old_docs)):
+            # index lama (1 vektor per artikel / id berurutan) → rebuild penuh;
+            # vektor yang sama diambil dari cache embedding, bukan OpenAI
+            print("♻️ FAISS lama belum ber-id per artikel — akan dibangun ulang.")
+            vectorstore = None
+        elif vectorstore.index.d != embed_dimensions:
+            # vektor penuh ada di cache embedding → dipotong ulang tanpa memanggil OpenAI
+            print(f"♻️ Dimensi embedding berubah ({vectorstore.index.d} → {embed_dimensions}) — akan dibangun ulang.")
+            vectorstore = None
+        elif (loaded := index_spec(vectorstore.index)).lossy and loaded != target_spec(vectorstore.index.ntotal):
+            # vektor PQ/float16/int8 hanya aproksimasi → spec baru dibangun dari vektor asli di cache embedding
+            print(f"♻️ Index berubah ({loaded} → {target_spec(vectorstore.index.ntotal)}) — akan dibangun ulang.")
+            vectorstore = None
+        else:
+            indexed = article_states(old_docs)
+            print(f"✅ FAISS lama dimuat ({len(indexed)} artikel, {len(old_docs)} chunk).")
     except Exception as e:
         print(f"⚠️ Gagal memuat FAISS lama ({type(e).__name__}: {e})")
 
-# 2) Pastikan kita punya FULL docs.json (bukan “new_docs”)
-full_docs: list[dict] = []
-if DOCS_JSON.exists():
+# 2) Sumber artikel (di-stream): DB incremental (sejak high-water mark) / DB penuh → docs.snap → backup
+since = read_sync_state(current_index_dir(INDEX_DIR)) if vectorstore is not None else None
+mark = HighWaterMark(since)
+source = None                   # iterable dict {"page_content", "metadata"}
+deleted_ids: set[int] = set()   # mode incremental: hasil query ID
+authoritative = False           # True → artikel yang tidak ada di korpus dihapus dari index
+conn = None
+docs_writer = None              # docs.snap ditulis sambil korpus lewat (mode DB penuh)
+try:
+    conn = connect_db()
+    if since:
+        print(f"🗄️ Mengambil post yang berubah sejak {since['post_modified']} / ID > {since['max_id']}…")
+        rows, deleted_ids = fetch_changes(conn, since, indexed)
+        source = list(iter_row_docs(mark.track(rows)))
+        print(f"✅ {len(rows)} post berubah/baru, {len(deleted_ids)} tidak lagi publish.")
+        try:
+            # docs.snap tetap korpus penuh: timpa yang berubah, buang yang dihapus
+            count = patch_corpus(source, deleted_ids)
+            if count is not None:
+                print(f"💾 docs.snap diperbarui ({count} artikel) → {DOCS_SNAPSHOT}")
+        except SnapshotError as e:
+            # index tetap di-update dari DB; korpus lengkap ditulis lagi di export penuh berikutnya
+            print(f"⚠️ {e} — docs.snap dibuang.")
+            DOCS_SNAPSHOT.unlink(missing_ok=True)
+    else:
+        print("🗄️ Streaming FULL korpus dari database…")
+        docs_writer = SnapshotWriter(DOCS_SNAPSHOT)
+        source = tee(iter_row_docs(mark.track(iter_posts(conn))), docs_writer)
+        authoritative = True
+except Exception as e:
+    print(f"⚠️ DB tidak bisa diakses ({type(e).__name__}: {e}) — memakai docs.snap.")
+    if conn is not None:
+        conn.close()
+    conn, source, deleted_ids, mark = None, None, set(), HighWaterMark(since)
+
+# Snapshot dibaca sebagai stream; jumlah record diambil dari header. Kerusakan di
+# tengah isi (hash/jumlah tidak cocok) menggagalkan build → index lama tidak disentuh.
+if source is None:
     try:
-        full_docs = load_docs_from_json(DOCS_JSON)
-        # Heuristik: kalau docs.json kosong/terlalu kecil, anggap tidak valid
-        if len(full_docs) == 0:
-            print("⚠️ docs.json kosong — akan rebuild dari sumber lain.")
-            full_docs = []
+        count, source = open_corpus(DOCS_SNAPSHOT, DOCS_JSON)
+        authoritative = source is not None  # snapshot korpus penuh terakhir dari DB
+        # Heuristik: kalau docs.snap kosong, anggap tidak valid
+        if source is not None and count == 0:
+            print("⚠️ docs.snap kosong — akan rebuild dari sumber lain.")
+            source, authoritative = None, False
     except Exception as e:
-        print(f"⚠️ docs.json tidak bisa dibaca ({e})")
-        full_docs = []
+        print(f"⚠️ docs.snap tidak bisa dibaca ({e})")
+        source, authoritative = None, False
 
-# 3) Fallback sumber dokumen: BACKUP_JSON → DB
-if not full_docs and BACKUP_JSON.exists():
+# 3) Fallback sumber dokumen: backup dari FAISS terakhir
+if source is None:
     try:
-        print("📄 Menggunakan mkhuda_faiss_backup.json …")
-        full_docs = load_docs_from_json(BACKUP_JSON)
+        count, source = open_corpus(BACKUP_SNAPSHOT, BACKUP_JSON)
+        if source is not None:
+            print(f"📄 Menggunakan backup FAISS ({count} artikel) …")
     except Exception as e:
-        print(f"⚠️ Backup JSON rusak ({e})")
+        print(f"⚠️ Backup rusak ({e})")
 
-if not full_docs:
-    print("🗄️ Mengambil FULL korpus dari database…")
-    full_docs = fetch_full_corpus_from_db()
-    print(f"✅ Dapat {len(full_docs)} dokumen dari DB.")
-    save_docs_json(full_docs, DOCS_JSON)
-    print(f"💾 FULL docs.json tersimpan → {DOCS_JSON}")
+if source is None:
+    raise RuntimeError("❌ Tidak ada dokumen untuk di-index (DB/snapshot kosong).")
 
-if not full_docs:
-    raise RuntimeError("❌ Tidak ada dokumen untuk di-index (DB/JSON kosong).")
-
-# 4) Tentukan dokumen yang perlu ditambahkan (incremental), tapi
-#    kalau FAISS belum ada (atau gagal load), kita build dari NOL.
+# 4) Stream artikel → yang baru/berubah → chunk per jendela → hapus versi lama → embed.
+#    Kalau FAISS belum ada (atau gagal load), semua artikel dianggap baru (build dari NOL).
+if vectorstore is None:
+    print(f"🧱 Membangun FAISS BARU (chunk {CHUNK_SIZE}/{CHUNK_OVERLAP}, jendela {BUILD_WINDOW_CHUNKS} chunk) …")
+seen: set = set()
+new = edited = removed_chunks = 0
+try:
+    for chunks in chunk_windows(iter_changed(indexed, iter_articles(source), seen), BUILD_WINDOW_CHUNKS):
+        post_ids = {c.metadata["post_id"] for c in chunks}
+        stale = post_ids & indexed.keys()
+        new, edited = new + len(post_ids) - len(stale), edited + len(stale)
+        if stale:
+            removed_chunks += remove_posts(vectorstore, stale)
+        print(f"🧩 {len(post_ids)} artikel → {len(chunks)} chunk")
+        vectorstore = embed_into(vectorstore, chunks)
+    if authoritative and not seen:
+        raise RuntimeError("❌ Korpus kosong — index lama tidak disentuh.")
+except BaseException:
+    if docs_writer is not None:
+        docs_writer.abort()
+    raise
+finally:
+    if conn is not None:
+        conn.close()
+if docs_writer is not None:
+    docs_writer.close()
+    print(f"💾 FULL docs.snap tersimpan ({docs_writer.count} artikel) → {DOCS_SNAPSHOT}")
 if vectorstore is None:
-    print("🧱 Membangun FAISS BARU dari FULL docs.json …")
-    vectorstore = FAISS.from_documents(docs_to_objects(full_docs), embeddings)
+    raise RuntimeError("❌ Tidak ada dokumen untuk di-index (DB/snapshot kosong).")
+
+deleted = (set(indexed) - seen) if authoritative else (deleted_ids & set(indexed))
+if deleted:
+    removed_chunks += remove_posts(vectorstore, deleted)
+print(f"🔎 {new} artikel baru, {edited} diedit, {len(deleted)} dihapus/unpublish ({removed_chunks} chunk lama dihapus).")
+
+changed = bool(new or edited or deleted) or not indexed
+# tipe index (FAISS_INDEX_TYPE) dilatih dari semua vektor setelah korpus lengkap;
+# build incremental berikutnya menambah/menghapus langsung di index yang sudah dilatih.
+# Index L2 lama → FAISS_METRIC dan codec baru dikonversi di sini juga, dari vektor yang tersimpan.
+target = target_spec(vectorstore.index.ntotal)
+if index_spec(vectorstore.index) != target:
+    n, dim = vectorstore.index.ntotal, vectorstore.index.d
+    print(
+        f"🏗️ Index {index_spec(vectorstore.index)} → "
+        f"{factory_string(target.index_type, dim, n, target.codec)}/{target.metric} ({n} vektor)…"
+    )
+    converted = convert_index(vectorstore.index, *target)
+    vectorstore = faiss_store(embeddings, converted, vectorstore.docstore, vectorstore.index_to_docstore_id)
+    changed = True
+if not changed:
+    print("🎉 Tidak ada artikel yang berubah.")
+    # layout lama tetap dipublish sekali supaya pindah ke direktori berversi;
+    # versi dari sebelum ada index BM25/tanggal/daftar artikel juga dipublish ulang sekali
+    current = current_index_dir(INDEX_DIR)
+    changed = loaded_version == LEGACY_VERSION or not (
+        has_bm25(current) and has_date_index(current) and has_article_list(current)
+    )
+
+# 5) Simpan FAISS sebagai versi baru + backup snapshot dari FAISS (ground truth portable)
+if changed:
+    staged = staging_dir(INDEX_DIR)
+    save_faiss(staged, vectorstore)
+    write_sync_state(staged, mark.value)
+    version = publish_version(INDEX_DIR, staged)
+    print(f"✅ FAISS tersimpan sebagai versi {version} di {INDEX_DIR}")
 else:
-    # incremental add: hanya dokumen yang url-nya belum pernah di-index
-    to_add = [d for d in full_docs if d["metadata"].get("url") not in indexed_urls]
-    if not to_add:
-        print("🎉 Tidak ada artikel baru untuk ditambahkan.")
-    else:
-        print(f"🧩 Menambahkan {len(to_add)} artikel baru…")
-        # batch kecil agar stabil
-        BATCH = 16
-        for i in range(0, len(to_add), BATCH):
-            batch = to_add[i : i + BATCH]
-            vectorstore.add_documents(docs_to_objects(batch), embedding=embeddings)
-            done = i + len(batch)
-            print(f"\rProgress: {done}/{len(to_add)}", end="")
-        print("")
-
-# 5) Simpan FAISS + backup JSON dari FAISS (ground truth portable)
-INDEX_DIR.mkdir(exist_ok=True)
-vectorstore.save_local(str(INDEX_DIR))
-print(f"✅ FAISS tersimpan di {INDEX_DIR}")
-
-backup = [
-    {"page_content": d.page_content, "metadata": d.metadata}
-    for d in vectorstore.docstore._dict.values()
-]
-save_docs_json(backup, BACKUP_JSON)
-print(f"📦 Backup JSON tersimpan di {BACKUP_JSON}")
+    print(f"✅ FAISS tidak berubah (versi {loaded_version} tetap aktif)")
+removed = gc_old_versions(INDEX_DIR, grace_seconds=INDEX_GC_GRACE_SECONDS)
+if removed:
+    print(f"🧹 Versi lama dihapus: {', '.join(removed)}")
+
+# backup berisi artikel utuh (dirakit ulang dari chunk) supaya bisa jadi sumber rebuild;
+# chunk satu artikel bersebelahan di index, jadi cukup dirakit per kelompok
+with SnapshotWriter(BACKUP_SNAPSHOT) as backup:
+    for _, group in groupby(iter_documents(vectorstore), key=lambda d: article_key(d.metadata)):
+        for d in merge_chunks(list(group)):
+            backup.write({"page_content": d.page_content, "metadata": d.metadata})
+print(f"📦 Backup tersimpan di {BACKUP_SNAPSHOT} ({backup.count} artikel)")
 print("🎯 Selesai.")
@@ -0,0 +1,40 @@
+from datetime import date
+
+import numpy as np
+
+from utils.rag_answer_cache import SemanticAnswerCache
+from utils.rag_date_filter import parse_date_filters
+
+
+def _scope(question: str, today: date = date(2024, 9, 15)) -> str:
+    return SemanticAnswerCache.scope_of(parse_date_filters(question, today))
+
+
+def test_questions_differing_only_by_month_miss_each_other():
+    cache = SemanticAnswerCache(max_distance=0.05)
+    july = np.ones(8, dtype="float32")
+    june = july + np.array([0.01] + [0.0] * 7, dtype="float32")  # cosine distance ≪ 0.05
+
+    cache.store(july, "artikel Juli", 100, "v1", _scope("artikel tentang htmx Juli 2024"))
+
+    assert cache.lookup(june, "v1", _scope("artikel tentang htmx Juni 2024")) is None
+    cache.store(june, "artikel Juni", 100, "v1", _scope("artikel tentang htmx Juni 2024"))
+    assert cache.lookup(july, "v1", _scope("artikel tentang htmx Mei 2024")) is None
+    assert cache.hits == 0 and cache.misses == 2
+
+
+def test_relative_question_misses_after_month_boundary():
+    cache = SemanticAnswerCache(max_distance=0.05)
+    vector = np.ones(8, dtype="float32")
+    cache.store(vector, "jawaban Agustus", 100, "v1", _scope("artikel bulan lalu", date(2024, 9, 30)))
+
+    assert cache.lookup(vector, "v1", _scope("artikel bulan lalu", date(2024, 9, 30))).reply == "jawaban Agustus"
+    assert cache.lookup(vector, "v1", _scope("artikel bulan lalu", date(2024, 10, 1))) is None
+
+
+def test_undated_questions_still_hit():
+    cache = SemanticAnswerCache(max_distance=0.05)
+    vector = np.ones(8, dtype="float32")
+    cache.store(vector, "jawaban", 100, "v1", _scope("apa itu htmx?"))
+
+    assert cache.lookup(vector, "v1", _scope("apa itu htmx?")).reply == "jawaban"
@@ -0,0 +1,37 @@
+from datetime import date
+
+import pytest
+
+from utils.rag_article_list import ARTICLE_LIST_MAX, ARTICLE_LIST_SIZE, Listing, parse_listing
+
+TODAY = date(2024, 9, 15)
+
+
+@pytest.mark.parametrize("question", [
+    "Apa yang pertama?",
+    "Siapa yang terbaru?",
+    "yang paling baru apa?",
+    "berita terkini 2024",
+    "artikel terbaru tentang htmx",
+    "tutorial laravel terlama",
+])
+def test_questions_without_listing_noun_or_with_topic_are_not_listings(question):
+    assert parse_listing(question, TODAY) is None
+
+
+def test_latest_and_oldest_articles():
+    assert parse_listing("artikel terbaru", TODAY) == Listing(oldest=False, count=ARTICLE_LIST_SIZE, filters={})
+    assert parse_listing("5 tulisan terlama", TODAY) == Listing(oldest=True, count=5, filters={})
+    assert parse_listing("artikel pertama di mkhuda.com", TODAY).oldest
+
+
+def test_bare_year_filters_listing():
+    year_2024 = {"date": {"$gte": "2024-01-01 00:00:00", "$lt": "2025-01-01 00:00:00"}}
+    assert parse_listing("artikel terbaru 2024", TODAY).filters == year_2024
+    assert parse_listing("artikel terbaru tahun 2024", TODAY).filters == year_2024
+
+
+def test_date_scoped_listing_shows_up_to_max():
+    listing = parse_listing("artikel bulan Juli 2024", TODAY)
+    assert listing.filters == {"date": {"$gte": "2024-07-01 00:00:00", "$lt": "2024-08-01 00:00:00"}}
+    assert listing.count == ARTICLE_LIST_MAX
@@ -0,0 +1,30 @@
+import asyncio
+
+import numpy as np
+
+from utils.rag_embedding_cache import QueryEmbeddingCache
+
+
+def test_shared_tier_is_visible_to_other_workers(tmp_path):
+    path = tmp_path / "q.sqlite"
+    writer, reader = QueryEmbeddingCache(shared_path=path), QueryEmbeddingCache(shared_path=path)
+    key = writer.make_key("m", "Apa itu HTMX?")
+    writer.put(key, [1.0, 2.0])
+
+    assert reader.get(reader.make_key("m", "apa itu  htmx?")).tolist() == [1.0, 2.0]
+    assert reader.get(key) is not None
+    assert (reader.hits_shared, reader.hits_memory, reader.misses) == (1, 1, 0)
+
+
+def test_async_path_uses_shared_tier_off_the_event_loop(tmp_path):
+    path = tmp_path / "q.sqlite"
+    writer, reader = QueryEmbeddingCache(shared_path=path), QueryEmbeddingCache(shared_path=path)
+
+    async def run():
+        key = writer.make_key("m", "htmx")
+        assert await reader.aget(key) is None
+        await writer.aput(key, np.ones(4))
+        return await reader.aget(key)
+
+    assert asyncio.run(run()).tolist() == [1.0] * 4
+    assert (reader.misses, reader.hits_shared) == (1, 1)
@@ -0,0 +1,87 @@
+import faiss
+import numpy as np
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+from langchain_core.embeddings import FakeEmbeddings
+
+from utils.rag_faiss_sync import (
+    MAX_CHUNKS_PER_POST, add_chunks, chunk_id, faiss_labels, faiss_store, plan_changes, post_of_id, remove_posts,
+)
+from utils.rag_index_factory import build_index, index_type_of, search_rows, unit_rows
+
+DIM = 16
+POSTS = 400
+CHUNKS_PER_POST = 3  # 1200 vektor: cukup untuk ivf-flat (MIN_VECTORS 1000)
+
+
+def test_chunk_id_round_trip():
+    assert chunk_id(7, 0) == 7 << 16
+    assert post_of_id(chunk_id(123456, MAX_CHUNKS_PER_POST - 1)) == 123456
+    assert chunk_id(5, 3) != chunk_id(5, 4) and post_of_id(chunk_id(5, 3)) == post_of_id(chunk_id(5, 4))
+    with pytest.raises(ValueError):
+        chunk_id(1, MAX_CHUNKS_PER_POST)
+
+
+def test_plan_changes():
+    indexed = {1: ("t1", "h1"), 2: ("t2", "h2"), 3: ("t3", "h3")}
+    articles = [
+        Document(page_content="a", metadata={"post_id": 1, "post_modified": "t1", "content_hash": "h1"}),
+        Document(page_content="b", metadata={"post_id": 2, "post_modified": "t2b", "content_hash": "h2b"}),
+        Document(page_content="c", metadata={"post_id": 4, "post_modified": "t4", "content_hash": "h4"}),
+    ]
+    upsert, remove, deleted = plan_changes(indexed, articles)
+    assert [d.metadata["post_id"] for d in upsert] == [2, 4]
+    assert remove == {2, 3} and deleted == {3}
+    assert plan_changes(indexed, articles, authoritative=False)[1:] == ({2}, set())
+
+
+def _store(index_type: str, rng):
+    chunks = [
+        Document(page_content=f"post {p} chunk {c}", metadata={"post_id": p, "chunk_index": c})
+        for p in range(1, POSTS + 1) for c in range(CHUNKS_PER_POST)
+    ]
+    vectors = unit_rows(rng.standard_normal((len(chunks), DIM)).astype("float32"))
+    labels = np.array([chunk_id(d.metadata["post_id"], d.metadata["chunk_index"]) for d in chunks], dtype="int64")
+    index = build_index(vectors, labels, index_type=index_type, metric="ip", codec="float32")
+    assert index_type_of(index) == index_type
+    docstore = InMemoryDocstore({str(label): d for label, d in zip(labels.tolist(), chunks)})
+    store = faiss_store(FakeEmbeddings(size=DIM), index, docstore, {label: str(label) for label in labels.tolist()})
+    return store, dict(zip(labels.tolist(), vectors))
+
+
+def _search_all(store, queries: np.ndarray, k: int) -> np.ndarray:
+    """Label hasil `search_rows` di atas semua baris index (baris → id_map)."""
+    _, rows = search_rows(store.index, queries, k, np.arange(store.index.ntotal))
+    labels = faiss_labels(store.index)
+    return labels[rows[rows >= 0]]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf-flat", "hnsw"])
+def test_upsert_then_delete_post_is_never_served(index_type):
+    rng = np.random.default_rng(0)
+    store, vectors = _store(index_type, rng)
+    post = 123
+    old_labels = [chunk_id(post, c) for c in range(CHUNKS_PER_POST)]
+
+    # upsert: chunk lama dihapus, versi baru (2 chunk) ditambahkan dengan id yang sama
+    assert remove_posts(store, [post]) == CHUNKS_PER_POST
+    new_vectors = unit_rows(rng.standard_normal((2, DIM)).astype("float32"))
+    new_chunks = [Document(page_content=f"baru {c}", metadata={"post_id": post, "chunk_index": c}) for c in range(2)]
+    store = add_chunks(store, new_chunks, new_vectors, store.embedding_function)
+    assert set(_search_all(store, new_vectors, 1).tolist()) == {chunk_id(post, 0), chunk_id(post, 1)}
+
+    # delete: tidak ada satu pun baris yang masih membawa id post ini
+    assert remove_posts(store, [post]) == 2
+    assert store.index.ntotal == (POSTS - 1) * CHUNKS_PER_POST
+    found = _search_all(store, np.vstack([vectors[label] for label in old_labels] + [new_vectors]), 10)
+    assert len(found) and not any(post_of_id(label) == post for label in found.tolist())
+    assert not any(post_of_id(label) == post for label in faiss_labels(store.index).tolist())
+
+    # baris tersisa masih cocok dengan labelnya (renumbering IVF / rebuild HNSW tanpa off-by-one)
+    inner = faiss.downcast_index(store.index.index)
+    labels = faiss_labels(store.index)
+    for row in rng.choice(len(labels), 50, replace=False):
+        np.testing.assert_allclose(inner.reconstruct(int(row)), vectors[int(labels[row])], atol=1e-5)
+    probe = [int(label) for label in rng.choice(labels, 20, replace=False)]
+    assert _search_all(store, np.vstack([vectors[label] for label in probe]), 1).tolist() == probe
@@ -0,0 +1,94 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from utils.rag_bm25 import BM25_B, BM25_K1, Bm25Index, document_text, tokenize, write_bm25
+from utils.rag_hybrid import rrf_fuse
+
+N_DOCS = 3000
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    """Korpus Zipf: term umum muncul hampir di semua chunk, term langka di segelintir."""
+    rng = np.random.default_rng(3)
+    vocab = [f"kata{i}" for i in range(2000)]
+    weights = 1.0 / np.arange(1, len(vocab) + 1)
+    weights /= weights.sum()
+    docs = [
+        Document(page_content=" ".join(rng.choice(vocab, size=int(rng.integers(20, 120)), p=weights)),
+                 metadata={"post_id": row, "chunk_index": 0})
+        for row in range(N_DOCS)
+    ]
+    path = tmp_path_factory.mktemp("bm25")
+    write_bm25(path, docs)
+    return docs, Bm25Index(path)
+
+
+def _exhaustive(docs, query: str) -> dict[int, float]:
+    """BM25 referensi langsung dari teks (tanpa index, tanpa pemotongan posting)."""
+    counts = [Counter(tokenize(document_text(d))) for d in docs]
+    avgdl = sum(sum(c.values()) for c in counts) / len(counts)
+    scores: dict[int, float] = {}
+    for term in set(tokenize(query)):
+        df = sum(term in c for c in counts)
+        idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+        for row, c in enumerate(counts):
+            if term in c:
+                tf, dl = c[term], sum(c.values())
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * dl / avgdl)
+                scores[row] = scores.get(row, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return scores
+
+
+@pytest.mark.parametrize("query", ["kata1500 kata1800", "kata0 kata1 kata900", "kata0 kata2 kata3 kata1200"])
+def test_uncapped_search_matches_exhaustive_bm25(corpus, query):
+    docs, bm25 = corpus
+    expected = _exhaustive(docs, query)
+    hits = bm25.search(query, 10, term_cap=N_DOCS)
+    top = sorted(expected.values(), reverse=True)[:10]
+    np.testing.assert_allclose([score for _, score in hits], top, rtol=5e-3)
+    for row, score in hits:
+        assert expected[row] == pytest.approx(score, rel=5e-3)
+
+
+@pytest.mark.parametrize("query", ["kata0 kata900", "kata0 kata1 kata2 kata700", "kata3 kata5 kata1100", "kata8 kata20"])
+@pytest.mark.parametrize("term_cap", [8, 256])
+def test_early_terminated_top_k_matches_exhaustive(corpus, query, term_cap):
+    docs, bm25 = corpus
+    exact = bm25.search(query, 10, term_cap=N_DOCS)
+    capped = bm25.search(query, 10, term_cap=term_cap)
+    np.testing.assert_allclose([s for _, s in capped], [s for _, s in exact], rtol=1e-3)
+    assert {row for row, _ in capped} == {row for row, _ in exact}
+
+
+def test_rows_restrict_candidates_before_the_cap(corpus):
+    _, bm25 = corpus
+    rows = np.arange(N_DOCS - 100, N_DOCS)
+    hits = bm25.search("kata0 kata1", 10, term_cap=8, rows=rows)
+    assert len(hits) == 10 and all(row >= N_DOCS - 100 for row, _ in hits)
+
+
+def _doc(post_id: int, chunk: int = 0) -> Document:
+    return Document(page_content=f"{post_id}-{chunk}", metadata={"post_id": post_id, "chunk_index": chunk})
+
+
+def test_rrf_prefers_agreement_over_a_single_first_place():
+    vector = [_doc(1), _doc(2), _doc(3)]
+    keyword = [_doc(4), _doc(2)]
+    fused = rrf_fuse([(vector, 1.0), (keyword, 1.0)], k=4, rrf_k=60)
+    # 2/62 > 1/61: peringkat 2 di kedua daftar mengalahkan juara satu daftar saja
+    assert [d.metadata["post_id"] for d in fused] == [2, 1, 4, 3]
+
+
+def test_rrf_weight_and_dedupe_by_chunk():
+    vector = [_doc(1), _doc(2)]
+    keyword = [_doc(3), _doc(1, chunk=1)]
+    fused = rrf_fuse([(vector, 1.0), (keyword, 2.0)], k=10, rrf_k=60)
+    keys = [(d.metadata["post_id"], d.metadata["chunk_index"]) for d in fused]
+    assert keys == [(3, 0), (1, 1), (1, 0), (2, 0)]
+    assert len(rrf_fuse([(vector, 1.0), (vector, 1.0)], k=10)) == 2
+    assert len(rrf_fuse([(vector, 1.0), (keyword, 1.0)], k=2)) == 2
@@ -0,0 +1,92 @@
+"""Ekstraksi incremental `wp_posts` (utils/rag_wp_source.py) pada SQLite in-memory."""
+
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.rag_wp_source import fetch_changes, fetch_posts, high_water_mark
+
+T0 = datetime(2020, 1, 1)
+N_POSTS = 2000
+BODY_CHARS = 4000
+
+
+def _ts(minutes: int) -> str:
+    return str(T0 + timedelta(minutes=minutes))
+
+
+def _body_bytes(rows) -> int:
+    return sum(len(r["post_content"].encode("utf-8")) for r in rows)
+
+
+@pytest.fixture
+def wp_conn():
+    """Tabel `wp_posts` tiruan: tiap post ke-10 draft, tiap post ke-25 page."""
+    random.seed(7)
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """CREATE TABLE wp_posts (
+            ID INTEGER PRIMARY KEY, post_title TEXT, post_content TEXT, post_date TEXT,
+            post_modified TEXT, post_status TEXT, post_type TEXT)"""
+    )
+    body = ("<p>Isi artikel dummy tentang Laravel, HTMX, dan AI.</p>" * (BODY_CHARS // 50 + 1))[:BODY_CHARS]
+    rows = []
+    for i in range(1, N_POSTS + 1):
+        status = "publish" if i % 10 else "draft"
+        ptype = "post" if i % 25 else "page"
+        rows.append((i, f"Post {i}", f"{body} #{i}", _ts(i), _ts(i + random.randint(0, 5)), status, ptype))
+    conn.executemany("INSERT INTO wp_posts VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_full_build_returns_only_published_posts(wp_conn):
+    rows = fetch_posts(wp_conn)
+    assert {r["ID"] for r in rows} == {i for i in range(1, N_POSTS + 1) if i % 10 and i % 25}
+
+
+def test_incremental_build_returns_exactly_the_changed_and_removed_posts(wp_conn):
+    rows = fetch_posts(wp_conn)
+    indexed = {r["ID"] for r in rows}
+    mark = high_water_mark(rows)
+
+    published = sorted(indexed)
+    edited = set(random.sample(published, 20))
+    unpublished = set(random.sample(sorted(set(published) - edited), 5))
+    hard_deleted = set(random.sample(sorted(set(published) - edited - unpublished), 5))
+    later = N_POSTS + 100
+    for pid in edited:
+        wp_conn.execute("UPDATE wp_posts SET post_content = post_content || ' (edit)', post_modified = ? WHERE ID = ?",
+                        (_ts(later), pid))
+    for pid in unpublished:
+        wp_conn.execute("UPDATE wp_posts SET post_status = 'draft', post_modified = ? WHERE ID = ?", (_ts(later), pid))
+    wp_conn.executemany("DELETE FROM wp_posts WHERE ID = ?", [(pid,) for pid in hard_deleted])
+    new_ids = {N_POSTS + i for i in range(1, 11)}
+    wp_conn.executemany(
+        "INSERT INTO wp_posts VALUES (?, ?, ?, ?, ?, 'publish', 'post')",
+        [(pid, f"Post {pid}", f"Baru {pid}", _ts(later), _ts(later)) for pid in new_ids],
+    )
+    # post terjadwal: ID lama (draft), publish belakangan tanpa post_modified baru
+    scheduled = next(pid for pid in range(10, N_POSTS, 10) if pid % 25)
+    wp_conn.execute("UPDATE wp_posts SET post_status = 'publish' WHERE ID = ?", (scheduled,))
+    # edit di detik yang sama dengan mark, ID lebih kecil dari max_id
+    same_second = next(r["ID"] for r in rows if r["ID"] not in edited | unpublished | hard_deleted)
+    wp_conn.execute("UPDATE wp_posts SET post_content = 'edit di detik yang sama', post_modified = ? WHERE ID = ?",
+                    (mark["post_modified"], same_second))
+    wp_conn.commit()
+
+    changed, deleted = fetch_changes(wp_conn, mark, indexed)
+    got = {r["ID"] for r in changed}
+    expected = edited | new_ids | {scheduled, same_second}
+
+    assert expected <= got, f"post berubah tidak terambil: {sorted(expected - got)}"
+    assert deleted == unpublished | hard_deleted
+    # baris di detik yang sama dengan mark boleh terambil ulang (disaring content hash)
+    assert all(r["post_modified"] == mark["post_modified"] for r in changed if r["ID"] in got - expected)
+    new_mark = high_water_mark(changed, mark)
+    assert new_mark["max_id"] == max(new_ids) and new_mark["post_modified"] == _ts(later)
+    # body HTML yang ditarik jauh lebih kecil dari build penuh
+    assert _body_bytes(changed) * 50 < _body_bytes(rows)
@@ -0,0 +1,208 @@
+"""
+bench_ask_load.py — Load test /ask untuk satu worker
+----------------------------------------------------
+- Menyalakan `utils/fake_openai_server.py` dengan latency buatan.
+- Membuat FAISS index kecil (embedding palsu) di direktori sementara.
+- Menyalakan `app.rag_fastapi:app` dengan 1 worker uvicorn yang diarahkan
+  ke server palsu (OPENAI_BASE_URL) dan index sementara (FAISS_INDEX_PATH).
+- Menembak /ask dengan beberapa level concurrency, lalu melaporkan
+  throughput, latency p50/p95, dan concurrency efektif (Little's law).
+- `--stream` menembak /ask/stream dan menambahkan time-to-first-byte (TTFB).
+
+Jalankan:
+    uv run python utils/bench_ask_load.py --latency-ms 300 --levels 1 8 32 64 128
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+SAMPLE_QUESTIONS = [
+    "Apa itu HTMX?",
+    "Framework ringan apa yang dibahas di mkhuda.com?",
+    "Tips pakai Alpine.js untuk interaksi web?",
+    "Ada artikel tentang PHP modern?",
+    "Bagaimana cara membuat video dengan veo?",
+]
+
+
+def _wait_until_up(url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    raise RuntimeError(f"❌ Server tidak merespons: {url}")
+
+
+def _build_tiny_index(index_dir: Path, base_url: str, n_docs: int):
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+    from langchain_openai import OpenAIEmbeddings
+
+    from utils.rag_chunking import chunk_documents
+    from utils.rag_doc_store import save_faiss
+
+    emb = OpenAIEmbeddings(
+        model="text-embedding-3-small", api_key="fake", base_url=base_url,
+        check_embedding_ctx_length=False,
+    )
+    docs = [
+        Document(
+            page_content=" ".join(f"Paragraf {j} artikel dummy #{i} tentang web development, AI, dan HTMX." for j in range(20)),
+            metadata={"title": f"Artikel {i}", "url": f"https://mkhuda.com/?p={i}", "date": "2024-07-01 10:00:00"},
+        )
+        for i in range(n_docs)
+    ]
+    save_faiss(index_dir, FAISS.from_documents(chunk_documents(docs), emb))
+
+
+async def _post(client: httpx.AsyncClient, url: str, message: str, stream: bool) -> float | None:
+    """Kirim satu request; untuk stream kembalikan waktu sampai token pertama."""
+    if not stream:
+        r = await client.post(url, json={"message": message})
+        r.raise_for_status()
+        return None
+    t0 = time.perf_counter()
+    ttfb = None
+    async with client.stream("POST", url, json={"message": message}) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if ttfb is None and line.strip():
+                ttfb = time.perf_counter() - t0
+    return ttfb
+
+
+async def _run_level(client: httpx.AsyncClient, url: str, concurrency: int, total: int, stream: bool = False):
+    latencies: list[float] = []
+    ttfbs: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            t0 = time.perf_counter()
+            try:
+                ttfb = await _post(client, url, SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)], stream)
+                latencies.append(time.perf_counter() - t0)
+                if ttfb is not None:
+                    ttfbs.append(ttfb)
+            except httpx.HTTPError:
+                errors += 1
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t_start
+    return latencies, ttfbs, errors, elapsed
+
+
+async def _bench(api_url: str, levels: list[int], per_level: int, stream: bool = False):
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        path = "/ask/stream" if stream else "/ask"
+        ttfb_header = f" {'ttfb p50':>9} {'ttfb p95':>9}" if stream else ""
+        print(f"{'conc':>5} {'req':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'eff.conc':>9}{ttfb_header}")
+        for c in levels:
+            total = max(per_level, c * 2)
+            lat, ttfbs, errors, elapsed = await _run_level(client, f"{api_url}{path}", c, total, stream)
+            if not lat:
+                print(f"{c:>5} {total:>5} {errors:>4}  (semua request gagal)")
+                continue
+            rps = len(lat) / elapsed
+            lat_ms = sorted(x * 1000 for x in lat)
+            p50 = statistics.median(lat_ms)
+            p95 = lat_ms[int(0.95 * (len(lat_ms) - 1))]
+            # Little's law: request yang benar-benar dilayani bersamaan oleh worker
+            eff = rps * statistics.mean(lat)
+            ttfb_cols = ""
+            if ttfbs:
+                ttfb_ms = sorted(x * 1000 for x in ttfbs)
+                ttfb_cols = f" {statistics.median(ttfb_ms):>9.0f} {ttfb_ms[int(0.95 * (len(ttfb_ms) - 1))]:>9.0f}"
+            print(f"{c:>5} {total:>5} {errors:>4} {rps:>8.1f} {p50:>8.0f} {p95:>8.0f} {eff:>9.1f}{ttfb_cols}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /ask terhadap fake OpenAI server.")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 64, 128])
+    parser.add_argument("--per-level", type=int, default=64, help="minimal jumlah request per level")
+    parser.add_argument("--docs", type=int, default=200, help="jumlah dokumen dummy di index")
+    parser.add_argument("--fake-port", type=int, default=8100)
+    parser.add_argument("--api-port", type=int, default=8101)
+    parser.add_argument("--serial", action="store_true",
+                        help="matikan speculative retrieval (pre-reasoning → retrieval berurutan)")
+    parser.add_argument("--router", choices=["local", "llm"], default="llm",
+                        help="INTENT_ROUTER untuk API (embedding palsu membuat keputusan 'local' acak)")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="aktifkan semantic answer cache (default mati supaya pipeline penuh yang diukur)")
+    parser.add_argument("--stream", action="store_true", help="ukur /ask/stream (termasuk TTFB)")
+    args = parser.parse_args()
+
+    fake_base = f"http://127.0.0.1:{args.fake_port}/v1"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    procs: list[subprocess.Popen] = []
+    try:
+        print(f"🧪 Fake OpenAI server (latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms)…")
+        procs.append(subprocess.Popen([
+            sys.executable, str(BASE_DIR / "utils" / "fake_openai_server.py"),
+            "--port", str(args.fake_port),
+            "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        ]))
+        _wait_until_up(f"http://127.0.0.1:{args.fake_port}/docs")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            index_dir = Path(tmp) / "faiss_index"
+            print(f"🧱 Membangun index dummy ({args.docs} dokumen)…")
+            _build_tiny_index(index_dir, fake_base, args.docs)
+
+            env = {
+                **os.environ,
+                "OPENAI_API_KEY": "fake",
+                "OPENAI_BASE_URL": fake_base,
+                "OPENAI_API_BASE": fake_base,
+                "FAISS_INDEX_PATH": str(index_dir),
+                "MODE": "development",
+                "SPECULATIVE_RETRIEVAL": "0" if args.serial else "1",
+                "INTENT_ROUTER": args.router,
+                "ANSWER_CACHE": "1" if args.answer_cache else "0",
+                "EMBED_CACHE_PATH": "",
+            }
+            mode = "serial" if args.serial else "speculative"
+            print(f"🚀 Menyalakan API (1 worker, retrieval {mode}, router {args.router})…")
+            procs.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.rag_fastapi:app",
+                 "--port", str(args.api_port), "--workers", "1", "--log-level", "warning"],
+                cwd=str(BASE_DIR), env=env,
+            ))
+            _wait_until_up(f"{api_url}/")
+            asyncio.run(_bench(api_url, args.levels, args.per_level, args.stream))
+    finally:
+        for p in procs:
+            p.terminate()
+            p.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+bench_bm25.py — Waktu build, ukuran disk & latensi query index BM25 (utils/rag_bm25.py)
+--------------------------------------------------------------------------------------
+- Dokumen diambil dari versi index aktif (`--index`, docstore kolumnar) atau
+  korpus sintetis (`--docs`) dengan kosakata Zipf + nama produk langka.
+- Mengukur:
+  • waktu `write_bm25` (yang dijalankan `save_faiss` di tiap build) & ukuran file bm25.*
+  • latensi `Bm25Index.search` per query (p50/p99) — query = 1–4 term acak dari
+    dokumen, atau pertanyaan dari `--queries`
+  • sanity kata kunci: query berisi satu term langka (df ≤ 20) harus mengembalikan
+    dokumen yang memang memuat term itu di posisi teratas.
+
+Jalankan:
+    uv run python utils/bench_bm25.py --docs 100000
+    uv run python utils/bench_bm25.py --index mkhuda_faiss_index --queries my_questions.txt
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.rag_bm25 import Bm25Index, document_text, tokenize, write_bm25
+
+PRODUCTS = ["alpine.js", "htmx", "veo", "node-red", "laravel", "livewire", "supabase", "tailwind", "pocketbase"]
+
+
+def synthetic_docs(n: int, seed: int) -> list[Document]:
+    rng = random.Random(seed)
+    vocab = [f"kata{i}" for i in range(30000)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocab))))
+    docs = []
+    for i in range(n):
+        words = rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(60, 90))
+        if rng.random() < 0.002:
+            words.insert(rng.randrange(len(words)), rng.choice(PRODUCTS))
+        docs.append(Document(page_content=" ".join(words), metadata={"title": f"Artikel {i // 6}"}))
+    return docs
+
+
+def index_docs(index_dir: Path) -> list[Document]:
+    from utils.rag_doc_store import ColumnarDocstore
+    from utils.rag_index_store import current_index_dir
+
+    store = ColumnarDocstore(current_index_dir(index_dir))
+    return [store.document(row) for row in range(store.count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark index BM25.")
+    parser.add_argument("--index", type=Path, help="direktori mkhuda_faiss_index (default: korpus sintetis)")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=Path, help="file pertanyaan, satu per baris")
+    parser.add_argument("--n-queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    docs = index_docs(args.index) if args.index else synthetic_docs(args.docs, args.seed)
+    print(f"📄 {len(docs)} dokumen ({'index ' + str(args.index) if args.index else 'sintetis'})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        postings = write_bm25(Path(tmp), docs)
+        build_s = time.perf_counter() - t0
+        size_mb = sum(f.stat().st_size for f in Path(tmp).glob("bm25.*")) / 1e6
+        t0 = time.perf_counter()
+        bm25 = Bm25Index(Path(tmp))
+        open_ms = (time.perf_counter() - t0) * 1000
+        print(f"🏗️ build {build_s:.1f} s ({len(docs) / build_s:.0f} dok/s), {postings} posting, "
+              f"{size_mb:.1f} MB di disk, open {open_ms:.1f} ms")
+
+        rng = random.Random(args.seed)
+        if args.queries:
+            queries = [q.strip() for q in args.queries.read_text(encoding="utf-8").splitlines() if q.strip()]
+        else:
+            token_docs = [tokenize(document_text(d)) for d in rng.sample(docs, min(len(docs), 5000))]
+            token_docs = [t for t in token_docs if t]
+            queries = [" ".join(rng.sample(t, min(len(t), rng.randint(1, 4)))) for t in rng.choices(token_docs, k=args.n_queries)]
+        for q in queries[:50]:
+            bm25.search(q, args.k)  # pemanasan page cache
+        latencies = []
+        for q in queries:
+            t0 = time.perf_counter()
+            bm25.search(q, args.k)
+            latencies.append(time.perf_counter() - t0)
+        lat = np.array(latencies) * 1000
+        print(f"⏱️ {len(queries)} query: p50 {np.percentile(lat, 50):.3f} ms, p99 {np.percentile(lat, 99):.3f} ms, "
+              f"maks {lat.max():.3f} ms")
+
+        df: dict[str, list[int]] = {}
+        for row, doc in enumerate(docs):
+            for term in set(tokenize(document_text(doc))):
+                if term in df and len(df[term]) > 20:
+                    continue
+                df.setdefault(term, []).append(row)
+        rare = [(t, rows) for t, rows in df.items() if len(rows) <= 20]
+        sample = rng.sample(rare, min(len(rare), 500))
+        ok = sum(
+            all(row in set(rows) for row, _ in bm25.search(term, min(args.k, len(rows))))
+            for term, rows in sample
+        )
+        print(f"🔑 Term langka (df ≤ 20): {ok}/{len(sample)} query hanya mengembalikan dokumen yang memuat term-nya")
+
+
+if __name__ == "__main__":
+    main()
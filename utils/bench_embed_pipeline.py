@@ -0,0 +1,126 @@
+"""
+bench_embed_pipeline.py — Benchmark embedding builder: batch berurutan vs pipeline paralel
+-----------------------------------------------------------------------------------------
+- Menyalakan `utils/fake_openai_server.py` dengan latency buatan, latency per
+  token, dan batas request bersamaan (di atasnya dijawab 429).
+- Membandingkan:
+  • `sequential`: cara lama builder — `add_documents` per 16 dokumen, berurutan
+  • `pipeline`  : utils/rag_embed_pipeline.py (batch per token, N request
+                  in-flight, concurrency adaptif saat 429, satu insert FAISS)
+- Melaporkan waktu total, dokumen/detik, jumlah request, dan jumlah 429.
+
+Jalankan:
+    uv run python utils/bench_embed_pipeline.py --docs 2000 --concurrency 1 4 8 16
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.bench_ask_load import _wait_until_up
+
+
+def _synthetic_docs(n_docs: int, chars: int):
+    from langchain_core.documents import Document
+
+    filler = "Potongan artikel dummy tentang HTMX, Laravel, dan AI tools untuk benchmark embedding. "
+    return [
+        Document(
+            page_content=f"#{i} " + (filler * (chars // len(filler) + 1))[:chars],
+            metadata={"title": f"Artikel {i}", "url": f"https://mkhuda.com/?p={i}"},
+        )
+        for i in range(n_docs)
+    ]
+
+
+def _rate_limited(fake_url: str) -> int:
+    return httpx.get(f"{fake_url}/fake/stats").json()["rate_limited"]
+
+
+def _bench_sequential(docs, fake_url: str, batch: int = 16):
+    from langchain_community.vectorstores import FAISS
+    from langchain_openai import OpenAIEmbeddings
+
+    emb = OpenAIEmbeddings(model="text-embedding-3-small", api_key="fake", base_url=f"{fake_url}/v1", max_retries=8)
+    vs = None
+    t0 = time.perf_counter()
+    for i in range(0, len(docs), batch):
+        if vs is None:
+            vs = FAISS.from_documents(docs[i : i + batch], emb)
+        else:
+            vs.add_documents(docs[i : i + batch])
+    return time.perf_counter() - t0, (len(docs) + batch - 1) // batch, vs.index.ntotal
+
+
+def _bench_pipeline(docs, fake_url: str, concurrency: int, batch_tokens: int):
+    from langchain_openai import OpenAIEmbeddings
+    from openai import AsyncOpenAI
+
+    from utils.rag_embed_pipeline import add_to_faiss, embed_texts
+
+    emb = OpenAIEmbeddings(model="text-embedding-3-small", api_key="fake", base_url=f"{fake_url}/v1")
+    client = AsyncOpenAI(api_key="fake", base_url=f"{fake_url}/v1", max_retries=0)
+    t0 = time.perf_counter()
+    vectors, stats = embed_texts(
+        [d.page_content for d in docs], client=client, concurrency=concurrency, max_batch_tokens=batch_tokens
+    )
+    vs = add_to_faiss(None, docs, vectors, emb)
+    return time.perf_counter() - t0, stats, vs.index.ntotal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline embedding terhadap fake OpenAI server.")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--chars", type=int, default=500, help="panjang tiap dokumen/chunk")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--batch-tokens", type=int, default=8000, help="EMBED_BATCH_TOKENS untuk pipeline")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--embed-ms-per-1k", type=float, default=20.0)
+    parser.add_argument("--max-inflight", type=int, default=6, help="di atas ini server palsu menjawab 429")
+    parser.add_argument("--fake-port", type=int, default=8110)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    print(f"🧪 Fake OpenAI server (latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+          f"+{args.embed_ms_per_1k:.0f} ms/1k token, 429 di atas {args.max_inflight} in-flight)…")
+    fake = subprocess.Popen([
+        sys.executable, str(BASE_DIR / "utils" / "fake_openai_server.py"), "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--embed-ms-per-1k", str(args.embed_ms_per_1k), "--max-inflight", str(args.max_inflight),
+    ])
+    try:
+        _wait_until_up(f"{fake_url}/docs")
+        os.environ.setdefault("OPENAI_API_KEY", "fake")
+        docs = _synthetic_docs(args.docs, args.chars)
+        print(f"📄 {len(docs)} dokumen × {args.chars} karakter\n")
+        print(f"{'mode':>12} {'conc':>5} {'waktu s':>8} {'dok/s':>8} {'request':>8} {'429':>5} {'conc akhir':>10}")
+
+        if not args.skip_sequential:
+            before = _rate_limited(fake_url)
+            elapsed, requests, n = _bench_sequential(docs, fake_url)
+            print(f"{'sequential':>12} {1:>5} {elapsed:>8.2f} {n / elapsed:>8.1f} {requests:>8} "
+                  f"{_rate_limited(fake_url) - before:>5} {'-':>10}")
+
+        for c in args.concurrency:
+            before = _rate_limited(fake_url)
+            elapsed, stats, n = _bench_pipeline(docs, fake_url, c, args.batch_tokens)
+            print(f"{'pipeline':>12} {c:>5} {elapsed:>8.2f} {n / elapsed:>8.1f} {stats['requests']:>8} "
+                  f"{_rate_limited(fake_url) - before:>5} {stats['final_concurrency']:>10}")
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+bench_faiss_index.py — Recall@k, QPS & ukuran disk tiap tipe index FAISS
+-----------------------------------------------------------------------
+- Vektor diambil dari index FAISS yang aktif (`--index`, direkonstruksi dari
+  index di dalam IndexIDMap2) atau dibuat sintetis: cluster di ruang laten
+  berdimensi rendah yang diproyeksikan ke `--dim` (`--vectors`).
+- Query = vektor yang ditahan di luar index (`--queries`), jadi tidak ada yang
+  persis sama dengan isi index.
+- Tiap tipe di utils/rag_index_factory.py dibangun lewat `build_index` (training
+  dari vektor yang sama seperti builder) lalu diukur:
+  • waktu build (train + add)
+  • recall@k terhadap Flat (ground truth exact)
+  • QPS satu query per panggilan (pola API) dan latensi p50
+  • ukuran index.faiss (`faiss.serialize_index`)
+  IVF diuji untuk beberapa `nprobe`, HNSW untuk beberapa `efSearch`.
+
+Jalankan:
+    uv run python utils/bench_faiss_index.py --vectors 50000 --k 5
+    uv run python utils/bench_faiss_index.py --index mkhuda_faiss_index --types flat hnsw ivf-flat
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.rag_index_factory import (
+    INDEX_TYPES, MIN_VECTORS, build_index, configure_search, factory_string, resolve_index_type,
+)
+
+
+def synthetic_vectors(n: int, dim: int, seed: int, latent_dim: int = 64) -> np.ndarray:
+    """
+    Cluster di ruang laten berdimensi rendah yang diproyeksikan ke `dim` + sedikit
+    noise, lalu dinormalisasi. Embedding teks punya dimensi intrinsik jauh di bawah
+    1536; noise isotropik penuh membuat semua tetangga nyaris berjarak sama.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = max(8, n // 200)
+    centers = rng.standard_normal((n_clusters, latent_dim))
+    latent = centers[rng.integers(0, n_clusters, n)] + 0.6 * rng.standard_normal((n, latent_dim))
+    projection = rng.standard_normal((latent_dim, dim)) / np.sqrt(latent_dim)
+    x = (latent @ projection + 0.05 * rng.standard_normal((n, dim))).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def index_vectors(index_dir: Path) -> np.ndarray:
+    from utils.rag_index_store import current_index_dir
+
+    index = faiss.read_index(str(current_index_dir(index_dir) / "index.faiss"))
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    return inner.reconstruct_n(0, inner.ntotal)
+
+
+def _search_all(index, queries: np.ndarray, k: int) -> tuple[np.ndarray, list[float]]:
+    labels, latencies = np.empty((len(queries), k), dtype="int64"), []
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        _, labels[i] = index.search(q[None, :], k)
+        latencies.append(time.perf_counter() - t0)
+    return labels, latencies
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tipe index FAISS.")
+    parser.add_argument("--index", type=Path, help="direktori mkhuda_faiss_index (default: vektor sintetis)")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.index:
+        data = index_vectors(args.index)
+        print(f"📂 {len(data)} vektor dari {args.index}")
+    else:
+        data = synthetic_vectors(args.vectors + args.queries, args.dim, args.seed)
+        print(f"🧪 {args.vectors} vektor sintetis (dim {args.dim})")
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(data))
+    queries = np.ascontiguousarray(data[order[: args.queries]])
+    base = np.ascontiguousarray(data[order[args.queries :]])
+    labels = np.arange(len(base), dtype="int64")
+    n, dim = base.shape
+
+    rows = []
+    truth = None
+    for index_type in ["flat"] + [t for t in args.types if t != "flat"]:
+        built = resolve_index_type(index_type, n)
+        if built != index_type:
+            print(f"⏭️ {index_type}: butuh ≥ {MIN_VECTORS[index_type]} vektor (builder akan memakai flat)")
+            continue
+        print(f"🏗️ {factory_string(index_type, dim, n)} …")
+        t0 = time.perf_counter()
+        index = build_index(base, labels, index_type)
+        build_s = time.perf_counter() - t0
+        size_mb = len(faiss.serialize_index(index)) / 1e6
+        if index_type.endswith(("ivf-flat", "ivf-pq")):
+            settings = [("nprobe", v, {"nprobe": v}) for v in args.nprobe]
+        elif index_type == "hnsw":
+            settings = [("efSearch", v, {"ef_search": v}) for v in args.ef_search]
+        else:
+            settings = [("", "", {})]
+        for name, value, params in settings:
+            configure_search(index, **params)
+            found, latencies = _search_all(index, queries, args.k)
+            if truth is None:
+                truth = found
+            rows.append((
+                factory_string(index_type, dim, n), f"{name}={value}" if name else "-", build_s,
+                _recall(found, truth), len(queries) / sum(latencies), np.median(latencies) * 1000, size_mb,
+            ))
+
+    print(f"\n{'index':>26} {'param':>12} {'build s':>8} {f'recall@{args.k}':>9} {'QPS':>8} {'p50 ms':>7} {'disk MB':>8}")
+    for desc, param, build_s, recall, qps, p50, size_mb in rows:
+        print(f"{desc:>26} {param:>12} {build_s:>8.1f} {recall:>9.3f} {qps:>8.0f} {p50:>7.2f} {size_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+bench_html_clean.py — Benchmark pembersih HTML builder: implementasi lama vs utils/rag_html_clean.py
+-------------------------------------------------------------------------------------------------
+- Membuat korpus sintetis post WordPress (blok Gutenberg: paragraf, heading,
+  list, kode dengan entity, gambar, tabel, shortcode, sebagian berisi
+  `<script>`/`<style>`).
+- Membandingkan throughput:
+  • `legacy`         : regex shortcode + BeautifulSoup html.parser, satu core
+  • `<backend>`      : clean_html() per backend yang terpasang, satu core
+  • `<backend> ×N`   : clean_stream() dengan ProcessPoolExecutor N worker
+- Mengecek kesetaraan keluaran terhadap implementasi lama (whitespace
+  dinormalisasi; isi script/style memang sengaja dibuang).
+
+Jalankan:
+    uv run python utils/bench_html_clean.py --posts 10000 --workers 4 8
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.rag_html_clean import DROP_TAGS, available_backends, clean_html, clean_stream
+
+WORDS = ("laravel htmx python faiss embedding docker nginx deploy server cache query "
+         "artikel tutorial contoh kode fungsi variabel database index vektor model").split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def _block(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.45:
+        body = " ".join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+        return f'<!-- wp:paragraph -->\n<p>{body} <a href="https://mkhuda.com/">tautan</a> &amp; <em>lagi</em>.</p>\n<!-- /wp:paragraph -->'
+    if kind < 0.55:
+        return f'<!-- wp:heading {{"level":2}} -->\n<h2 class="wp-block-heading">{_sentence(rng)}</h2>\n<!-- /wp:heading -->'
+    if kind < 0.65:
+        items = "".join(f"<li>{_sentence(rng)}</li>" for _ in range(rng.randint(2, 6)))
+        return f"<!-- wp:list -->\n<ul>{items}</ul>\n<!-- /wp:list -->"
+    if kind < 0.75:
+        return ('<!-- wp:code -->\n<pre class="wp-block-code"><code>if ($a &lt; $b &amp;&amp; $c &gt; 0) {\n'
+                '    return $items[0];\n}</code></pre>\n<!-- /wp:code -->')
+    if kind < 0.82:
+        return ('<!-- wp:image {"id":12,"sizeSlug":"large"} -->\n<figure class="wp-block-image size-large">'
+                f'<img src="/x.png" alt=""/><figcaption>{_sentence(rng)}</figcaption></figure>\n<!-- /wp:image -->')
+    if kind < 0.88:
+        rows = "".join(f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(1, 99)}</td></tr>" for _ in range(4))
+        return f"<!-- wp:table -->\n<figure class=\"wp-block-table\"><table><tbody>{rows}</tbody></table></figure>\n<!-- /wp:table -->"
+    if kind < 0.94:
+        return f'[caption id="attachment_1" align="alignnone"]{_sentence(rng)}[/caption] [gallery ids="1,2,3"]'
+    return "<p>Teks&nbsp;dengan&nbsp;nbsp dan <strong>tebal</strong><br/>baris baru</p>"
+
+
+def synthetic_posts(n: int, blocks: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    posts = []
+    for i in range(n):
+        html = "\n\n".join(_block(rng) for _ in range(rng.randint(blocks // 2, blocks)))
+        if i % 20 == 0:
+            html = f"<style>.wp-block{{color:red}}</style>\n{html}\n<script>window.ga=function(){{}};</script>"
+        posts.append(html)
+    return posts
+
+
+def legacy_clean_html(text: str) -> str:
+    """Implementasi lama yang dulu diduplikasi di keempat builder."""
+    from bs4 import BeautifulSoup
+
+    text = re.sub(r"\[.*?\]", "", text)
+    return BeautifulSoup(text or "", "html.parser").get_text().strip()
+
+
+_DROP_RE = re.compile(rf"<({'|'.join(DROP_TAGS)})\b[^>]*>.*?</\1>", re.S)
+
+
+def _comparable(text: str) -> str:
+    return " ".join(text.split())
+
+
+def check_equivalence(posts: list[str], outputs: list[str]) -> tuple[int, str | None]:
+    """Bandingkan dengan implementasi lama (script/style dibuang dari referensi)."""
+    mismatches, example = 0, None
+    for html, out in zip(posts, outputs):
+        expected = _comparable(legacy_clean_html(_DROP_RE.sub("", html)).replace("\xa0", " "))
+        if _comparable(out) != expected:
+            mismatches += 1
+            example = example or f"lama: {expected[:120]!r}\n     baru: {_comparable(out)[:120]!r}"
+    return mismatches, example
+
+
+def _run(label: str, fn, posts: list[str], baseline: float | None):
+    t0 = time.perf_counter()
+    outputs = fn(posts)
+    elapsed = time.perf_counter() - t0
+    rate = len(posts) / elapsed
+    speedup = f"{rate / baseline:.1f}×" if baseline else "1.0×"
+    print(f"{label:>20} {elapsed:>8.2f} {rate:>10.0f} {speedup:>8}")
+    return outputs, rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pembersih HTML builder.")
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--blocks", type=int, default=24, help="maks blok Gutenberg per post")
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    posts = synthetic_posts(args.posts, args.blocks, args.seed)
+    size_mb = sum(len(p.encode("utf-8")) for p in posts) / 1e6
+    backends = available_backends()
+    print(f"📄 {len(posts)} post sintetis ({size_mb:.1f} MB HTML); backend terpasang: {', '.join(backends)}\n")
+    print(f"{'mode':>20} {'waktu s':>8} {'post/s':>10} {'speedup':>8}")
+
+    _, baseline = _run("legacy", lambda ps: [legacy_clean_html(p) for p in ps], posts, None)
+    results = {}
+    for backend in backends:
+        results[backend], _ = _run(backend, lambda ps: [clean_html(p, backend) for p in ps], posts, baseline)
+    best = backends[0]
+    for workers in args.workers:
+        results[f"{best} ×{workers}"], _ = _run(
+            f"{best} ×{workers}",
+            lambda ps: [text for _, text in clean_stream(ps, workers=workers, backend=best)],
+            posts, baseline,
+        )
+
+    print("\n🔍 Kesetaraan keluaran vs implementasi lama (whitespace dinormalisasi, tanpa script/style):")
+    for label, outputs in results.items():
+        mismatches, example = check_equivalence(posts, outputs)
+        status = "✅ sama" if not mismatches else f"⚠️ {mismatches} berbeda"
+        print(f"   {label:>18}: {status}")
+        if example:
+            print(f"     {example}")
+    reference = results[backends[-1]]
+    same = sum(a == b for a, b in zip(results[best], reference))
+    print(f"   {best} vs {backends[-1]} (byte-per-byte): {same}/{len(posts)} identik")
+
+
+if __name__ == "__main__":
+    main()
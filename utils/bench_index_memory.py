@@ -0,0 +1,145 @@
+"""
+bench_index_memory.py — Memori per worker: FAISS pickle vs mmap
+---------------------------------------------------------------
+- Membuat index sintetis (vektor acak + teks dummy) di direktori sementara,
+  lengkap dengan index.pkl (format lama) dan docstore kolumnar (utils/rag_doc_store.py).
+- Menyalakan N proses "worker" yang masing-masing memuat index dengan mode
+  `pickle` (FAISS.load_local) atau `mmap` (load_faiss, tanpa pickle), lalu melakukan
+  pencarian + lookup dokumen supaya halaman yang dipakai benar-benar tersentuh.
+- Melaporkan waktu load, RSS dan PSS per worker (dikurangi baseline proses
+  yang hanya meng-import library). PSS membagi halaman bersama secara adil
+  antar proses, jadi total PSS ≈ memori fisik yang sebenarnya terpakai.
+
+Hanya untuk Linux (membaca /proc/<pid>/smaps_rollup). Tanpa network/OpenAI.
+
+Jalankan:
+    uv run python utils/bench_index_memory.py --docs 20000 --workers 2
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+DIM = 1536
+
+
+def _build_index(path: Path, n_docs: int, text_chars: int):
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.embeddings import FakeEmbeddings
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+
+    from utils.rag_doc_store import save_faiss
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(DIM)
+    index.add(rng.standard_normal((n_docs, DIM)).astype("float32"))
+    filler = ("Artikel dummy tentang HTMX, Laravel, dan AI tools. " * (text_chars // 50 + 1))[:text_chars]
+    docs = {
+        str(i): Document(
+            page_content=f"#{i} {filler}",
+            metadata={"title": f"Artikel {i}", "url": f"https://mkhuda.com/?p={i}", "date": "2024-07-01 10:00:00"},
+        )
+        for i in range(n_docs)
+    }
+    vs = FAISS(FakeEmbeddings(size=DIM), index, InMemoryDocstore(docs), {i: str(i) for i in range(n_docs)})
+    vs.save_local(str(path))  # index.pkl sebagai pembanding
+    save_faiss(path, vs)
+
+
+def _memory_kb(pid: int) -> tuple[int, int]:
+    rss = pss = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1])
+    return rss, pss
+
+
+def _worker(mode: str, path: str):
+    """Dijalankan di subprocess: muat index, sentuh datanya, lalu tunggu stdin ditutup."""
+    from langchain_community.embeddings import FakeEmbeddings
+    from langchain_community.vectorstores import FAISS
+
+    from utils.rag_doc_store import load_faiss
+
+    emb = FakeEmbeddings(size=DIM)
+    t0 = time.perf_counter()
+    if mode == "pickle":
+        vs = FAISS.load_local(path, emb, allow_dangerous_deserialization=True)
+    elif mode == "mmap":
+        vs = load_faiss(Path(path), emb, mmap=True)
+    else:
+        vs = None
+    load_s = time.perf_counter() - t0
+    if vs is not None:
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            vs.similarity_search_by_vector(rng.standard_normal(DIM).tolist(), k=4)
+        for i in range(0, vs.index.ntotal, 97):
+            vs.docstore.search(vs.index_to_docstore_id[i])
+    print(f"ready {load_s:.3f}", flush=True)
+    sys.stdin.read()
+
+
+def _measure(mode: str, path: Path, workers: int) -> tuple[float, list[tuple[int, int]]]:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--worker", mode, str(path)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        load_times = [float(p.stdout.readline().split()[1]) for p in procs]
+        return max(load_times), [_memory_kb(p.pid) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan memori per worker untuk FAISS pickle vs mmap.")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--text-chars", type=int, default=3000, help="panjang teks per dokumen")
+    parser.add_argument("--workers", type=int, default=2, help="jumlah worker (Dockerfile: 2)")
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "faiss_index"
+        path.mkdir()
+        print(f"🧱 Membangun index sintetis ({args.docs} dokumen × {DIM} dim, {args.text_chars} karakter/teks)…")
+        _build_index(path, args.docs, args.text_chars)
+        size_mb = sum(f.stat().st_size for f in path.iterdir()) / 2**20
+        print(f"   ukuran direktori index: {size_mb:.1f} MB\n")
+
+        _, baseline = _measure("none", path, 1)
+        base_rss, base_pss = baseline[0]
+        print(f"{'mode':>7} {'workers':>7} {'load s':>7} {'RSS/worker MB':>14} {'PSS/worker MB':>14} {'total PSS MB':>13}")
+        for mode in ("pickle", "mmap"):
+            load_s, mem = _measure(mode, path, args.workers)
+            rss = [(r - base_rss) / 1024 for r, _ in mem]
+            pss = [(p - base_pss) / 1024 for _, p in mem]
+            print(f"{mode:>7} {args.workers:>7} {load_s:>7.2f} {np.mean(rss):>14.1f} {np.mean(pss):>14.1f} {sum(pss):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
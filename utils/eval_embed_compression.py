@@ -0,0 +1,156 @@
+"""
+eval_embed_compression.py — Kualitas retrieval vs dimensi embedding (EMBED_DIMENSIONS) & codec (FAISS_VECTOR_CODEC)
+-----------------------------------------------------------------------------------------------------------------
+- Ground truth = index flat inner product float32 berdimensi penuh (index
+  sekarang). Tiap varian `--dims` × `--codecs` dibangun lewat `build_index`
+  (utils/rag_index_factory.py) dari vektor yang sama, dipotong + dinormalisasi
+  ulang seperti builder (`shorten`, utils/rag_embed_dims.py).
+- Vektor: index aktif (`--index`, harus float32 berdimensi penuh) atau sintetis
+  (`--vectors`): cluster laten yang diputar ke sumbu utamanya sehingga dimensi
+  awal membawa varians terbesar, seperti embedding Matryoshka. Angka kualitas
+  dari data sintetis hanya indikatif — ukur ulang di index asli.
+- Query: pertanyaan nyata (`--queries file.txt`, satu per baris, di-embed lewat
+  OpenAI dimensi penuh) atau chunk yang ditahan di luar index.
+- Per varian dilaporkan:
+  • recall@k chunk terhadap ground truth
+  • recall artikel: post_id di `--articles` artikel teratas (seperti RETRIEVER_K)
+  • ukuran index.faiss & byte per vektor
+  • QPS satu query per panggilan dan latensi p50
+
+Jalankan:
+    uv run python utils/eval_embed_compression.py --vectors 50000
+    uv run python utils/eval_embed_compression.py --index mkhuda_faiss_index --queries my_questions.txt
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.bench_faiss_index import synthetic_vectors
+from utils.rag_embed_dims import shorten
+from utils.rag_faiss_sync import chunk_id, faiss_labels, post_of_id
+from utils.rag_index_factory import VECTOR_CODECS, build_index, codec_of
+
+CHUNKS_PER_POST = 6  # label sintetis: ±6 chunk per artikel seperti korpus blog
+
+
+def matryoshka_like(n: int, dim: int, seed: int) -> np.ndarray:
+    """Vektor sintetis yang diputar ke sumbu utama (PCA): varians terbesar di dimensi awal."""
+    x = synthetic_vectors(n, dim, seed)
+    sample = x[np.random.default_rng(seed).choice(n, min(n, 5000), replace=False)]
+    _, _, vt = np.linalg.svd(sample - sample.mean(axis=0), full_matrices=False)
+    return np.ascontiguousarray(x @ vt.T, dtype="float32")
+
+
+def index_vectors(index_dir: Path) -> tuple[np.ndarray, np.ndarray]:
+    from utils.rag_doc_store import read_faiss_index
+    from utils.rag_index_store import current_index_dir
+
+    index = read_faiss_index(current_index_dir(index_dir), mmap=False)
+    if codec_of(index) != "float32":
+        sys.exit(f"❌ Index aktif memakai codec {codec_of(index)} — butuh vektor float32 sebagai ground truth.")
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    return inner.reconstruct_n(0, inner.ntotal), faiss_labels(index)
+
+
+def embed_questions(path: Path) -> np.ndarray:
+    from utils.rag_embed_pipeline import embed_texts
+
+    questions = [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    vectors, _ = embed_texts(questions)
+    return vectors
+
+
+def search_timed(index, queries: np.ndarray, k: int) -> tuple[np.ndarray, list[float]]:
+    labels, latencies = np.empty((len(queries), k), dtype="int64"), []
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        _, labels[i] = index.search(q[None, :], k)
+        latencies.append(time.perf_counter() - t0)
+    return labels, latencies
+
+
+def top_articles(labels: np.ndarray, n: int) -> list[list[int]]:
+    """post_id unik pertama per baris (urutan skor), seperti pengelompokan artikel di `pack_context`."""
+    result = []
+    for row in labels:
+        posts = []
+        for label in row:
+            post = post_of_id(label)
+            if label >= 0 and post not in posts:
+                posts.append(post)
+        result.append(posts[:n])
+    return result
+
+
+def overlap(found, truth) -> float:
+    return float(np.mean([len(set(f) & set(t)) / max(len(t), 1) for f, t in zip(found, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluasi embedding berdimensi kecil + kuantisasi.")
+    parser.add_argument("--index", type=Path, help="direktori mkhuda_faiss_index (default: vektor sintetis)")
+    parser.add_argument("--queries", type=Path, help="file pertanyaan, satu per baris (butuh OpenAI)")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--holdout", type=int, default=500, help="jumlah chunk yang dijadikan query")
+    parser.add_argument("--k", type=int, default=8, help="chunk per query (RETRIEVER_CHUNK_K)")
+    parser.add_argument("--articles", type=int, default=2, help="artikel per query (RETRIEVER_K)")
+    parser.add_argument("--dims", type=int, nargs="+", default=[1536, 1024, 512, 256])
+    parser.add_argument("--codecs", nargs="+", default=list(VECTOR_CODECS), choices=list(VECTOR_CODECS))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.index:
+        data, labels = index_vectors(args.index)
+        print(f"📂 {len(data)} vektor {data.shape[1]} dimensi dari {args.index}")
+    else:
+        data = matryoshka_like(args.vectors + args.holdout, args.dim, args.seed)
+        labels = np.array([chunk_id(i // CHUNKS_PER_POST, i % CHUNKS_PER_POST) for i in range(len(data))], dtype="int64")
+        print(f"🧪 {args.vectors} vektor sintetis (dim {args.dim}, varians menurun per dimensi)")
+    if args.queries:
+        base, base_labels = data, labels
+        queries = embed_questions(args.queries)
+        print(f"❓ {len(queries)} pertanyaan dari {args.queries}")
+    else:
+        order = np.random.default_rng(args.seed).permutation(len(data))
+        held, kept = order[: args.holdout], np.sort(order[args.holdout :])
+        base, base_labels, queries = data[kept], labels[kept], data[held]
+    full_dim = base.shape[1]
+
+    rows, truth = [], None
+    for dims in sorted({d for d in args.dims if d <= full_dim}, reverse=True):
+        vectors, q = shorten(base, dims), shorten(queries, dims)
+        for codec in args.codecs:
+            t0 = time.perf_counter()
+            index = build_index(vectors, base_labels, "flat", "ip", codec)
+            build_s = time.perf_counter() - t0
+            found, latencies = search_timed(index, q, args.k)
+            if truth is None:  # dimensi penuh float32 = index sekarang
+                truth = found
+            size_mb = len(faiss.serialize_index(index)) / 1e6
+            rows.append((
+                dims, codec, build_s, overlap(found, truth),
+                overlap(top_articles(found, args.articles), top_articles(truth, args.articles)),
+                size_mb, size_mb * 1e6 / len(vectors), len(q) / sum(latencies), np.median(latencies) * 1000,
+            ))
+            del index
+
+    base_mb, base_qps = rows[0][5], rows[0][7]
+    print(f"\n{'dim':>5} {'codec':>8} {'build s':>8} {f'recall@{args.k}':>9} {f'artikel@{args.articles}':>10} "
+          f"{'MB':>8} {'B/vektor':>9} {'memori':>7} {'QPS':>7} {'p50 ms':>7} {'speedup':>8}")
+    for dims, codec, build_s, recall, article_recall, size_mb, per_vector, qps, p50 in rows:
+        print(f"{dims:>5} {codec:>8} {build_s:>8.1f} {recall:>9.3f} {article_recall:>10.3f} {size_mb:>8.1f} "
+              f"{per_vector:>9.0f} {size_mb / base_mb:>6.0%} {qps:>7.0f} {p50:>7.2f} {qps / base_qps:>7.1f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+eval_intent_classifier.py — Evaluasi offline router intent lokal vs LLM
+-----------------------------------------------------------------------
+- Menjalankan `pre_reasoning()` (gpt-4o-mini) dan `LocalIntentClassifier`
+  pada daftar pertanyaan yang sama.
+- Melaporkan agreement, confusion, latency per query, token yang dihemat,
+  serta efek beberapa nilai INTENT_CONFIDENCE_THRESHOLD (berapa persen query
+  yang masih perlu fallback ke LLM).
+
+Jalankan:
+    uv run python utils/eval_intent_classifier.py                 # pertanyaan contoh bawaan
+    uv run python utils/eval_intent_classifier.py --queries q.txt # satu pertanyaan per baris
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from langchain_openai import OpenAIEmbeddings
+
+from utils.rag_pre_reasoning import pre_reasoning
+from utils.rag_intent_classifier import LocalIntentClassifier
+from utils.rag_index_store import current_index_dir
+from utils.rag_doc_store import load_faiss
+
+# Sengaja berbeda dari contoh berlabel di rag_intent_classifier.py
+DEFAULT_QUERIES = [
+    "htmx itu apa sih?",
+    "ada tutorial alpine js ga?",
+    "gimana cara pake AI buat nulis kode?",
+    "artikel terbaru apa?",
+    "bedanya laravel sama codeigniter",
+    "cara bikin video pakai veo 3",
+    "framework css yang ringan",
+    "apa itu RAG di LLM?",
+    "artikel tahun 2023 tentang javascript",
+    "tips produktivitas developer",
+    "cuaca besok hujan nggak?",
+    "bikinin pantun lucu dong",
+    "resep nasi goreng spesial",
+    "siapa pacar artis itu sekarang?",
+    "quotes motivasi buat kerja",
+    "jadwal sholat hari ini",
+    "kenapa langit berwarna biru?",
+    "skor pertandingan timnas kemarin",
+]
+
+THRESHOLDS = [0.0, 0.02, 0.04, 0.06, 0.08, 0.10]
+
+
+def _load_queries(path: str | None) -> list[str]:
+    if not path:
+        return DEFAULT_QUERIES
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan router intent lokal dengan LLM router.")
+    parser.add_argument("--queries", help="file teks, satu pertanyaan per baris")
+    parser.add_argument("--index", default=os.getenv("FAISS_INDEX_PATH", str(BASE_DIR / "mkhuda_faiss_index")))
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("❌ OPENAI_API_KEY tidak ditemukan di .env")
+
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
+    vectorstore = load_faiss(current_index_dir(args.index) or args.index, embeddings)
+    classifier = LocalIntentClassifier.from_vectorstore(vectorstore, embeddings)
+
+    queries = _load_queries(args.queries)
+    rows = []
+    for q in queries:
+        t0 = time.perf_counter()
+        llm_intent, usage = pre_reasoning(q)
+        llm_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        vec = embeddings.embed_query(q)
+        embed_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        local_intent, confidence = classifier.classify(vec)
+        local_us = (time.perf_counter() - t0) * 1_000_000
+
+        rows.append({
+            "query": q,
+            "llm": llm_intent.get("intent", "rag_search"),
+            "local": local_intent["intent"],
+            "confidence": confidence,
+            "llm_ms": llm_ms,
+            "embed_ms": embed_ms,
+            "local_us": local_us,
+            "tokens": usage.total_tokens,
+        })
+
+    print(f"\n{'query':<45} {'llm':<13} {'local':<13} {'conf':>6}")
+    for r in rows:
+        mark = " " if r["llm"] == r["local"] else "✗"
+        print(f"{r['query'][:45]:<45} {r['llm']:<13} {r['local']:<13} {r['confidence']:>6.3f} {mark}")
+
+    n = len(rows)
+    agree = sum(r["llm"] == r["local"] for r in rows)
+    print(f"\n📊 Agreement (tanpa fallback): {agree}/{n} ({agree / n:.0%})")
+    for a in ("rag_search", "out_of_scope"):
+        for b in ("rag_search", "out_of_scope"):
+            c = sum(r["llm"] == a and r["local"] == b for r in rows)
+            print(f"   llm={a:<13} local={b:<13} → {c}")
+
+    print(f"\n⏱️  LLM router   : median {statistics.median(r['llm_ms'] for r in rows):.0f} ms / query")
+    print(f"⏱️  Local router : median {statistics.median(r['local_us'] for r in rows):.1f} µs / query "
+          f"(+ embedding {statistics.median(r['embed_ms'] for r in rows):.0f} ms, dipakai ulang untuk retrieval)")
+    print(f"🪙 Token LLM router: {sum(r['tokens'] for r in rows)} total, "
+          f"{statistics.mean(r['tokens'] for r in rows):.0f} / query")
+
+    print(f"\n{'threshold':>9} {'fallback':>9} {'agree(conf)':>12} {'agree(final)':>13} {'LLM calls saved':>16}")
+    for t in THRESHOLDS:
+        confident = [r for r in rows if r["confidence"] >= t]
+        agree_conf = sum(r["llm"] == r["local"] for r in confident)
+        # query yang tidak yakin dijawab LLM → otomatis setuju dengan LLM router
+        agree_final = agree_conf + (n - len(confident))
+        conf_rate = f"{agree_conf / len(confident):.0%}" if confident else "-"
+        print(f"{t:>9.2f} {(n - len(confident)) / n:>9.0%} {conf_rate:>12} "
+              f"{agree_final / n:>13.0%} {len(confident) / n:>16.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+fake_openai_server.py — Server OpenAI palsu untuk load test & benchmark lokal
+----------------------------------------------------------------------------
+- Meniru endpoint `/v1/chat/completions` dan `/v1/embeddings` secukupnya
+  untuk openai-python, langchain-openai, dan pre-reasoning mkhuda.com.
+- Latency bisa di-inject (`--latency-ms`, `--jitter-ms`) supaya perilaku
+  concurrency API bisa diukur tanpa memanggil OpenAI sungguhan (nol token).
+- Embedding deterministik: teks yang sama → vektor yang sama (unit-length).
+- Mendukung `stream=True` (SSE) dengan jeda per token (`--token-ms`) supaya
+  time-to-first-byte endpoint streaming bisa diukur.
+- Rate limit buatan untuk `/v1/embeddings`: lebih dari `--max-inflight` request
+  bersamaan, atau secara acak dengan peluang `--rate-limit-rate`, dijawab 429 +
+  header `retry-after-ms`. `--embed-ms-per-1k` menambah latency sesuai jumlah token input.
+- Meniru prompt caching OpenAI: prefix pesan yang sama persis dengan request
+  sebelumnya (≥ 1024 token, kelipatan 128 token) dilaporkan sebagai
+  `usage.prompt_tokens_details.cached_tokens`.
+
+Jalankan:
+    uv run python utils/fake_openai_server.py --port 8100 --latency-ms 300
+lalu arahkan client via env:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_DIM = 1536
+
+app = FastAPI(title="fake-openai")
+app.state.latency_ms = 0.0
+app.state.jitter_ms = 0.0
+app.state.token_ms = 0.0
+app.state.max_inflight = 0        # 0 = tanpa batas
+app.state.rate_limit_rate = 0.0
+app.state.prompt_prefixes = set()  # hash prefix prompt yang pernah dilihat (emulasi prompt caching)
+app.state.embed_ms_per_1k = 0.0
+app.state.embed_inflight = 0
+app.state.rate_limited = 0
+
+
+async def _sleep_latency():
+    delay = app.state.latency_ms + random.uniform(0, app.state.jitter_ms)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+
+def _fake_vector(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    v = np.random.default_rng(seed).standard_normal(dim).astype("float32")
+    return v / np.linalg.norm(v)
+
+
+def _normalize_inputs(raw) -> list[str]:
+    # openai-python bisa kirim str, list[str], list[int] (token), atau list[list[int]]
+    if isinstance(raw, str):
+        return [raw]
+    if raw and isinstance(raw[0], int):
+        return [json.dumps(raw)]
+    return [x if isinstance(x, str) else json.dumps(x) for x in raw]
+
+
+def _rate_limited() -> JSONResponse:
+    app.state.rate_limited += 1
+    return JSONResponse(
+        status_code=429,
+        headers={"retry-after-ms": "200"},
+        content={"error": {"message": "Rate limit reached (fake)", "type": "requests", "code": "rate_limit_exceeded"}},
+    )
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    if (app.state.max_inflight and app.state.embed_inflight >= app.state.max_inflight) \
+            or random.random() < app.state.rate_limit_rate:
+        return _rate_limited()
+    app.state.embed_inflight += 1
+    try:
+        return await _embeddings(body)
+    finally:
+        app.state.embed_inflight -= 1
+
+
+@app.get("/fake/stats")
+async def fake_stats():
+    return {"rate_limited": app.state.rate_limited}
+
+
+async def _embeddings(body: dict):
+    await _sleep_latency()
+    inputs = _normalize_inputs(body.get("input", []))
+    dim = int(body.get("dimensions") or DEFAULT_DIM)
+    data = []
+    for i, text in enumerate(inputs):
+        vec = _fake_vector(text, dim)
+        if body.get("encoding_format") == "base64":
+            emb = base64.b64encode(vec.tobytes()).decode("ascii")
+        else:
+            emb = vec.tolist()
+        data.append({"object": "embedding", "index": i, "embedding": emb})
+    n_tokens = sum(max(1, len(t) // 4) for t in inputs)
+    if app.state.embed_ms_per_1k > 0:
+        await asyncio.sleep(app.state.embed_ms_per_1k * n_tokens / 1000 / 1000)
+    return {
+        "object": "list",
+        "data": data,
+        "model": body.get("model", "text-embedding-3-small"),
+        "usage": {"prompt_tokens": n_tokens, "total_tokens": n_tokens},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await _sleep_latency()
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        # dipakai oleh pre-reasoning (intent routing)
+        content = json.dumps({"intent": "rag_search", "message": ""})
+    else:
+        content = "Ini jawaban palsu dari **fake OpenAI server** untuk keperluan load test."
+    prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in body.get("messages", []))
+    completion_tokens = len(content) // 4
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": _cached_prefix_tokens(body)},
+    }
+    if body.get("stream"):
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+        return StreamingResponse(_stream_chunks(body, content, usage if include_usage else None),
+                                 media_type="text/event-stream")
+    return {
+        "id": f"chatcmpl-fake-{time.time_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": usage,
+    }
+
+
+def _cached_prefix_tokens(body: dict) -> int:
+    """Token prefix yang sudah pernah dikirim: mulai 1024 token, naik per 128 token (≈ 4 karakter/token)."""
+    text = "".join(f"{m.get('role')}\x00{m.get('content', '')}\x00" for m in body.get("messages", []))
+    text = f"{body.get('model')}\x00{text}"
+    cached = 0
+    for tokens in range(1024, len(text) // 4 + 1, 128):
+        digest = hashlib.sha1(text[: tokens * 4].encode("utf-8")).digest()
+        if digest in app.state.prompt_prefixes:
+            cached = tokens
+        app.state.prompt_prefixes.add(digest)
+    return cached
+
+
+async def _stream_chunks(body: dict, content: str, usage: dict | None):
+    base = {
+        "id": f"chatcmpl-fake-{time.time_ns()}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+    }
+
+    def sse(payload: dict) -> str:
+        return f"data: {json.dumps({**base, **payload})}\n\n"
+
+    yield sse({"choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+    for word in content.split(" "):
+        if app.state.token_ms > 0:
+            await asyncio.sleep(app.state.token_ms / 1000)
+        yield sse({"choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]})
+    yield sse({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+    if usage is not None:
+        yield sse({"choices": [], "usage": usage})
+    yield "data: [DONE]\n\n"
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI server dengan latency buatan.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--token-ms", type=float, default=20.0, help="jeda antar token saat stream=True")
+    parser.add_argument("--max-inflight", type=int, default=0,
+                        help="request embedding bersamaan maksimum sebelum dijawab 429 (0 = tanpa batas)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="peluang acak respons 429 untuk embedding")
+    parser.add_argument("--embed-ms-per-1k", type=float, default=0.0, help="latency tambahan per 1000 token input embedding")
+    args = parser.parse_args()
+
+    app.state.latency_ms = args.latency_ms
+    app.state.jitter_ms = args.jitter_ms
+    app.state.token_ms = args.token_ms
+    app.state.max_inflight = args.max_inflight
+    app.state.rate_limit_rate = args.rate_limit_rate
+    app.state.embed_ms_per_1k = args.embed_ms_per_1k
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -2,13 +2,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-import pickle
+import sys
+from pathlib import Path
 import faiss
-from langchain_community.vectorstores import FAISS
 from langchain_openai.embeddings import OpenAIEmbeddings
 
-# Path ke folder index-mu
-INDEX_DIR = "mkhuda_faiss_index"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.rag_index_store import current_index_dir
+from utils.rag_doc_store import load_faiss, iter_documents
+
+# Path ke folder index-mu (versi aktif dari pointer CURRENT)
+INDEX_DIR = str(current_index_dir("mkhuda_faiss_index") or "mkhuda_faiss_index")
 
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
@@ -25,16 +29,15 @@ for i in range(min(20, idx.ntotal)):
     print(f" vector #{i} first 5 dims:", v[:5])
 
 # --- 2) Load LangChain FAISS store utk metadata & text ---
-# Agar FAISS.load_local bisa jalan, perlu dummy embeddings
+# Agar load_faiss bisa jalan, perlu dummy embeddings
 dummy_emb = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
-vs = FAISS.load_local(INDEX_DIR, dummy_emb, allow_dangerous_deserialization=True)
+vs = load_faiss(INDEX_DIR, dummy_emb)
 
-# docstore di vs.docstore._dict: key=internal_id, value=Document
-docs_dict = vs.docstore._dict
-print(f"\n[LangChain FAISS] docs loaded: {len(docs_dict)}")
+# docstore kolumnar: id dokumen = nomor baris FAISS
+print(f"\n[LangChain FAISS] docs loaded: {len(vs.index_to_docstore_id)}")
 
 # print 3 sample entries
-for idx_id, doc in list(docs_dict.items())[:20]:
+for idx_id, doc in zip(range(20), iter_documents(vs)):
     print(f"\n--- ID {idx_id} ---")
     print("page_content:", doc.page_content[:200].replace("\n"," "), "…")
     print("metadata   :", doc.metadata)
@@ -0,0 +1,90 @@
+"""
+migrate_faiss_metric.py — Ubah metrik index FAISS aktif (L2 → inner product) tanpa embed ulang
+-------------------------------------------------------------------------------------------
+- Vektor dibaca dari index.faiss versi aktif, dinormalisasi, lalu dimasukkan ke
+  index bertipe sama dengan metrik `--metric` (default `FAISS_METRIC`) lewat
+  `convert_index` (utils/rag_index_factory.py). Urutan baris & label tetap,
+  jadi docstore kolumnar + sync_state.json cukup disalin.
+- Tanpa DB & tanpa OpenAI: hasilnya dipublish sebagai versi baru (pointer
+  CURRENT diganti atomik) → API hot-swap seperti setelah builder.
+- Sebelum publish, `--check` query (vektor tersimpan acak) dicari di index lama
+  dan baru; untuk vektor satuan urutan L2 dan kosinus identik.
+- Index lossy (PQ, codec float16/int8) tidak dimigrasi di sini: vektornya hanya
+  aproksimasi. Jalankan builder dengan `FAISS_METRIC` baru — index dibangun
+  ulang dari cache embedding.
+
+Jalankan:
+    uv run python utils/migrate_faiss_metric.py
+    uv run python utils/migrate_faiss_metric.py --metric l2 --check 500
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.rag_doc_store import has_doc_store, read_faiss_index
+from utils.rag_faiss_sync import is_id_mapped
+from utils.rag_index_factory import FAISS_METRIC, METRICS, configure_search, convert_index, index_spec
+from utils.rag_index_store import current_index_dir, current_version, publish_version, staging_dir
+
+
+def rank_agreement(old, new, queries: np.ndarray, k: int) -> float:
+    """Rata-rata overlap top-k label index lama vs baru."""
+    _, old_labels = old.search(queries, k)
+    _, new_labels = new.search(queries, k)
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(old_labels, new_labels)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrasi metrik index FAISS aktif tanpa embed ulang.")
+    parser.add_argument("--index", type=Path, default=BASE_DIR / "mkhuda_faiss_index")
+    parser.add_argument("--metric", default=FAISS_METRIC, choices=list(METRICS))
+    parser.add_argument("--check", type=int, default=200, help="jumlah query pembanding (0 = lewati)")
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+
+    version, path = current_version(args.index), current_index_dir(args.index)
+    if path is None or not has_doc_store(path):
+        sys.exit("❌ Tidak ada versi index berformat kolumnar — jalankan builder dulu.")
+    index = configure_search(read_faiss_index(path, mmap=False))
+    if not is_id_mapped(index):
+        sys.exit("❌ Index belum ber-id per chunk — jalankan builder (rebuild dari cache embedding).")
+    spec = index_spec(index)
+    if spec.metric == args.metric:
+        print(f"✅ Versi {version} sudah memakai metrik {spec.metric} — tidak ada yang diubah.")
+        return
+    if spec.lossy:
+        sys.exit(f"❌ {spec} lossy — jalankan builder dengan FAISS_METRIC={args.metric} (rebuild dari cache).")
+
+    inner = faiss.downcast_index(index.index)
+    sample = inner.reconstruct_n(0, min(inner.ntotal, 10000))
+    norms = np.linalg.norm(sample, axis=1)
+    print(f"📂 Versi {version}: {index.ntotal} vektor {spec}, norma {norms.min():.4f}–{norms.max():.4f}")
+    print(f"🏗️ {spec.metric} → {args.metric} (vektor tersimpan, tanpa embed ulang)…")
+    converted = convert_index(index, spec.index_type, args.metric)
+
+    if args.check and index.ntotal:
+        rows = np.random.default_rng(0).choice(index.ntotal, min(args.check, index.ntotal), replace=False)
+        queries = np.ascontiguousarray(inner.reconstruct_batch(rows.astype("int64")))
+        faiss.normalize_L2(queries)
+        agreement = rank_agreement(index, converted, queries, min(args.k, index.ntotal))
+        print(f"🔍 Overlap top-{min(args.k, index.ntotal)} lama vs baru: {agreement:.3f} ({len(rows)} query)")
+
+    staged = staging_dir(args.index)
+    for item in path.iterdir():
+        if item.name != "index.faiss":
+            shutil.copy2(item, staged / item.name)
+    faiss.write_index(converted, str(staged / "index.faiss"))
+    print(f"✅ Dipublish sebagai versi {publish_version(args.index, staged)} (metrik {args.metric})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+rag_answer_cache.py — Semantic answer cache untuk /ask
+------------------------------------------------------
+- Menyimpan jawaban final beserta embedding pertanyaannya.
+- Pertanyaan baru yang jarak cosine-nya ≤ `max_distance` dari pertanyaan
+  yang sudah di-cache langsung mendapat jawaban tersimpan (tanpa retrieval
+  dan tanpa generation).
+- Setiap entri dicap dengan versi FAISS index; entri dari versi lain tidak
+  pernah dipakai, dan `invalidate()` mengosongkan cache setelah rebuild.
+- Setiap entri juga dicap dengan rentang tanggal hasil `parse_date_filters`
+  (`scope`): "artikel Juli 2024" vs "artikel Juni 2024" berdekatan di ruang
+  embedding tapi beda scope → miss, dan "artikel bulan lalu" yang ditanya lagi
+  setelah ganti bulan tidak mendapat jawaban bulan sebelumnya.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class CachedAnswer:
+    reply: str
+    tokens: int
+    index_version: str
+    expires: float
+    scope: str = ""  # rentang tanggal pertanyaan ("" = tanpa filter tanggal)
+    distance: float = 0.0
+
+
+class SemanticAnswerCache:
+    """Ring buffer berisi embedding pertanyaan (unit-length) + jawaban."""
+
+    def __init__(self, max_distance: float = 0.05, max_entries: int = 1024, ttl_seconds: float = 24 * 3600):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._vectors: np.ndarray | None = None
+        self._answers: list[CachedAnswer | None] = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype="float32").ravel()
+        return v / max(float(np.linalg.norm(v)), 1e-12)
+
+    @staticmethod
+    def scope_of(filters: dict) -> str:
+        """Filter tanggal (`parse_date_filters`) → kunci scope entri; {} → ""."""
+        date_range = filters.get("date") or {}
+        return f"{date_range.get('$gte', '')}..{date_range.get('$lt', '')}" if date_range else ""
+
+    def lookup(self, query_vector, index_version: str, scope: str = "") -> CachedAnswer | None:
+        q = self._unit(query_vector)
+        now = time.time()
+        with self._lock:
+            if self._size and self._vectors is not None and self._vectors.shape[1] == q.shape[0]:
+                sims = self._vectors[: self._size] @ q
+                for i in np.argsort(-sims)[:4]:
+                    entry = self._answers[i]
+                    distance = 1.0 - float(sims[i])
+                    if distance > self.max_distance:
+                        break
+                    if entry and entry.index_version == index_version and entry.scope == scope and entry.expires > now:
+                        self.hits += 1
+                        self.tokens_saved += entry.tokens
+                        entry.distance = distance
+                        return entry
+            self.misses += 1
+            return None
+
+    def store(self, query_vector, reply: str, tokens: int, index_version: str, scope: str = ""):
+        q = self._unit(query_vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != q.shape[0]:
+                self._vectors = np.zeros((self.max_entries, q.shape[0]), dtype="float32")
+                self._size = self._next = 0
+            self._vectors[self._next] = q
+            self._answers[self._next] = CachedAnswer(reply, tokens, index_version, time.time() + self.ttl_seconds, scope=scope)
+            self._next = (self._next + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def invalidate(self):
+        with self._lock:
+            self._size = self._next = 0
+            self._answers = [None] * self.max_entries
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "tokens_saved": self.tokens_saved,
+        }
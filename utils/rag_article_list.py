@@ -0,0 +1,147 @@
+"""
+rag_article_list.py — Daftar artikel terurut tanggal + jalur cepat "artikel terbaru/terlama"
+-----------------------------------------------------------------------------------------
+Kebaruan bukan sinyal similarity: "artikel terbaru" lewat embedding + LLM
+mengembalikan artikel yang salah dan tetap membayar 2–3 panggilan OpenAI.
+
+- `save_faiss` (utils/rag_doc_store.py) menulis `articles.json` di tiap versi:
+  satu entri per artikel (post_id, title, url, date), terbaru dulu.
+- `parse_listing(query)` mengenali pertanyaan daftar/kebaruan tanpa topik:
+  "artikel terbaru", "5 tulisan terlama", "artikel pertama di mkhuda.com",
+  "artikel bulan Juli 2024", "postingan 3 bulan terakhir", "artikel terbaru 2024".
+  Wajib ada kata benda daftar (artikel/tulisan/post…): "apa yang pertama?"
+  bukan pertanyaan daftar. Kalau masih ada kata topik ("artikel terbaru
+  tentang htmx") → None, pertanyaan lewat retrieval biasa (filter tanggal
+  tetap berlaku, utils/rag_date_filter.py).
+- `ArticleList.render` menjawab langsung dengan format daftar Markdown dari
+  `mkhuda_system_prompt`: `- [judul](url) — tanggal`. Tanpa panggilan OpenAI.
+- `ARTICLE_LIST_SIZE` (5): jumlah artikel bila user tidak menyebut angka;
+  pertanyaan dengan rentang tanggal menampilkan hingga `ARTICLE_LIST_MAX` (20).
+"""
+
+import json
+import os
+import re
+from collections.abc import Iterable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from utils.rag_bm25 import tokenize
+from utils.rag_date_filter import MONTHS, date_key, parse_date_filters
+
+ARTICLE_LIST = "articles.json"
+ARTICLE_LIST_SIZE = int(os.getenv("ARTICLE_LIST_SIZE", "5"))
+ARTICLE_LIST_MAX = int(os.getenv("ARTICLE_LIST_MAX", "20"))
+
+LISTING_NOUNS = frozenset("artikel tulisan postingan posting post konten blog".split())
+NEWEST = frozenset("terbaru terkini terupdate terakhir newest latest recent".split())
+OLDEST = frozenset("terlama pertama oldest earliest".split())
+# kata yang boleh ada di pertanyaan daftar tanpa menjadikannya pertanyaan bertopik
+FILLER = frozenset("""
+    daftar list tampilkan tunjukkan tunjukin kasih kasi berikan beri lihat liat cari carikan sebutkan
+    mkhuda mkhudacom com web situs website ini dong deh nih kak min admin tolong please show me give
+    top paling baru lama terbit diterbitkan dipublish publish rilis ditulis apa aja saja
+    hari minggu pekan bulan tahun lalu kemarin belakangan sejak mulai sesudah sebelum
+""".split()) | frozenset(MONTHS)
+COUNT_RE = re.compile(r"\b(?:top )?(\d{1,2}) (?:artikel|tulisan|postingan|posting|post)\b")
+
+
+class Listing(NamedTuple):
+    oldest: bool  # True → terlama dulu
+    count: int
+    filters: dict  # {"date": {"$gte", "$lt"}} dari parse_date_filters, atau {}
+
+
+def parse_listing(query: str, today: date | None = None) -> Listing | None:
+    """Pertanyaan daftar/kebaruan tanpa topik → Listing; selain itu None."""
+    text = re.sub(r"\s+", " ", (query or "").casefold())
+    words = set(tokenize(text))
+    if not words & LISTING_NOUNS:
+        return None
+    # tanpa kata topik, tahun polos ("artikel terbaru 2024") pasti maksudnya tanggal
+    filters = parse_date_filters(text, today, bare_year=True)
+    oldest = bool(words & OLDEST) or "paling lama" in text or "paling awal" in text
+    newest = bool(words & NEWEST) or "paling baru" in text
+    if not (oldest or newest or filters):
+        return None
+    topic = words - LISTING_NOUNS - NEWEST - OLDEST - FILLER
+    if any(not word.isdigit() for word in topic):
+        return None
+    m = COUNT_RE.search(text)
+    count = int(m[1]) if m else (ARTICLE_LIST_MAX if filters else ARTICLE_LIST_SIZE)
+    return Listing(oldest=oldest and not newest, count=max(1, min(count, ARTICLE_LIST_MAX)), filters=filters)
+
+
+def write_article_list(path: Path, docs: Iterable) -> int:
+    """Tulis daftar artikel (satu entri per post_id, terbaru dulu) dari chunk; kembalikan jumlah artikel."""
+    articles = {}
+    for doc in docs:
+        meta = doc.metadata
+        key = meta.get("post_id", meta.get("url"))
+        if key is None or key in articles:
+            continue
+        articles[key] = {
+            "post_id": meta.get("post_id"), "title": meta.get("title") or "(tanpa judul)",
+            "url": meta.get("url") or "", "date": meta.get("date") or "",
+        }
+    ordered = sorted(articles.values(), key=lambda a: (date_key(a["date"]) or 0, a["post_id"] or 0), reverse=True)
+    (Path(path) / ARTICLE_LIST).write_text(json.dumps(ordered, ensure_ascii=False), encoding="utf-8")
+    return len(ordered)
+
+
+def has_article_list(path: Path) -> bool:
+    return (Path(path) / ARTICLE_LIST).exists()
+
+
+def _range_label(filters: dict) -> str:
+    date_range = filters.get("date") or {}
+    gte, lt = date_range.get("$gte"), date_range.get("$lt")
+    if lt:
+        last = (date.fromisoformat(lt[:10]) - timedelta(days=1)).isoformat()
+        return f"tanggal {gte[:10]} s.d. {last}" if gte else f"sebelum {lt[:10]}"
+    return f"sejak {gte[:10]}" if gte else ""
+
+
+class ArticleList:
+    """Artikel satu versi index, terurut tanggal (terbaru dulu)."""
+
+    def __init__(self, path: Path):
+        self.articles = json.loads((Path(path) / ARTICLE_LIST).read_text(encoding="utf-8"))
+
+    @classmethod
+    def open(cls, path: Path) -> "ArticleList | None":
+        """Daftar artikel versi `path`, atau None bila versi itu dibangun sebelum ada articles.json."""
+        return cls(path) if has_article_list(path) else None
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def select(self, listing: Listing) -> list[dict]:
+        """Semua artikel yang cocok dengan filter tanggal, urut sesuai permintaan."""
+        articles = self.articles
+        date_range = listing.filters.get("date")
+        if date_range:
+            gte, lt = date_key(date_range.get("$gte")), date_key(date_range.get("$lt"))
+            articles = [
+                a for a in articles
+                if (key := date_key(a["date"])) is not None and (gte is None or key >= gte) and (lt is None or key < lt)
+            ]
+        if listing.oldest:  # artikel tanpa tanggal ada di ujung daftar; jangan jadi "terlama"
+            return [a for a in reversed(articles) if a["date"]]
+        return articles
+
+    def render(self, listing: Listing) -> str:
+        """Jawaban Markdown siap kirim (format daftar `mkhuda_system_prompt`)."""
+        matches = self.select(listing)
+        label = _range_label(listing.filters)
+        scope = f" {label}" if label else ""
+        if not matches:
+            return f"Belum ada artikel di mkhuda.com{scope}."
+        shown = matches[: listing.count]
+        order = "terlama" if listing.oldest else "terbaru"
+        lines = [f"Berikut {len(shown)} artikel {order} di mkhuda.com{scope}:", ""]
+        lines += [f"- [{a['title']}]({a['url']}) — {a['date'][:10]}" for a in shown]
+        if len(matches) > len(shown):
+            lines += ["", f"…dan {len(matches) - len(shown)} artikel lainnya."]
+        return "\n".join(lines)
@@ -0,0 +1,234 @@
+"""
+rag_bm25.py — Index BM25 lokal (inverted index) di samping index FAISS
+--------------------------------------------------------------------
+Embedding sering "mengaburkan" nama produk/istilah persis (Alpine.js, HTMX,
+veo); BM25 menangkapnya tanpa menaikkan k (= token prompt).
+
+- Tokenizer sadar bahasa Indonesia: NFKC + casefold, stopword ID/EN dibuang,
+  reduplikasi ("artikel-artikel") → satu kata, partikel/posesif `-nya`/`-pun`
+  dilepas ("tutorialnya" → "tutorial", "apapun" → "apa"). Stemming imbuhan
+  sengaja tidak dilakukan: tanpa kamus kata dasar hasilnya lebih sering salah.
+- Nama teknis bersambung titik/strip ("alpine.js", "node-red") menghasilkan
+  bentuk gabungan ("alpinejs") + bagiannya ("alpine", "js"), jadi query
+  "Alpine.js", "alpinejs" dan "alpine js" sama-sama kena.
+- Satu dokumen = satu baris FAISS (chunk) → judul + teks chunk. Ditulis oleh
+  `save_faiss` (utils/rag_doc_store.py) ke tiap direktori versi:
+      bm25.manifest.json        ← jumlah dokumen, parameter k1/b, jumlah term & posting
+      bm25.terms.txt            ← term terurut, satu per baris
+      bm25.term_offsets.i64.bin ← int64[terms + 1], batas posting tiap term
+      bm25.rows.i32.bin         ← int32[posting], baris FAISS
+      bm25.impacts.f16.bin      ← float16[posting], skor BM25 term-dokumen (idf sudah dikali)
+- Skor BM25 per posting dihitung saat build dan posting tiap term diurutkan
+  dari impact terbesar, jadi query mulai dari jumlah impact `BM25_TERM_CAP`
+  posting teratas tiap term query (mmap, tanpa decode). Bila impact posting
+  pertama yang terpotong masih bisa menyalip peringkat ke-k (term frekuensi
+  menengah), semua posting term query dijumlahkan. Hasil top-k sama dengan
+  BM25 penuh; latensi beberapa ms paling lama (lihat README).
+"""
+
+import json
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+BM25_MANIFEST = "bm25.manifest.json"
+BM25_FORMAT = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_TERM_CAP = 2048  # posting teratas (impact terbesar) per term query
+
+TOKEN_RE = re.compile(r"[0-9a-z]+(?:[.\-_+#][0-9a-z]+)*[+#]*")
+STOPWORDS = frozenset("""
+    ada adalah agar akan aku anda apa atau bagaimana bahwa banyak beberapa begitu belum bisa boleh buat
+    dalam dan dari dengan di dia hal harus hingga ini itu jadi jika juga kalau kami kamu kan karena
+    ke kenapa ketika kita lagi lain lebih maka mana masih mau melalui mengapa menjadi mereka misalnya
+    nah namun oleh pada para saat saja sama sangat satu saya se sebagai sebuah secara sedang sehingga
+    sekarang semua seperti serta setelah siapa sini situ sudah supaya tapi telah tentang tersebut tetapi
+    untuk walaupun ya yaitu yang
+    a an and are as at be by for from how i in is it of on or that the this to was what when where
+    which who why will with you
+""".split())
+
+
+def _strip_particles(word: str) -> str:
+    """Lepas partikel/posesif yang aman tanpa kamus: -nya (sisa ≥ 4 huruf), -pun (sisa ≥ 3)."""
+    if word.endswith("nya") and len(word) >= 7:
+        return word[:-3]
+    if word.endswith("pun") and len(word) >= 6:
+        return word[:-3]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for raw in TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").casefold()):
+        parts = [p for p in re.split(r"[.\-_]", raw) if p]
+        if len(parts) > 1 and len(set(parts)) == 1:
+            parts = parts[:1]  # reduplikasi: "artikel-artikel" → "artikel"
+        words = [raw.replace(".", "").replace("-", "").replace("_", "")] if len(parts) > 1 else []
+        words += parts
+        for word in words:
+            word = _strip_particles(word)
+            if len(word) > 1 and word not in STOPWORDS:
+                tokens.append(word)
+    return tokens
+
+
+def document_text(doc) -> str:
+    """Teks yang di-index: judul artikel + isi chunk."""
+    title = doc.metadata.get("title") or ""
+    return f"{title}\n{doc.page_content}" if title else doc.page_content
+
+
+def write_bm25(path: Path, docs: Iterable, k1: float = BM25_K1, b: float = BM25_B) -> int:
+    """Bangun index BM25 dari dokumen (urut baris FAISS) ke direktori `path`; kembalikan jumlah posting."""
+    path = Path(path)
+    vocab: dict[str, int] = {}
+    term_ids, rows, tfs = array("i"), array("i"), array("H")
+    lengths = array("i")
+    for row, doc in enumerate(docs):
+        counts = Counter(tokenize(document_text(doc)))
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            term_ids.append(vocab.setdefault(term, len(vocab)))
+            rows.append(row)
+            tfs.append(min(tf, 65535))
+
+    n = len(lengths)
+    terms = sorted(vocab)
+    rank = np.empty(len(vocab), dtype="int64")
+    rank[[vocab[t] for t in terms]] = np.arange(len(terms))
+    term_of = rank[np.frombuffer(term_ids, dtype="int32")] if term_ids else np.zeros(0, dtype="int64")
+    row_arr = np.frombuffer(rows, dtype="int32") if rows else np.zeros(0, dtype="int32")
+    tf = np.frombuffer(tfs, dtype="uint16").astype("float32") if tfs else np.zeros(0, dtype="float32")
+    dl = np.frombuffer(lengths, dtype="int32").astype("float32") if lengths else np.zeros(0, dtype="float32")
+    avgdl = float(dl.mean()) if n else 0.0
+
+    df = np.bincount(term_of, minlength=len(terms)).astype("float32")
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * dl[row_arr] / max(avgdl, 1e-9))
+    impacts = (idf[term_of] * tf * (k1 + 1) / (tf + norm)).astype("float32")
+    order = np.lexsort((row_arr, -impacts, term_of))  # per term: impact terbesar dulu
+    row_arr, impacts = row_arr[order], impacts[order]
+
+    offsets = np.zeros(len(terms) + 1, dtype="<i8")
+    np.cumsum(df.astype("int64"), out=offsets[1:])
+    (path / "bm25.terms.txt").write_text("\n".join(terms), encoding="utf-8")
+    offsets.tofile(path / "bm25.term_offsets.i64.bin")
+    row_arr.astype("<i4").tofile(path / "bm25.rows.i32.bin")
+    impacts.astype("<f2").tofile(path / "bm25.impacts.f16.bin")
+    manifest = {"format": BM25_FORMAT, "count": n, "avgdl": round(avgdl, 3), "k1": k1, "b": b,
+                "terms": len(terms), "postings": int(len(row_arr))}
+    (path / BM25_MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return int(len(row_arr))
+
+
+def has_bm25(path: Path) -> bool:
+    return (Path(path) / BM25_MANIFEST).exists()
+
+
+def _memmap(path: Path, dtype: str) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class Bm25Index:
+    """Index BM25 read-only di atas file yang di-mmap; hasil = (baris FAISS, skor)."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        manifest = json.loads((path / BM25_MANIFEST).read_text(encoding="utf-8"))
+        if manifest.get("format") != BM25_FORMAT:
+            raise ValueError(f"format BM25 tidak dikenal: {manifest.get('format')}")
+        self.count = manifest["count"]
+        text = (path / "bm25.terms.txt").read_text(encoding="utf-8")
+        self._terms = {term: i for i, term in enumerate(text.split("\n"))} if text else {}
+        self._offsets = _memmap(path / "bm25.term_offsets.i64.bin", "<i8")
+        self._rows = _memmap(path / "bm25.rows.i32.bin", "<i4")
+        self._impacts = _memmap(path / "bm25.impacts.f16.bin", "<f2")
+
+    @classmethod
+    def open(cls, path: Path) -> "Bm25Index | None":
+        """Index BM25 versi `path`, atau None bila versi itu dibangun sebelum ada BM25."""
+        return cls(path) if has_bm25(path) else None
+
+    def search(self, query: str, k: int, term_cap: int = BM25_TERM_CAP,
+               rows: np.ndarray | None = None) -> list[tuple[int, float]]:
+        """
+        Top-k (baris, skor) sama dengan BM25 penuh; `rows` membatasi kandidat (filter tanggal)
+        sebelum posting dipotong. Hanya `term_cap` posting teratas per term yang dijumlahkan;
+        bila skor maksimum yang terpotong (impact posting pertama di luar potongan tiap term)
+        masih bisa menyalip peringkat ke-k, jatuh ke `_search_full`. Skor top-k dilengkapi
+        dari ekor posting.
+        """
+        allowed = None
+        if rows is not None:
+            allowed = np.zeros(self.count, dtype=bool)
+            allowed[rows] = True
+        postings = []
+        for term in set(tokenize(query)):
+            term_id = self._terms.get(term)
+            if term_id is None:
+                continue
+            start, end = int(self._offsets[term_id]), int(self._offsets[term_id + 1])
+            term_rows, term_scores = self._rows[start:end], self._impacts[start:end]
+            if allowed is not None:
+                keep = allowed[term_rows]
+                term_rows, term_scores = term_rows[keep], term_scores[keep]
+            if len(term_rows):
+                postings.append((term_rows, term_scores))
+        if not postings:
+            return []
+
+        cap = max(term_cap, k)
+        hits = [r[:cap] for r, _ in postings]
+        hit_rows, inverse = np.unique(np.concatenate(hits), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate([s[:cap] for _, s in postings]).astype("float32"),
+                             minlength=len(hit_rows))
+        top = _top(totals, k)
+        # skor maksimum posting yang belum terlihat, per term (posting urut impact turun)
+        unseen = np.array([float(s[cap]) if len(s) > cap else 0.0 for _, s in postings])
+        if not unseen.any():
+            return [(int(hit_rows[i]), float(totals[i])) for i in top]
+
+        # batas atas skor kandidat lain = skor parsial + unseen tiap term yang belum memuatnya
+        upper = np.full(len(hit_rows), unseen.sum()) + totals
+        offset = 0
+        for hit, bound in zip(hits, unseen):
+            upper[inverse[offset : offset + len(hit)]] -= bound
+            offset += len(hit)
+        upper[top] = 0.0
+        kth = float(totals[top[-1]]) if len(top) == k else 0.0
+        if len(top) < k or max(unseen.sum(), upper.max()) > kth:
+            return self._search_full(postings, k)
+
+        candidates = np.zeros(self.count, dtype=bool)
+        candidates[hit_rows[top]] = True
+        scores = np.zeros(self.count)
+        for term_rows, term_scores in postings:
+            tail_rows = term_rows[cap:]
+            found = np.flatnonzero(candidates[tail_rows])
+            scores[tail_rows[found]] += term_scores[cap:][found]
+        scores = totals[top] + scores[hit_rows[top]]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(hit_rows[top[i]]), float(scores[i])) for i in order]
+
+    def _search_full(self, postings: list, k: int) -> list[tuple[int, float]]:
+        """Jumlah semua posting (akumulator padat per baris) — jalur bila potongan tidak cukup."""
+        totals = np.zeros(self.count)
+        for term_rows, term_scores in postings:
+            totals += np.bincount(term_rows, weights=term_scores, minlength=self.count)
+        hit_rows = np.flatnonzero(totals)  # impact selalu > 0 (idf BM25 = log1p(...) > 0)
+        totals = totals[hit_rows]
+        return [(int(hit_rows[i]), float(totals[i])) for i in _top(totals, k)]
+
+def _top(totals: np.ndarray, k: int) -> np.ndarray:
+    """Indeks k skor terbesar, urut turun."""
+    top = np.argpartition(-totals, k - 1)[:k] if len(totals) > k else np.arange(len(totals))
+    return top[np.argsort(-totals[top], kind="stable")]
@@ -0,0 +1,86 @@
+"""
+rag_chunking.py — Pecah artikel jadi chunk sebelum embedding + gabungkan hasil retrieval per artikel
+-------------------------------------------------------------------------------------------------
+- Artikel panjang tidak lagi terpotong diam-diam oleh batas token model embedding:
+  tiap artikel dipecah dengan `RecursiveCharacterTextSplitter`
+  (`CHUNK_SIZE`/`CHUNK_OVERLAP` karakter, bisa diatur lewat env).
+- Metadata tiap chunk = metadata artikel + `post_id`, `chunk_index`, `start_index`
+  (offset karakter chunk di teks artikel).
+- Saat retrieval, hit chunk dikelompokkan kembali per artikel dan dipadatkan
+  ke anggaran token prompt oleh `pack_context` (utils/rag_context_pack.py).
+"""
+
+import os
+import re
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "80"))
+CHUNK_FIELDS = ("post_id", "chunk_index", "start_index")
+
+
+def post_id_of(metadata: dict) -> int | None:
+    """post_id dari metadata, atau dari URL `?p=<ID>` untuk index lama."""
+    if metadata.get("post_id") is not None:
+        return int(metadata["post_id"])
+    m = re.search(r"[?&]p=(\d+)", metadata.get("url") or "")
+    return int(m.group(1)) if m else None
+
+
+def article_key(metadata: dict):
+    post_id = post_id_of(metadata)
+    return post_id if post_id is not None else metadata.get("url")
+
+
+def is_chunked(doc: Document) -> bool:
+    return "chunk_index" in doc.metadata
+
+
+def chunk_documents(docs: list[Document], chunk_size: int = CHUNK_SIZE,
+                    chunk_overlap: int = CHUNK_OVERLAP) -> list[Document]:
+    """Pecah artikel menjadi chunk; setiap chunk tahu artikel induk dan offset-nya."""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ". ", " ", ""],
+        keep_separator="end",
+        add_start_index=True,
+    )
+    chunks = []
+    for doc in docs:
+        base = dict(doc.metadata)
+        post_id = post_id_of(base)
+        if post_id is not None:
+            base["post_id"] = post_id
+        for i, chunk in enumerate(splitter.split_documents([Document(page_content=doc.page_content, metadata=base)])):
+            chunk.metadata["chunk_index"] = i
+            chunks.append(chunk)
+    return chunks
+
+
+def overlay_chunk(text: str, start: int, chunk: str) -> str:
+    """Tempel chunk di offset `start`; bagian overlap ditimpa, celah diisi spasi."""
+    if start <= len(text):
+        return text[:start] + chunk if start + len(chunk) > len(text) else text
+    return text + " " * (start - len(text)) + chunk
+
+
+def merge_chunks(docs: list[Document]) -> list[Document]:
+    """Rakit ulang artikel utuh dari chunk-chunknya (untuk backup JSON / incremental)."""
+    groups: dict = {}
+    for doc in docs:
+        groups.setdefault(article_key(doc.metadata), []).append(doc)
+    articles = []
+    for chunks in groups.values():
+        if not is_chunked(chunks[0]):
+            articles.extend(chunks)
+            continue
+        chunks.sort(key=lambda d: d.metadata["chunk_index"])
+        text = ""
+        for chunk in chunks:
+            text = overlay_chunk(text, chunk.metadata.get("start_index", len(text)), chunk.page_content)
+        meta = {k: v for k, v in chunks[0].metadata.items() if k not in CHUNK_FIELDS}
+        articles.append(Document(page_content=text, metadata=meta))
+    return articles
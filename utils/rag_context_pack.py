@@ -0,0 +1,185 @@
+"""
+rag_context_pack.py — Konteks prompt dengan anggaran TOKEN, bukan potongan karakter
+-----------------------------------------------------------------------------------
+Sebelumnya tiap artikel dipotong `[:max_chars]`: passage yang relevan bisa
+terbuang di belakang potongan, sementara teks overlap antar-chunk dan
+kalimat yang tidak nyambung tetap dibayar.
+
+- Chunk hasil retrieval (urut relevansi) dikelompokkan per artikel
+  (`max_articles` artikel teratas), lalu dipecah per kalimat.
+- Skor kalimat = jumlah term query (tokenizer BM25, utils/rag_bm25.py) yang
+  muncul di kalimat + prior peringkat chunk-nya (1 / (1 + peringkat)), jadi
+  tanpa kata yang sama pun kalimat dari chunk teratas tetap didahulukan.
+- Duplikat dibuang sebelum dihitung: chunk satu artikel yang bersinggungan
+  (`start_index`, overlap CHUNK_OVERLAP) digabung dulu jadi passage utuh, lalu
+  kalimat yang teksnya (dinormalisasi) sudah tercakup kalimat lain — chunk
+  tanpa offset, boilerplate antar-artikel — tidak dibayar dua kali.
+- Pemilihan: kalimat terbaik tiap artikel dulu (supaya tiap artikel terwakili),
+  lalu sisa kalimat urut skor selama total ≤ `CONTEXT_TOKEN_BUDGET` (500)
+  token tiktoken model target. Kalimat terpilih disusun lagi sesuai urutan di
+  artikel; yang tidak bersebelahan dipisah "…".
+- Anggaran hanya untuk teks passage; judul/URL/tanggal per artikel di luar itu.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+import tiktoken
+from langchain_core.documents import Document
+
+from utils.rag_bm25 import tokenize
+from utils.rag_chunking import CHUNK_FIELDS, article_key, overlay_chunk
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "500"))
+CONTEXT_MODEL = "gpt-4o-mini"
+
+# akhir kalimat diikuti huruf besar/angka/kutip, atau baris baru (daftar, judul bagian)
+SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+(?=[\"'“(\[A-Z0-9])|\s*\n+\s*")
+GAP = "\n…\n"
+
+
+@lru_cache(maxsize=8)
+def encoding_for(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = CONTEXT_MODEL) -> int:
+    return len(encoding_for(model).encode_ordinary(text))
+
+
+class _Sentence(NamedTuple):
+    article: int
+    passage: int
+    position: int  # urutan kalimat di passage
+    text: str
+    score: float
+    tokens: int
+
+
+class PackStats(NamedTuple):
+    tokens: int
+    sentences: int
+    duplicates: int
+    dropped: int
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w]+", " ", text.casefold()).split())
+
+
+def _passages(hits: list[tuple[int, Document]]) -> list[tuple[str, list[tuple[int, int, int]]]]:
+    """
+    Chunk satu artikel → passage utuh: chunk yang bersinggungan (start_index)
+    digabung sehingga teks overlap hanya muncul sekali. Tiap passage membawa
+    rentang (awal, akhir, peringkat) chunk-chunk penyusunnya.
+    """
+    passages: list[list] = []
+    located = sorted((h for h in hits if h[1].metadata.get("start_index") is not None),
+                     key=lambda h: h[1].metadata["start_index"])
+    for rank, doc in located:
+        start = doc.metadata["start_index"]
+        last = passages[-1] if passages else None
+        if last is not None and start <= last[0] + len(last[1]):
+            offset = start - last[0]
+            last[1] = overlay_chunk(last[1], offset, doc.page_content)
+            last[2].append((offset, offset + len(doc.page_content), rank))
+        else:
+            passages.append([start, doc.page_content, [(0, len(doc.page_content), rank)]])
+    loose = [(doc.page_content, [(0, len(doc.page_content), rank)]) for rank, doc in hits
+             if doc.metadata.get("start_index") is None]
+    return [(text, spans) for _, text, spans in passages] + loose
+
+
+def _split(text: str):
+    """Kalimat + offset-nya di `text`."""
+    offset = 0
+    for piece in SENTENCE_RE.split(text):
+        offset = text.find(piece, offset)
+        yield offset, piece
+        offset += len(piece)
+
+
+def _sentences(chunks: list[Document], query: str, max_articles: int, model: str):
+    """Chunk urut relevansi → (metadata artikel, kalimat unik, jumlah duplikat yang dibuang)."""
+    articles: dict = {}
+    for rank, doc in enumerate(chunks):
+        key = article_key(doc.metadata)
+        if key in articles or len(articles) < max_articles:
+            articles.setdefault(key, []).append((rank, doc))
+
+    terms = set(tokenize(query))
+    enc = encoding_for(model)
+    metas, sentences, seen, duplicates = [], [], [], 0
+    passage_id = 0
+    for article, hits in enumerate(articles.values()):
+        metas.append({k: v for k, v in hits[0][1].metadata.items() if k not in CHUNK_FIELDS})
+        for text, spans in _passages(hits):
+            for position, (offset, piece) in enumerate(_split(text)):
+                norm = _normalize(piece)
+                if not norm:
+                    continue
+                # kalimat yang sama di chunk tanpa start_index / artikel lain (boilerplate)
+                if norm in seen or (len(norm) >= 20 and any(norm in other for other in seen)):
+                    duplicates += 1
+                    continue
+                # peringkat terbaik di antara chunk yang memuat kalimat ini
+                rank = min((r for a, b, r in spans if a < offset + len(piece) and offset < b), default=len(chunks))
+                overlap = len(terms & set(tokenize(piece)))
+                sentences.append(_Sentence(
+                    article, passage_id, position, piece.strip(),
+                    overlap + 1.0 / (1 + rank), len(enc.encode_ordinary(piece)),
+                ))
+                seen.append(norm)
+            passage_id += 1
+    return metas, sentences, duplicates
+
+
+def _fit(text: str, tokens: int, model: str) -> str:
+    """Potong satu kalimat panjang ke `tokens` token pertama."""
+    enc = encoding_for(model)
+    return enc.decode(enc.encode_ordinary(text)[:tokens]).rstrip() + " …"
+
+
+def pack_context(chunks: list[Document], query: str, budget: int = CONTEXT_TOKEN_BUDGET,
+                 max_articles: int = 2, model: str = CONTEXT_MODEL) -> tuple[list[Document], PackStats]:
+    """Chunk urut relevansi → satu Document per artikel berisi kalimat terbaiknya dalam `budget` token."""
+    metas, sentences, duplicates = _sentences(chunks, query, max_articles, model)
+    ranked = sorted(range(len(sentences)), key=lambda i: -sentences[i].score)
+    chosen: dict[int, str] = {}
+    used = 0
+    for article in range(len(metas)):  # kalimat terbaik tiap artikel dulu
+        best = next((i for i in ranked if sentences[i].article == article), None)
+        if best is None or budget - used <= 0:
+            continue
+        sentence = sentences[best]
+        if sentence.tokens <= budget - used:
+            chosen[best], used = sentence.text, used + sentence.tokens
+        elif budget - used >= 16:  # kalimat raksasa (kode, tanpa tanda baca): ambil awalnya
+            chosen[best], used = _fit(sentence.text, budget - used, model), budget
+    for i in ranked:
+        if i not in chosen and sentences[i].tokens <= budget - used:
+            chosen[i], used = sentences[i].text, used + sentences[i].tokens
+
+    docs = []
+    for article, meta in enumerate(metas):
+        picked = sorted((i for i in chosen if sentences[i].article == article),
+                        key=lambda i: (sentences[i].passage, sentences[i].position))
+        if not picked:
+            continue
+        parts, previous = [], None
+        for i in picked:
+            s = sentences[i]
+            adjacent = previous is not None and s.passage == previous.passage and s.position == previous.position + 1
+            if parts and not adjacent:
+                parts.append(GAP)
+            elif parts:
+                parts.append(" ")
+            parts.append(chosen[i])
+            previous = s
+        docs.append(Document(page_content="".join(parts), metadata=meta))
+    return docs, PackStats(used, len(chosen), duplicates, len(sentences) - len(chosen))
@@ -0,0 +1,184 @@
+"""
+rag_date_filter.py — Filter tanggal untuk pertanyaan berbatas waktu (jalur FAISS)
+-------------------------------------------------------------------------------
+- `parse_date_filters(query)` → `{"date": {"$gte": ..., "$lt": ...}}` (bentuk
+  filter yang sama dengan input `chroma_where_from_filters`), diambil dari
+  frasa waktu di pertanyaan dengan regex lokal, tanpa LLM:
+      "bulan lalu", "tahun ini", "minggu lalu", "3 bulan terakhir",
+      "Juli 2024", "bulan juli", "tahun 2023",
+      "sejak Maret 2024" (hanya $gte), "sebelum 2023" (hanya $lt).
+  Batas atas eksklusif; nilai berformat `YYYY-MM-DD HH:MM:SS` seperti metadata `date`.
+- Index tanggal ditulis `save_faiss` (utils/rag_doc_store.py) di tiap versi:
+      dates.keys.i64.bin  ← int64[m], tanggal chunk sebagai YYYYMMDDhhmmss, urut naik
+      dates.rows.i32.bin  ← int32[m], baris FAISS pasangan tiap key
+  Chunk tanpa `date` tidak masuk index. Rentang tanggal → dua `searchsorted`.
+- Baris kandidat dari `DateIndex.rows_for` membatasi pencarian sebelum
+  similarity dihitung (`search_rows`, IDSelector di utils/rag_index_factory.py;
+  BM25 lewat `rows=`), bukan menyaring hasil top-k sesudahnya.
+"""
+
+import re
+from collections.abc import Iterable
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+DATE_KEYS = "dates.keys.i64.bin"
+DATE_ROWS = "dates.rows.i32.bin"
+
+MONTHS_ID = {
+    "januari": 1, "februari": 2, "maret": 3, "april": 4, "mei": 5, "juni": 6,
+    "juli": 7, "agustus": 8, "september": 9, "oktober": 10, "november": 11, "desember": 12,
+}
+MONTHS = MONTHS_ID | {
+    "january": 1, "february": 2, "march": 3, "may": 5, "june": 6, "july": 7, "august": 8,
+    "october": 10, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "agu": 8, "agt": 8, "aug": 8,
+    "sep": 9, "sept": 9, "okt": 10, "oct": 10, "nov": 11, "des": 12, "dec": 12,
+}
+
+
+def _alternation(words: Iterable[str]) -> str:
+    return "|".join(sorted(words, key=len, reverse=True))
+
+
+# bulan tanpa tahun hanya dikenali dengan kata "bulan" atau nama bulan Indonesia lengkap
+# ("may", "mar" sendirian terlalu sering bukan tanggal); tahun tanpa bulan butuh kata pengantar
+PERIOD_RE = re.compile(
+    rf"\b(?:(?P<prefix>sejak|mulai|setelah|sesudah|sebelum) )?(?:"
+    rf"(?P<relative>minggu|pekan|bulan|tahun) (?P<which>ini|lalu|kemarin)"
+    rf"|(?P<last>\d{{1,3}}) (?P<unit>hari|minggu|pekan|bulan|tahun) (?:terakhir|belakangan|lalu)"
+    rf"|(?:bulan )?(?P<month>{_alternation(MONTHS)}) (?P<month_year>(?:19|20)\d\d)"
+    rf"|bulan (?P<month_only>{_alternation(MONTHS)})|(?P<month_id>{_alternation(MONTHS_ID)})"
+    rf"|(?P<year_word>tahun |di |pada |artikel |tulisan |postingan )?(?P<year>(?:19|20)\d\d)"
+    rf")\b"
+)
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.year * 12 + day.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def _month(year: int, month: int) -> tuple[date, date]:
+    start = date(year, month, 1)
+    return start, _add_months(start, 1)
+
+
+def _period(m: re.Match, today: date, bare_year: bool = False) -> tuple[date, date] | None:
+    """Frasa waktu → rentang [awal, akhir)."""
+    if m["relative"]:
+        back = 0 if m["which"] == "ini" else 1
+        if m["relative"] in ("minggu", "pekan"):
+            monday = today - timedelta(days=today.weekday() + 7 * back)
+            return monday, monday + timedelta(days=7)
+        if m["relative"] == "bulan":
+            return _add_months(today, -back), _add_months(today, 1 - back)
+        return date(today.year - back, 1, 1), date(today.year - back + 1, 1, 1)
+    if m["last"]:
+        n, unit = int(m["last"]), m["unit"]
+        if unit == "hari":
+            start = today - timedelta(days=n)
+        elif unit in ("minggu", "pekan"):
+            start = today - timedelta(days=7 * n)
+        else:
+            months = n * (12 if unit == "tahun" else 1)
+            start = _add_months(today, -months).replace(day=min(today.day, 28))
+        return start, today + timedelta(days=1)
+    if m["month"]:
+        return _month(int(m["month_year"]), MONTHS[m["month"]])
+    if m["month_only"] or m["month_id"]:
+        month = MONTHS[m["month_only"] or m["month_id"]]
+        # bulan tanpa tahun = kemunculan terakhirnya yang tidak di masa depan
+        return _month(today.year if month <= today.month else today.year - 1, month)
+    if m["year"] and (m["year_word"] or m["prefix"] or bare_year):
+        year = int(m["year"])
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    return None
+
+
+def parse_date_filters(query: str, today: date | None = None, bare_year: bool = False) -> dict:
+    """
+    Pertanyaan → `{"date": {"$gte", "$lt"}}` dari frasa waktu pertama, atau {} bila tidak ada.
+    `bare_year=True` juga menerima tahun tanpa kata pengantar ("artikel terbaru 2024").
+    """
+    today = today or date.today()
+    text = re.sub(r"\s+", " ", (query or "").casefold())
+    for m in PERIOD_RE.finditer(text):
+        period = _period(m, today, bare_year)
+        if period is None:
+            continue
+        start, end = period
+        if m["prefix"] in ("sejak", "mulai"):
+            end = None
+        elif m["prefix"] in ("setelah", "sesudah"):
+            start, end = end, None
+        elif m["prefix"] == "sebelum":
+            start, end = None, start
+        date_range = {}
+        if start is not None:
+            date_range["$gte"] = f"{start:%Y-%m-%d} 00:00:00"
+        if end is not None:
+            date_range["$lt"] = f"{end:%Y-%m-%d} 00:00:00"
+        return {"date": date_range}
+    return {}
+
+
+def date_key(value) -> int | None:
+    """"2024-07-15 10:30:00" → 20240715103000 (urutan angka = urutan tanggal); None bila bukan tanggal."""
+    digits = re.sub(r"\D", "", str(value or ""))[:14]
+    return int(digits.ljust(14, "0")) if len(digits) >= 8 else None
+
+
+def write_date_index(path: Path, docs: Iterable) -> int:
+    """Tulis index tanggal dokumen (urut baris FAISS) ke direktori `path`; kembalikan jumlah baris bertanggal."""
+    path = Path(path)
+    keys, rows = [], []
+    for row, doc in enumerate(docs):
+        key = date_key(doc.metadata.get("date"))
+        if key is not None:
+            keys.append(key)
+            rows.append(row)
+    keys, rows = np.asarray(keys, dtype="<i8"), np.asarray(rows, dtype="<i4")
+    order = np.argsort(keys, kind="stable")
+    keys[order].tofile(path / DATE_KEYS)
+    rows[order].tofile(path / DATE_ROWS)
+    return len(keys)
+
+
+def has_date_index(path: Path) -> bool:
+    return (Path(path) / DATE_KEYS).exists()
+
+
+def _memmap(path: Path, dtype: str) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class DateIndex:
+    """Tanggal chunk terurut (mmap) → baris FAISS dalam rentang tanggal."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        self.keys = _memmap(path / DATE_KEYS, "<i8")
+        self.rows = _memmap(path / DATE_ROWS, "<i4")
+
+    @classmethod
+    def open(cls, path: Path) -> "DateIndex | None":
+        """Index tanggal versi `path`, atau None bila versi itu dibangun sebelum ada index tanggal."""
+        return cls(path) if has_date_index(path) else None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def rows_between(self, gte: str | None = None, lt: str | None = None) -> np.ndarray:
+        """Baris FAISS dengan gte ≤ date < lt, urut tanggal naik."""
+        start = int(np.searchsorted(self.keys, date_key(gte), side="left")) if gte else 0
+        end = int(np.searchsorted(self.keys, date_key(lt), side="left")) if lt else len(self.keys)
+        return np.asarray(self.rows[start:max(start, end)], dtype="int64")
+
+    def rows_for(self, filters: dict) -> np.ndarray:
+        date_range = filters.get("date") or {}
+        return self.rows_between(date_range.get("$gte"), date_range.get("$lt"))
@@ -0,0 +1,248 @@
+"""
+rag_doc_store.py — Docstore kolumnar + FAISS index yang di-mmap (tanpa pickle)
+-----------------------------------------------------------------------------
+`FAISS.save_local` menulis `index.pkl` (seluruh `InMemoryDocstore` ter-pickle)
+yang harus di-unpickle penuh tiap startup dan butuh
+`allow_dangerous_deserialization=True`. Format ini menggantikannya.
+
+Format di direktori versi index (di samping index.faiss):
+    docs.manifest.json          ← jumlah dokumen + daftar kolom & tipenya
+    docs.<kolom>.bin            ← kolom string: semua nilai (UTF-8) disambung jadi satu blob
+    docs.<kolom>.offsets.bin    ←   int64[n + 1], batas byte tiap baris di blob
+    docs.<kolom>.i64.bin        ← kolom integer: int64[n]
+Kolom `text` berisi page_content; kolom lain adalah metadata (title, url, date, …).
+`save_faiss` juga menulis index kata kunci `bm25.*` (utils/rag_bm25.py), index
+tanggal `dates.*` (utils/rag_date_filter.py) dan daftar artikel `articles.json`
+(utils/rag_article_list.py) dari dokumen yang sama.
+Nilai kosong ("" atau None) tidak disimpan → key-nya tidak muncul di metadata.
+
+- Baris ke-i docstore = baris ke-i FAISS, jadi docstore id cukup `str(i)` dan
+  lookup-nya O(1) tanpa dict id → baris. Untuk `IndexIDMap2` (id = post_id/chunk,
+  lihat rag_faiss_sync.py) label → baris dicari lewat `id_map` yang terurut.
+- Semua file di-mmap; teks & metadata baru di-decode saat `search()` (lazy).
+- `index.faiss` dibaca dengan `IO_FLAG_MMAP_IFC` (read-only, zero-copy) sehingga
+  worker gunicorn berbagi halaman lewat page cache OS.
+"""
+
+import json
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from utils.rag_article_list import write_article_list
+from utils.rag_bm25 import write_bm25
+from utils.rag_date_filter import write_date_index
+from utils.rag_embed_dims import fit_embeddings
+from utils.rag_faiss_sync import faiss_labels, faiss_store, is_id_mapped
+from utils.rag_index_factory import configure_search
+
+MANIFEST_FILE = "docs.manifest.json"
+TEXT_COLUMN = "text"
+FORMAT_VERSION = 1
+INT_NULL = np.iinfo("int64").min  # penanda nilai kosong di kolom integer
+
+
+def has_doc_store(path: Path) -> bool:
+    return (Path(path) / MANIFEST_FILE).exists()
+
+
+def iter_documents(vectorstore: FAISS) -> Iterator[Document]:
+    """Dokumen vectorstore (format apa pun) sesuai urutan baris FAISS."""
+    for label in faiss_labels(vectorstore.index).tolist():
+        yield vectorstore.docstore.search(vectorstore.index_to_docstore_id[label])
+
+
+def _column_type(values: list) -> str:
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return "int64"
+    return "str"
+
+
+def _write_str_column(path: Path, name: str, values: list):
+    offsets = np.zeros(len(values) + 1, dtype="<i8")
+    with open(path / f"docs.{name}.bin", "wb") as f:
+        for i, value in enumerate(values):
+            data = b"" if value is None else str(value).encode("utf-8")
+            f.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+    offsets.tofile(path / f"docs.{name}.offsets.bin")
+
+
+def write_doc_store(path: Path, vectorstore: FAISS):
+    """Tulis docstore vectorstore LangChain dalam format kolumnar, urut sesuai baris FAISS."""
+    path = Path(path)
+    docs = list(iter_documents(vectorstore))
+    keys = list(dict.fromkeys(k for d in docs for k in d.metadata if k != TEXT_COLUMN))
+    columns = {TEXT_COLUMN: "str"}
+    _write_str_column(path, TEXT_COLUMN, [d.page_content for d in docs])
+    for key in keys:
+        values = [d.metadata.get(key) for d in docs]
+        columns[key] = _column_type(values)
+        if columns[key] == "int64":
+            np.array([INT_NULL if v is None else v for v in values], dtype="<i8").tofile(path / f"docs.{key}.i64.bin")
+        else:
+            _write_str_column(path, key, values)
+    manifest = {"format": FORMAT_VERSION, "count": len(docs), "columns": columns}
+    (path / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def save_faiss(path: Path, vectorstore: FAISS):
+    """Pengganti `save_local` tanpa pickle: index.faiss + docstore kolumnar + index BM25, tanggal & daftar artikel."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    faiss.write_index(vectorstore.index, str(path / "index.faiss"))
+    write_doc_store(path, vectorstore)
+    write_bm25(path, iter_documents(vectorstore))
+    write_date_index(path, iter_documents(vectorstore))
+    write_article_list(path, iter_documents(vectorstore))
+
+
+def _memmap(path: Path, dtype: str) -> np.ndarray:
+    # np.memmap menolak file kosong (index tanpa dokumen / kolom kosong semua)
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class _StrColumn:
+    def __init__(self, path: Path, name: str):
+        self.blob = _memmap(path / f"docs.{name}.bin", "u1")
+        self.offsets = _memmap(path / f"docs.{name}.offsets.bin", "<i8")
+
+    def __getitem__(self, row: int) -> str | None:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return self.blob[start:end].tobytes().decode("utf-8") if end > start else None
+
+
+class _IntColumn:
+    def __init__(self, path: Path, name: str):
+        self.values = _memmap(path / f"docs.{name}.i64.bin", "<i8")
+
+    def __getitem__(self, row: int) -> int | None:
+        value = int(self.values[row])
+        return None if value == INT_NULL else value
+
+
+class RowIds(Mapping):
+    """`index_to_docstore_id` identitas (baris i → "i") tanpa menyimpan dict sebesar korpus."""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def __getitem__(self, row: int) -> str:
+        if not 0 <= row < self.count:
+            raise KeyError(row)
+        return str(row)
+
+    def __iter__(self):
+        return iter(range(self.count))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class IdMapRows(Mapping):
+    """`index_to_docstore_id` untuk IndexIDMap2: label → "baris", via binary search di id_map."""
+
+    def __init__(self, labels: np.ndarray):
+        self._order = np.argsort(labels, kind="stable")
+        self._sorted = labels[self._order]
+
+    def __getitem__(self, label: int) -> str:
+        pos = int(np.searchsorted(self._sorted, label))
+        if pos >= len(self._sorted) or self._sorted[pos] != label:
+            raise KeyError(label)
+        return str(int(self._order[pos]))
+
+    def __iter__(self):
+        return iter(self._sorted.tolist())
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+
+class ColumnarDocstore(Docstore):
+    """Docstore read-only di atas kolom-kolom yang di-mmap; id dokumen = nomor baris FAISS."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        manifest = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Format docstore tidak dikenal: {manifest.get('format')}")
+        self.count = int(manifest["count"])
+        self._text = _StrColumn(path, TEXT_COLUMN)
+        self._columns = {
+            name: (_IntColumn(path, name) if kind == "int64" else _StrColumn(path, name))
+            for name, kind in manifest["columns"].items()
+            if name != TEXT_COLUMN
+        }
+
+    def __len__(self) -> int:
+        return self.count
+
+    def document(self, row: int) -> Document:
+        metadata = {}
+        for name, column in self._columns.items():
+            value = column[row]
+            if value is not None:
+                metadata[name] = value
+        return Document(page_content=self._text[row] or "", metadata=metadata)
+
+    def search(self, search: str) -> str | Document:
+        try:
+            row = int(search)
+        except (TypeError, ValueError):
+            row = -1
+        if not 0 <= row < self.count:
+            return f"ID {search} not found."
+        return self.document(row)
+
+    def delete(self, ids: list) -> None:
+        raise NotImplementedError("ColumnarDocstore bersifat read-only")
+
+
+def read_faiss_index(path: Path, mmap: bool = True):
+    """Baca index.faiss; dengan mmap=True vektor tidak disalin ke heap (bila didukung)."""
+    index_file = str(Path(path) / "index.faiss")
+    if mmap:
+        for flags in (faiss.IO_FLAG_MMAP_IFC, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY):
+            try:
+                return faiss.read_index(index_file, flags)
+            except (RuntimeError, AttributeError):
+                continue
+    return faiss.read_index(index_file)
+
+
+def load_faiss(path: Path, embeddings, mmap: bool = True, writable: bool = False) -> FAISS:
+    """
+    Muat vectorstore FAISS dari index.faiss + docstore kolumnar (tanpa pickle).
+    - mmap=True: index & docstore di-mmap read-only (untuk API).
+    - writable=True: index disalin ke heap dan docstore dimaterialisasi ke
+      `InMemoryDocstore` supaya builder bisa `add_documents`.
+    Versi lama tanpa docstore kolumnar di-fallback ke `FAISS.load_local` (pickle).
+    Embedding query dipotong ke dimensi index (`fit_embeddings`, EMBED_DIMENSIONS).
+    """
+    path = Path(path)
+    if not has_doc_store(path):
+        vectorstore = FAISS.load_local(str(path), embeddings, allow_dangerous_deserialization=True)
+        vectorstore.embedding_function = fit_embeddings(embeddings, vectorstore.index.d)
+        return vectorstore
+    docstore = ColumnarDocstore(path)
+    index = configure_search(read_faiss_index(path, mmap=mmap and not writable))
+    embeddings = fit_embeddings(embeddings, index.d)
+    if index.ntotal != docstore.count:
+        raise ValueError(f"index.faiss berisi {index.ntotal} vektor, docstore {docstore.count} dokumen")
+    labels = faiss_labels(index)
+    if writable:
+        # docstore id = label FAISS, supaya upsert/delete per id (rag_faiss_sync.py) konsisten
+        docs = {str(label): docstore.document(row) for row, label in enumerate(labels.tolist())}
+        return faiss_store(embeddings, index, InMemoryDocstore(docs), {label: str(label) for label in labels.tolist()})
+    id_map = IdMapRows(labels) if is_id_mapped(index) else RowIds(docstore.count)
+    return faiss_store(embeddings, index, docstore, id_map)
@@ -0,0 +1,74 @@
+"""
+rag_embed_dims.py — Embedding berdimensi lebih kecil (text-embedding-3-*, parameter `dimensions`)
+----------------------------------------------------------------------------------------------
+Model text-embedding-3-* dilatih secara Matryoshka: parameter `dimensions` di
+API sama dengan memotong vektor penuh ke d dimensi pertama lalu menormalisasi
+ulang. Karena itu pemotongan dilakukan di sini, bukan di request:
+
+- Cache embedding (utils/rag_vector_cache.py) tetap menyimpan vektor penuh →
+  mengganti `EMBED_DIMENSIONS` tidak pernah memanggil OpenAI ulang.
+- `EMBED_DIMENSIONS` (0 = dimensi penuh model) hanya dibaca builder. Sisi query
+  mengikuti index: `load_faiss` membungkus embeddings dengan `fit_embeddings`
+  sesuai `index.d`, jadi API/chat otomatis memakai dimensi yang sama dengan
+  versi index yang sedang dilayani (termasuk setelah hot-swap).
+"""
+
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+MODEL_DIMENSIONS = {"text-embedding-3-small": 1536, "text-embedding-3-large": 3072, "text-embedding-ada-002": 1536}
+SHORTENABLE_MODELS = ("text-embedding-3-small", "text-embedding-3-large")
+EMBED_DIMENSIONS = int(os.getenv("EMBED_DIMENSIONS", "0"))
+
+
+def target_dimensions(model: str, dimensions: int = EMBED_DIMENSIONS) -> int:
+    """Dimensi vektor yang disimpan builder untuk `model`."""
+    full = MODEL_DIMENSIONS[model]
+    if not dimensions or dimensions == full:
+        return full
+    if model not in SHORTENABLE_MODELS or not 0 < dimensions < full:
+        raise ValueError(f"EMBED_DIMENSIONS={dimensions} tidak didukung {model} (maks {full}, hanya text-embedding-3-*)")
+    return dimensions
+
+
+def shorten(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """Potong ke `dimensions` pertama lalu normalisasi ulang (setara `dimensions` di API OpenAI)."""
+    vectors = np.asarray(vectors, dtype="float32")
+    if vectors.ndim != 2 or not dimensions or dimensions == vectors.shape[1]:
+        return vectors
+    if dimensions > vectors.shape[1]:
+        raise ValueError(f"vektor {vectors.shape[1]} dimensi tidak bisa dipakai untuk index {dimensions} dimensi")
+    head = np.ascontiguousarray(vectors[:, :dimensions])
+    return head / np.maximum(np.linalg.norm(head, axis=1, keepdims=True), 1e-12)
+
+
+class ShortenedEmbeddings(Embeddings):
+    """Embeddings LangChain yang keluarannya dipotong ke `dimensions` (cache di `base` tetap vektor penuh)."""
+
+    def __init__(self, base: Embeddings, dimensions: int):
+        self.base = base
+        self.dimensions = dimensions
+        self.model = getattr(base, "model", None)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return shorten(self.base.embed_documents(texts), self.dimensions).tolist()
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return shorten(await self.base.aembed_documents(texts), self.dimensions).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return shorten([self.base.embed_query(text)], self.dimensions)[0].tolist()
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return shorten([await self.base.aembed_query(text)], self.dimensions)[0].tolist()
+
+
+def fit_embeddings(embeddings: Embeddings, dimensions: int) -> Embeddings:
+    """Embeddings untuk index `dimensions` dimensi: apa adanya bila sudah penuh, selain itu dipotong."""
+    if isinstance(embeddings, ShortenedEmbeddings):
+        embeddings = embeddings.base
+    if embeddings is None or MODEL_DIMENSIONS.get(getattr(embeddings, "model", None)) == dimensions:
+        return embeddings
+    return ShortenedEmbeddings(embeddings, dimensions)
@@ -0,0 +1,220 @@
+"""
+rag_embed_pipeline.py — Pipeline embedding paralel & sadar rate-limit untuk builder index
+---------------------------------------------------------------------------------------
+Sebelumnya builder memanggil `add_documents` per 16 (atau 10) dokumen: satu
+round-trip OpenAI + insert FAISS per batch, berurutan → rebuild penuh dibatasi
+latency, bukan throughput.
+
+- Batch dikemas berdasarkan JUMLAH TOKEN (tiktoken), bukan jumlah dokumen
+  (`EMBED_BATCH_TOKENS`, maks 2048 input per request).
+- Beberapa request berjalan bersamaan (`EMBED_CONCURRENCY`) lewat asyncio.
+- Concurrency adaptif (AIMD): respons 429 memotong limit jadi setengah dan
+  menunggu `retry-after`; setiap sukses beruntun menaikkan limit lagi sampai maksimum.
+- Vektor dikumpulkan dulu lalu dimasukkan ke FAISS sekali jalan (`add_to_faiss`).
+- Opsional `cache` (utils/rag_vector_cache.py): teks yang vektornya sudah
+  pernah dihitung tidak dikirim ke OpenAI sama sekali.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+import numpy as np
+import openai
+import tiktoken
+from openai import AsyncOpenAI
+
+EMBED_MODEL = "text-embedding-3-small"
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "100000"))
+EMBED_BATCH_MAX_ITEMS = 2048          # batas input per request OpenAI
+EMBED_MAX_INPUT_TOKENS = 8191         # batas token per input text-embedding-3-*
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+
+
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def prepare_texts(texts: list[str], model: str = EMBED_MODEL) -> tuple[list[str], list[int]]:
+    """Hitung token tiap teks; teks yang melebihi batas model dipotong (bukan ditolak API)."""
+    enc = _encoding(model)
+    prepared, counts = [], []
+    for text in texts:
+        tokens = enc.encode_ordinary(text or " ")
+        if len(tokens) > EMBED_MAX_INPUT_TOKENS:
+            tokens = tokens[:EMBED_MAX_INPUT_TOKENS]
+            text = enc.decode(tokens)
+        prepared.append(text or " ")
+        counts.append(len(tokens))
+    return prepared, counts
+
+
+def pack_batches(token_counts: list[int], max_tokens: int = EMBED_BATCH_TOKENS,
+                 max_items: int = EMBED_BATCH_MAX_ITEMS) -> list[list[int]]:
+    """Kelompokkan indeks teks ke batch yang total tokennya ≤ max_tokens."""
+    batches, current, used = [], [], 0
+    for i, n in enumerate(token_counts):
+        if current and (used + n > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+class AdaptiveLimiter:
+    """Semaphore dengan limit yang turun saat 429 dan naik perlahan saat sukses."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self.resume_at = 0.0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            while True:
+                wait = self.resume_at - time.monotonic()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                await self._cond.wait()
+
+    async def release(self, rate_limited: bool = False, retry_after: float = 0.0):
+        async with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+                self.resume_at = max(self.resume_at, time.monotonic() + retry_after)
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+def _retry_after(err: openai.APIStatusError, attempt: int) -> float:
+    headers = err.response.headers if err.response is not None else {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+async def aembed_texts(
+    texts: list[str],
+    client: AsyncOpenAI | None = None,
+    model: str = EMBED_MODEL,
+    concurrency: int = EMBED_CONCURRENCY,
+    max_batch_tokens: int = EMBED_BATCH_TOKENS,
+    max_retries: int = 8,
+    progress=None,
+    cache=None,
+) -> tuple[np.ndarray, dict]:
+    """
+    Embed semua teks dengan beberapa request paralel. Mengembalikan
+    (vektor float32 urut sesuai input, statistik request/429/retry/cache).
+    `progress(selesai, total)` dipanggil tiap batch selesai.
+    """
+    if cache is not None:
+        found = cache.get_many(texts)
+        missing = [i for i, v in enumerate(found) if v is None]
+        stats = {"requests": 0, "rate_limited": 0, "retries": 0, "batches": 0, "tokens": 0,
+                 "final_concurrency": concurrency}
+        if missing:
+            fresh, stats = await aembed_texts(
+                [texts[i] for i in missing], client=client, model=model, concurrency=concurrency,
+                max_batch_tokens=max_batch_tokens, max_retries=max_retries, progress=progress,
+            )
+            cache.put_many([texts[i] for i in missing], fresh)
+            cache.flush()
+            for i, vec in zip(missing, fresh):
+                found[i] = vec
+        stats["cache_hits"] = len(texts) - len(missing)
+        return (np.vstack(found) if found else np.zeros((0, 0), dtype="float32")), stats
+
+    client = client or AsyncOpenAI(max_retries=0)
+    prepared, counts = prepare_texts(texts, model)
+    batches = pack_batches(counts, max_batch_tokens)
+    limiter = AdaptiveLimiter(concurrency)
+    vectors: list[np.ndarray | None] = [None] * len(texts)
+    stats = {"requests": 0, "rate_limited": 0, "retries": 0, "batches": len(batches), "tokens": sum(counts),
+             "cache_hits": 0}
+    done = 0
+
+    async def run(batch: list[int]):
+        nonlocal done
+        for attempt in range(max_retries + 1):
+            await limiter.acquire()
+            stats["requests"] += 1
+            try:
+                resp = await client.embeddings.create(model=model, input=[prepared[i] for i in batch])
+            except openai.RateLimitError as e:
+                stats["rate_limited"] += 1
+                await limiter.release(rate_limited=True, retry_after=_retry_after(e, attempt))
+            except (openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError):
+                await limiter.release()
+                if attempt == max_retries:
+                    raise
+                await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+            else:
+                await limiter.release()
+                for item in resp.data:
+                    vectors[batch[item.index]] = np.asarray(item.embedding, dtype="float32")
+                done += len(batch)
+                if progress:
+                    progress(done, len(texts))
+                return
+            stats["retries"] += 1
+        raise RuntimeError(f"Embedding batch gagal setelah {max_retries} percobaan (rate limit)")
+
+    await asyncio.gather(*(run(b) for b in batches))
+    stats["final_concurrency"] = limiter.limit
+    return (np.vstack(vectors) if vectors else np.zeros((0, 0), dtype="float32")), stats
+
+
+def embed_texts(texts: list[str], **kwargs) -> tuple[np.ndarray, dict]:
+    """Versi sinkron `aembed_texts` untuk script builder."""
+    return asyncio.run(aembed_texts(texts, **kwargs))
+
+
+def add_to_faiss(vectorstore, docs, vectors: np.ndarray, embeddings):
+    """
+    Masukkan dokumen + vektor yang sudah dihitung ke FAISS dalam satu `index.add`
+    (tanpa konversi ke list Python). `vectorstore=None` → buat vectorstore baru.
+    """
+    import uuid
+
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    if vectorstore is None:
+        vectorstore = FAISS(embeddings, faiss.IndexFlatL2(vectors.shape[1]), InMemoryDocstore(), {})
+    start = vectorstore.index.ntotal
+    ids = [str(uuid.uuid4()) for _ in docs]
+    vectorstore.index.add(vectors)
+    vectorstore.docstore.add(dict(zip(ids, docs)))
+    vectorstore.index_to_docstore_id.update({start + j: doc_id for j, doc_id in enumerate(ids)})
+    return vectorstore
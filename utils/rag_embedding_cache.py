@@ -0,0 +1,223 @@
+"""
+rag_embedding_cache.py — Cache embedding query untuk API mkhuda.com
+-------------------------------------------------------------------
+- Kunci: model + query yang dinormalisasi (NFKC, casefold, spasi dirapikan),
+  jadi "Apa itu HTMX?" dan "apa itu  htmx?" memakai embedding yang sama.
+- Tier 1: LRU in-process, dibatasi jumlah entri DAN total byte, dengan TTL.
+- Tier 2 (opsional): file SQLite (WAL) yang dipakai bersama oleh semua worker
+  gunicorn di container yang sama. I/O SQLite tidak memegang lock LRU, memakai
+  koneksi per thread, dan di jalur async (`aget`/`aput`) berjalan di thread pool.
+- `CachedQueryEmbeddings` membungkus `Embeddings` LangChain sehingga FAISS
+  vectorstore otomatis memakai cache untuk `embed_query`/`aembed_query`.
+"""
+
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_query(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class QueryEmbeddingCache:
+    """Cache dua tier (LRU memori + SQLite bersama) untuk vektor float32."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        shared_path: str | Path | None = None,
+        shared_max_entries: int = 50_000,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.shared_max_entries = shared_max_entries
+        self._lru: OrderedDict[str, tuple[np.ndarray, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits_memory = 0
+        self.hits_shared = 0
+        self.misses = 0
+
+        self._shared_path = str(shared_path) if shared_path else None
+        self._local = threading.local()  # satu koneksi SQLite per thread (event loop / thread pool)
+        if self._shared_path:
+            Path(shared_path).parent.mkdir(parents=True, exist_ok=True)
+            db = self._conn()
+            db.execute("PRAGMA journal_mode=WAL")  # persisten di file, cukup sekali
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings "
+                "(key TEXT PRIMARY KEY, vec BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+            db.commit()
+
+    @staticmethod
+    def make_key(model: str, query: str) -> str:
+        return hashlib.sha256(f"{model}\x00{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    # ---------- tier 1: LRU memori (selalu di bawah self._lock) ----------
+    def _lru_put(self, key: str, vec: np.ndarray, expires: float):
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._bytes -= old[0].nbytes
+        self._lru[key] = (vec, expires)
+        self._bytes += vec.nbytes
+        while self._lru and (len(self._lru) > self.max_entries or self._bytes > self.max_bytes):
+            _, (evicted, _) = self._lru.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def _memory_get(self, key: str, now: float) -> np.ndarray | None:
+        with self._lock:
+            item = self._lru.get(key)
+            if item is not None:
+                if item[1] > now:
+                    self._lru.move_to_end(key)
+                    self.hits_memory += 1
+                    return item[0]
+                self._bytes -= item[0].nbytes
+                del self._lru[key]
+            if self._shared_path is None:
+                self.misses += 1
+            return None
+
+    def _memory_put(self, key: str, vector) -> tuple[np.ndarray, float, float]:
+        vec = np.asarray(vector, dtype="float32")
+        now = time.time()
+        expires = now + self.ttl_seconds
+        with self._lock:
+            self._lru_put(key, vec, expires)
+        return vec, expires, now
+
+    # ---------- tier 2: SQLite bersama (I/O di luar self._lock) ----------
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self._shared_path, timeout=1.0)
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _shared_get(self, key: str, now: float) -> tuple[np.ndarray, float] | None:
+        try:
+            row = self._conn().execute(
+                "SELECT vec, expires FROM query_embeddings WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error:
+            return None  # cache bersifat best-effort
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype="float32"), row[1]
+
+    def _shared_lookup(self, key: str, now: float) -> np.ndarray | None:
+        shared = self._shared_get(key, now)
+        with self._lock:
+            if shared is None:
+                self.misses += 1
+                return None
+            self._lru_put(key, *shared)
+            self.hits_shared += 1
+            return shared[0]
+
+    def _shared_put(self, key: str, vec: np.ndarray, expires: float, now: float):
+        with self._lock:
+            self._puts += 1
+            prune = self._puts % 256 == 0
+        try:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, vec, expires) VALUES (?, ?, ?)",
+                (key, vec.tobytes(), expires),
+            )
+            if prune:
+                db.execute("DELETE FROM query_embeddings WHERE expires <= ?", (now,))
+                db.execute(
+                    "DELETE FROM query_embeddings WHERE key IN (SELECT key FROM query_embeddings "
+                    "ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+                    (self.shared_max_entries,),
+                )
+            db.commit()
+        except sqlite3.Error:
+            pass
+
+    # ---------- API publik ----------
+    def get(self, key: str) -> np.ndarray | None:
+        now = time.time()
+        vec = self._memory_get(key, now)
+        if vec is None and self._shared_path is not None:
+            vec = self._shared_lookup(key, now)
+        return vec
+
+    def put(self, key: str, vector) -> np.ndarray:
+        vec, expires, now = self._memory_put(key, vector)
+        if self._shared_path is not None:
+            self._shared_put(key, vec, expires, now)
+        return vec
+
+    # versi async: tier SQLite dijalankan di thread pool supaya WAL checkpoint
+    # yang lambat tidak menahan event loop (dan request lain) di /ask
+    async def aget(self, key: str) -> np.ndarray | None:
+        now = time.time()
+        vec = self._memory_get(key, now)
+        if vec is None and self._shared_path is not None:
+            vec = await asyncio.to_thread(self._shared_lookup, key, now)
+        return vec
+
+    async def aput(self, key: str, vector) -> np.ndarray:
+        vec, expires, now = self._memory_put(key, vector)
+        if self._shared_path is not None:
+            await asyncio.to_thread(self._shared_put, key, vec, expires, now)
+        return vec
+
+    def stats(self) -> dict:
+        lookups = self.hits_memory + self.hits_shared + self.misses
+        return {
+            "entries": len(self._lru),
+            "bytes": self._bytes,
+            "hits_memory": self.hits_memory,
+            "hits_shared": self.hits_shared,
+            "misses": self.misses,
+            "hit_rate": round((self.hits_memory + self.hits_shared) / lookups, 4) if lookups else 0.0,
+            "shared_tier": self._shared_path is not None,
+        }
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Embeddings LangChain yang meng-cache `embed_query`; `embed_documents` diteruskan apa adanya."""
+
+    def __init__(self, base: Embeddings, cache: QueryEmbeddingCache, model: str | None = None):
+        self.base = base
+        self.cache = cache
+        self.model = model or getattr(base, "model", "embeddings")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.base.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.base.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self.cache.make_key(self.model, text)
+        vec = self.cache.get(key)
+        if vec is None:
+            vec = self.cache.put(key, self.base.embed_query(text))
+        return vec.tolist()
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self.cache.make_key(self.model, text)
+        vec = await self.cache.aget(key)
+        if vec is None:
+            vec = await self.cache.aput(key, await self.base.aembed_query(text))
+        return vec.tolist()
@@ -0,0 +1,161 @@
+"""
+rag_faiss_sync.py — Upsert & delete per artikel di FAISS (IndexIDMap2)
+--------------------------------------------------------------------
+Sebelumnya builder hanya menambah artikel yang URL-nya belum ter-index:
+artikel yang diedit tetap memakai vektor lama dan artikel yang di-unpublish
+tidak pernah dihapus.
+
+- Index dibungkus `IndexIDMap2`; id vektor = `(post_id << 16) | chunk_index`,
+  sehingga semua chunk satu artikel bisa dihapus tanpa rebuild.
+- Setiap chunk membawa `post_modified` (wp_posts) dan `content_hash`
+  (SHA-256 judul + teks artikel). Artikel dianggap berubah bila salah satunya beda.
+- `plan_changes` menghasilkan daftar artikel yang perlu di-upsert dan post_id
+  yang harus dihapus; `remove_posts` + `add_chunks` mengeksekusinya (untuk
+  semua tipe index di rag_index_factory.py).
+- Index baru memakai metrik `FAISS_METRIC` (default inner product); vektor
+  dinormalisasi sebelum masuk index IP. `faiss_store` membungkus index dengan
+  `distance_strategy` yang cocok supaya `score_threshold` LangChain membandingkan
+  ke arah yang benar (IP: ≥, L2: ≤).
+- `iter_changed` + `chunk_windows` melakukan hal yang sama secara streaming
+  sehingga builder memproses korpus per jendela chunk, bukan sekaligus.
+"""
+
+import hashlib
+from collections.abc import Iterator
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+
+from utils.rag_chunking import chunk_documents, post_id_of
+from utils.rag_index_factory import FAISS_METRIC, metric_of, remove_labels, resolve_metric, unit_rows
+
+CHUNK_BITS = 16
+MAX_CHUNKS_PER_POST = 1 << CHUNK_BITS
+
+
+def chunk_id(post_id: int, chunk_index: int) -> int:
+    if not 0 <= chunk_index < MAX_CHUNKS_PER_POST:
+        raise ValueError(f"chunk_index {chunk_index} di luar batas untuk post {post_id}")
+    return (int(post_id) << CHUNK_BITS) | int(chunk_index)
+
+
+def post_of_id(label: int) -> int:
+    return int(label) >> CHUNK_BITS
+
+
+def content_hash(title: str | None, text: str) -> str:
+    return hashlib.sha256(f"{title or ''}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def is_id_mapped(index) -> bool:
+    return hasattr(index, "id_map")
+
+
+def faiss_labels(index) -> np.ndarray:
+    """Label tiap baris index: id_map untuk IndexIDMap2, nomor baris untuk index biasa."""
+    if is_id_mapped(index):
+        return faiss.vector_to_array(index.id_map).astype("int64")
+    return np.arange(index.ntotal, dtype="int64")
+
+
+def faiss_store(embeddings, index, docstore, index_to_docstore_id) -> FAISS:
+    """Vectorstore LangChain dengan `distance_strategy` sesuai metrik index."""
+    if metric_of(index) == "ip":
+        strategy = DistanceStrategy.MAX_INNER_PRODUCT
+    else:
+        strategy = DistanceStrategy.EUCLIDEAN_DISTANCE
+    return FAISS(embeddings, index, docstore, index_to_docstore_id, distance_strategy=strategy)
+
+
+def new_id_mapped_store(dim: int, embeddings, metric: str = FAISS_METRIC) -> FAISS:
+    flat = faiss.IndexFlatIP(dim) if resolve_metric(metric) == "ip" else faiss.IndexFlatL2(dim)
+    return faiss_store(embeddings, faiss.IndexIDMap2(flat), InMemoryDocstore(), {})
+
+
+def add_chunks(vectorstore: FAISS | None, chunks: list[Document], vectors: np.ndarray, embeddings) -> FAISS:
+    """Tambahkan chunk (harus punya post_id & chunk_index) dengan id stabil dalam satu insert."""
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    if vectorstore is None:
+        vectorstore = new_id_mapped_store(vectors.shape[1], embeddings)
+    if not len(chunks):
+        return vectorstore
+    if metric_of(vectorstore.index) == "ip":
+        vectors = unit_rows(vectors)
+    labels = np.array(
+        [chunk_id(c.metadata["post_id"], c.metadata["chunk_index"]) for c in chunks], dtype="int64"
+    )
+    vectorstore.index.add_with_ids(vectors, labels)
+    vectorstore.docstore.add({str(label): c for label, c in zip(labels.tolist(), chunks)})
+    vectorstore.index_to_docstore_id.update({label: str(label) for label in labels.tolist()})
+    return vectorstore
+
+
+def remove_posts(vectorstore: FAISS, post_ids) -> int:
+    """Hapus semua chunk milik post_ids dari index + docstore; kembalikan jumlah vektor terhapus."""
+    post_ids = set(post_ids)
+    labels = [label for label in vectorstore.index_to_docstore_id if post_of_id(label) in post_ids]
+    if not labels:
+        return 0
+    # HNSW tidak bisa remove_ids → remove_labels mengembalikan index yang dibangun ulang
+    vectorstore.index, removed = remove_labels(vectorstore.index, labels)
+    vectorstore.docstore.delete([vectorstore.index_to_docstore_id.pop(label) for label in labels])
+    return removed
+
+
+def article_states(docs) -> dict[int, tuple[str | None, str | None]]:
+    """post_id → (post_modified, content_hash) dari chunk yang sudah ter-index."""
+    states = {}
+    for doc in docs:
+        post_id = post_id_of(doc.metadata)
+        if post_id is not None and post_id not in states:
+            states[post_id] = (doc.metadata.get("post_modified"), doc.metadata.get("content_hash"))
+    return states
+
+
+def stamp_articles(docs: list[Document]) -> list[Document]:
+    """Lengkapi metadata artikel dengan post_id dan content_hash sebelum di-chunk."""
+    for doc in docs:
+        post_id = post_id_of(doc.metadata)
+        if post_id is not None:
+            doc.metadata["post_id"] = post_id
+        doc.metadata["content_hash"] = content_hash(doc.metadata.get("title"), doc.page_content)
+    return docs
+
+
+def iter_changed(indexed: dict[int, tuple], articles, seen: set) -> Iterator[Document]:
+    """Versi streaming `plan_changes`: yield artikel baru/berubah, catat post_id yang lewat di `seen`."""
+    for doc in articles:
+        post_id = doc.metadata.get("post_id")
+        seen.add(post_id)
+        if indexed.get(post_id) != (doc.metadata.get("post_modified"), doc.metadata.get("content_hash")):
+            yield doc
+
+
+def plan_changes(indexed: dict[int, tuple], articles: list[Document], authoritative: bool = True):
+    """
+    Bandingkan artikel sumber dengan yang ter-index.
+    Mengembalikan (artikel yang perlu di-upsert, post_id yang chunk lamanya harus
+    dihapus dulu, post_id yang hilang dari sumber).
+    `authoritative=False` (sumber bukan korpus penuh) → tidak ada penghapusan artikel hilang.
+    """
+    seen = set()
+    upsert = list(iter_changed(indexed, articles, seen))
+    stale = {d.metadata.get("post_id") for d in upsert} & set(indexed)
+    deleted = set(indexed) - seen if authoritative else set()
+    return upsert, stale | deleted, deleted
+
+
+def chunk_windows(articles, max_chunks: int) -> Iterator[list[Document]]:
+    """Chunk artikel per jendela ±`max_chunks`; chunk satu artikel tidak pernah terbelah."""
+    window = []
+    for doc in articles:
+        window.extend(chunk_documents([doc]))
+        if len(window) >= max_chunks:
+            yield window
+            window = []
+    if window:
+        yield window
@@ -0,0 +1,155 @@
+"""
+rag_html_clean.py — Pembersih HTML WordPress bersama untuk semua builder
+----------------------------------------------------------------------
+Sebelumnya tiap builder punya `clean_html()` sendiri (regex shortcode +
+`BeautifulSoup(..., "html.parser")`), satu post per satu, di satu core.
+
+- Backend parser tercepat yang terpasang: selectolax (lexbor/modest) → lxml →
+  html.parser (bs4). Paksa lewat `HTML_CLEAN_BACKEND`.
+- Komentar blok Gutenberg (`<!-- wp:... -->`) dibuang sebelum regex shortcode,
+  isi `<script>`/`<style>`/`<noscript>` dibuang (dulu ikut masuk ke teks).
+- Teks node tetap digabung tanpa pemisah seperti implementasi lama, lalu spasi
+  dinormalisasi (deret whitespace ber-newline → satu "\n", spasi/tab/nbsp →
+  satu spasi). Tiap parser memperlakukan whitespace antar-blok berbeda;
+  normalisasi ini membuat semua backend menghasilkan teks yang sama.
+- `clean_stream` membersihkan stream post per batch di `ProcessPoolExecutor`
+  (`HTML_CLEAN_WORKERS`, default jumlah CPU maks 8) dengan jumlah batch
+  in-flight terbatas; stream kecil (incremental) dibersihkan di proses sendiri.
+"""
+
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+SHORTCODE_RE = re.compile(r"\[.*?\]")
+COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+DROP_TAGS = ("script", "style", "noscript")
+NEWLINE_RUN_RE = re.compile(r"\s*\n\s*")
+SPACE_RUN_RE = re.compile(r"[^\S\n]+")
+
+HTML_CLEAN_BACKEND = os.getenv("HTML_CLEAN_BACKEND", "auto")
+HTML_CLEAN_WORKERS = int(os.getenv("HTML_CLEAN_WORKERS", str(min(os.cpu_count() or 1, 8))))
+HTML_CLEAN_BATCH = int(os.getenv("HTML_CLEAN_BATCH", "64"))
+
+
+def _selectolax_text(html: str) -> str:
+    try:
+        from selectolax.lexbor import LexborHTMLParser as Parser
+    except ImportError:
+        from selectolax.parser import HTMLParser as Parser
+    tree = Parser(html)
+    tree.strip_tags(list(DROP_TAGS))
+    return tree.root.text(deep=True, separator="") if tree.root is not None else ""
+
+
+def _lxml_text(html: str) -> str:
+    import lxml.html
+
+    root = lxml.html.fragment_fromstring(html, create_parent="div")
+    for el in list(root.iter(*DROP_TAGS)):
+        el.drop_tree()
+    return root.text_content()
+
+
+def _bs4_text(html: str) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for el in soup(DROP_TAGS):
+        el.decompose()
+    return soup.get_text()
+
+
+_BACKENDS = {"selectolax": _selectolax_text, "lxml": _lxml_text, "html.parser": _bs4_text}
+
+
+def available_backends() -> list[str]:
+    names = []
+    for name, module in (("selectolax", "selectolax"), ("lxml", "lxml.html")):
+        try:
+            __import__(module)
+            names.append(name)
+        except ImportError:
+            pass
+    return names + ["html.parser"]
+
+
+def resolve_backend(name: str = HTML_CLEAN_BACKEND) -> str:
+    if name == "auto":
+        return available_backends()[0]
+    if name not in _BACKENDS:
+        raise ValueError(f"HTML_CLEAN_BACKEND tidak dikenal: {name} (pilihan: auto, {', '.join(_BACKENDS)})")
+    return name
+
+
+_backend = None
+
+
+def clean_html(text: str | None, backend: str | None = None) -> str:
+    """HTML post WordPress → teks polos (tanpa komentar blok, shortcode, script/style)."""
+    global _backend
+    if backend is None:
+        _backend = _backend or resolve_backend()
+        backend = _backend
+    text = COMMENT_RE.sub("", text or "")
+    text = SHORTCODE_RE.sub("", text)
+    if not text.strip():
+        return ""
+    text = _BACKENDS[backend](text)
+    return SPACE_RUN_RE.sub(" ", NEWLINE_RUN_RE.sub("\n", text)).strip()
+
+
+def _clean_batch(texts: list[str], backend: str) -> list[str]:
+    return [clean_html(t, backend) for t in texts]
+
+
+def _pool(workers: int) -> ProcessPoolExecutor | None:
+    """
+    Pool hanya dengan start method `fork`: builder adalah script tanpa guard
+    `__main__`, jadi `spawn`/`forkserver` akan menjalankan ulang builder di tiap worker.
+    """
+    import multiprocessing
+
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+
+
+def clean_stream(
+    items: Iterable,
+    get_html: Callable = lambda item: item,
+    workers: int = HTML_CLEAN_WORKERS,
+    batch_size: int = HTML_CLEAN_BATCH,
+    backend: str | None = None,
+) -> Iterator[tuple]:
+    """
+    Yield (item, teks_bersih) dengan urutan sama seperti input. Batch dikirim ke
+    proses worker, maksimal `2 × workers` batch in-flight supaya stream tetap
+    hemat memori. Bila stream habis sebelum batch pertama penuh, tanpa pool.
+    """
+    backend = backend or resolve_backend()
+    items = iter(items)
+    first = list(islice(items, batch_size))
+    if len(first) < batch_size or (pool := _pool(workers)) is None:
+        for batch in chain([first], iter(lambda: list(islice(items, batch_size)), [])):
+            yield from zip(batch, _clean_batch([get_html(i) for i in batch], backend))
+        return
+
+    with pool:
+        pending: deque = deque()
+
+        def submit(batch):
+            pending.append((batch, pool.submit(_clean_batch, [get_html(i) for i in batch], backend)))
+
+        submit(first)
+        for batch in iter(lambda: list(islice(items, batch_size)), []):
+            submit(batch)
+            if len(pending) >= 2 * workers:
+                done, future = pending.popleft()
+                yield from zip(done, future.result())
+        while pending:
+            done, future = pending.popleft()
+            yield from zip(done, future.result())
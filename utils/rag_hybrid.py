@@ -0,0 +1,117 @@
+"""
+rag_hybrid.py — Retrieval hybrid: FAISS (vektor) + BM25 (kata kunci) digabung dengan RRF
+--------------------------------------------------------------------------------------
+- Kedua daftar diurutkan sendiri-sendiri lalu digabung dengan reciprocal-rank
+  fusion: skor = Σ bobot / (`HYBRID_RRF_K` + peringkat). Skala skor kosinus
+  dan BM25 tidak perlu disetarakan.
+- Chunk BM25 tidak melewati `score_threshold` vektor: justru itu gunanya —
+  nama produk yang "kabur" di embedding tetap bisa masuk.
+- `HYBRID_SEARCH=0` → hanya vektor (juga otomatis bila versi index belum punya
+  file BM25, utils/rag_bm25.py). `HYBRID_BM25_WEIGHT` (1.0) mengatur bobot BM25.
+- Pertanyaan berbatas waktu ("artikel bulan lalu", utils/rag_date_filter.py):
+  FAISS & BM25 sama-sama hanya mencari di baris dalam rentang tanggal
+  (`scoped_search`). `RETRIEVER_MIN_SCORE` tidak dipakai di sini — rentang
+  tanggal sudah jadi syarat relevansinya, dan pertanyaan seperti "artikel
+  Juli 2024" memang tidak mirip isi artikel mana pun.
+- `HybridRetriever` adalah retriever LangChain (chat/Gradio); API memakai
+  `fuse`/`scoped_search` langsung karena vektor query-nya sudah dihitung lebih dulu.
+"""
+
+import os
+from typing import Any
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from utils.rag_date_filter import parse_date_filters
+from utils.rag_index_factory import search_rows
+
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") != "0"
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_BM25_WEIGHT = float(os.getenv("HYBRID_BM25_WEIGHT", "1.0"))
+
+
+def _key(doc: Document):
+    meta = doc.metadata
+    if meta.get("post_id") is not None and meta.get("chunk_index") is not None:
+        return meta["post_id"], meta["chunk_index"]
+    return doc.page_content
+
+
+def rrf_fuse(rankings: list[tuple[list[Document], float]], k: int, rrf_k: int = HYBRID_RRF_K) -> list[Document]:
+    """Gabungkan beberapa daftar dokumen (urut relevansi, bobot) → k dokumen teratas."""
+    scores: dict = {}
+    docs: dict = {}
+    for ranked, weight in rankings:
+        for rank, doc in enumerate(ranked, start=1):
+            key = _key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + weight / (rrf_k + rank)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)[:k]]
+
+
+def bm25_documents(vectorstore, bm25, query: str, k: int, rows: np.ndarray | None = None) -> list[Document]:
+    """Hit BM25 → Document dari docstore kolumnar (id dokumen = baris FAISS)."""
+    return [vectorstore.docstore.search(str(row)) for row, _ in bm25.search(query, k, rows=rows)]
+
+
+def fuse(vectorstore, bm25, query: str, vector_docs: list[Document], k: int,
+         bm25_weight: float = HYBRID_BM25_WEIGHT) -> list[Document]:
+    """Hasil vektor yang sudah diambil + BM25 untuk `query` → k chunk (urut skor RRF)."""
+    if bm25 is None or not HYBRID_SEARCH:
+        return vector_docs[:k]
+    keyword_docs = bm25_documents(vectorstore, bm25, query, k)
+    return rrf_fuse([(vector_docs, 1.0), (keyword_docs, bm25_weight)], k)
+
+
+def scoped_search(vectorstore, bm25, query: str, query_vector, rows: np.ndarray, k: int,
+                  bm25_weight: float = HYBRID_BM25_WEIGHT) -> list[Document]:
+    """Vektor + BM25 hanya di antara baris `rows` (hasil `DateIndex.rows_for`) → k chunk."""
+    if not len(rows):
+        return []
+    _, hits = search_rows(vectorstore.index, np.asarray([query_vector], dtype="float32"), k, rows)
+    vector_docs = [vectorstore.docstore.search(str(row)) for row in hits[0].tolist() if row >= 0]
+    if bm25 is None or not HYBRID_SEARCH:
+        return vector_docs
+    keyword_docs = bm25_documents(vectorstore, bm25, query, k, rows)
+    return rrf_fuse([(vector_docs, 1.0), (keyword_docs, bm25_weight)], k)
+
+
+class HybridRetriever(BaseRetriever):
+    """Retriever LangChain: FAISS (score_threshold) + BM25 digabung RRF; filter tanggal bila `dates` ada."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: Any
+    bm25: Any = None
+    dates: Any = None
+    k: int = 8
+    score_threshold: float | None = None
+
+    def _search_kwargs(self) -> dict:
+        return {"score_threshold": self.score_threshold} if self.score_threshold is not None else {}
+
+    def _date_rows(self, query: str) -> np.ndarray | None:
+        filters = parse_date_filters(query) if self.dates is not None else {}
+        return self.dates.rows_for(filters) if filters else None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        rows = self._date_rows(query)
+        if rows is not None:
+            query_vector = self.vectorstore.embedding_function.embed_query(query)
+            return scoped_search(self.vectorstore, self.bm25, query, query_vector, rows, self.k)
+        vector_docs = self.vectorstore.similarity_search(query, k=self.k, **self._search_kwargs())
+        return fuse(self.vectorstore, self.bm25, query, vector_docs, self.k)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        rows = self._date_rows(query)
+        if rows is not None:
+            query_vector = await self.vectorstore.embedding_function.aembed_query(query)
+            return scoped_search(self.vectorstore, self.bm25, query, query_vector, rows, self.k)
+        vector_docs = await self.vectorstore.asimilarity_search(query, k=self.k, **self._search_kwargs())
+        return fuse(self.vectorstore, self.bm25, query, vector_docs, self.k)
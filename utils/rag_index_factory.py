@@ -0,0 +1,336 @@
+"""
+rag_index_factory.py — Tipe index FAISS yang bisa dipilih (Flat, HNSW, IVF, IVF-PQ, OPQ)
+---------------------------------------------------------------------------------------
+Sebelumnya semua jalur memakai `IndexFlatL2`: scan brute-force float32 yang
+CPU & memorinya tumbuh linear dengan jumlah chunk.
+
+- `FAISS_INDEX_TYPE`: `flat` (default, exact) | `hnsw` | `ivf-flat` | `ivf-pq` |
+  `opq+ivf-pq`. Index tetap dibungkus `IndexIDMap2` (id per chunk,
+  rag_faiss_sync.py); yang diganti hanya index di dalamnya.
+- Index yang butuh training (IVF/PQ/OPQ) dilatih dari vektor yang sudah ada.
+  Korpus yang terlalu kecil (`MIN_VECTORS`) tetap `flat` — di ukuran itu
+  brute-force lebih cepat dan training tidak stabil.
+- Parameter: `FAISS_HNSW_M` (32), `FAISS_HNSW_EF_CONSTRUCTION` (200),
+  `FAISS_IVF_NLIST` (0 = otomatis ±4·√n), `FAISS_PQ_M` (0 = otomatis dim/16,
+  1 byte per sub-vektor). Parameter query: `FAISS_IVF_NPROBE` (16),
+  `FAISS_HNSW_EF_SEARCH` (64) — dipasang ulang setiap index dimuat.
+- Hapus per id: `IndexIDMap2.remove_ids` hanya benar untuk index yang
+  menomori ulang baris (Flat). IVF dihapus langsung di inverted list lalu id
+  barisnya dinomori ulang (tanpa re-encode, jadi kode PQ tidak bergeser);
+  HNSW tidak mendukung hapus → graf dibangun ulang dari vektor tersimpan.
+- Metrik `FAISS_METRIC`: `ip` (default, inner product atas vektor satuan =
+  kosinus, skor di [−1, 1]) | `l2` (jarak L2 kuadrat, perilaku lama). Vektor
+  dinormalisasi sebelum masuk index IP; embedding OpenAI sudah satuan, jadi
+  vektor query dipakai apa adanya.
+- `RETRIEVER_MIN_SCORE` (0.25): kemiripan kosinus minimum chunk yang boleh
+  masuk prompt; `score_threshold` menerjemahkannya ke skor mentah metrik index
+  (index L2 lama pun tetap bisa difilter: L2² = 2 − 2·cos untuk vektor satuan).
+- `FAISS_VECTOR_CODEC`: penyimpanan vektor flat/HNSW/IVF — `float32` (default),
+  `float16` (SQfp16, ½ memori) atau `int8` (SQ8, ¼ memori, rentang per dimensi
+  dilatih dari vektor yang ada). Tipe PQ punya kodenya sendiri (codec None).
+  Spesifikasi lengkap index = `IndexSpec(tipe, metrik, codec)`.
+- `search_rows`: pencarian terbatas pada baris tertentu (filter tanggal,
+  utils/rag_date_filter.py) lewat IDSelector untuk semua tipe di atas.
+"""
+
+import math
+import os
+from typing import NamedTuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "hnsw", "ivf-flat", "ivf-pq", "opq+ivf-pq")
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+FAISS_HNSW_EF_CONSTRUCTION = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "200"))
+FAISS_HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "0"))
+FAISS_IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "0"))
+METRICS = {"l2": faiss.METRIC_L2, "ip": faiss.METRIC_INNER_PRODUCT}
+FAISS_METRIC = os.getenv("FAISS_METRIC", "ip")
+RETRIEVER_MIN_SCORE = float(os.getenv("RETRIEVER_MIN_SCORE", "0.25"))
+VECTOR_CODECS = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8"}
+FAISS_VECTOR_CODEC = os.getenv("FAISS_VECTOR_CODEC", "float32")
+
+# di bawah ini index tetap flat: IVF butuh ±39 titik per centroid, PQ 8-bit 256 centroid per sub-vektor
+MIN_VECTORS = {"flat": 0, "hnsw": 0, "ivf-flat": 1000, "ivf-pq": 10000, "opq+ivf-pq": 10000}
+# vektor reconstruct-nya hanya aproksimasi → pindah tipe harus dari vektor asli (cache embedding)
+LOSSY_TYPES = ("ivf-pq", "opq+ivf-pq")
+LOSSY_CODECS = ("float16", "int8")
+MAX_TRAIN_VECTORS = 256 * 256  # batas sampel k-means faiss untuk codebook PQ 8-bit
+CONVERT_BATCH = 16384
+
+
+def ivf_nlist(n: int) -> int:
+    if FAISS_IVF_NLIST:
+        return FAISS_IVF_NLIST
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def pq_m(dim: int) -> int:
+    m = FAISS_PQ_M or max(1, dim // 16)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def resolve_index_type(index_type: str, n: int) -> str:
+    """Tipe yang benar-benar dibangun untuk n vektor (korpus kecil → flat)."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"FAISS_INDEX_TYPE tidak dikenal: {index_type} (pilihan: {', '.join(INDEX_TYPES)})")
+    return index_type if n >= MIN_VECTORS[index_type] else "flat"
+
+
+def resolve_metric(metric: str) -> str:
+    if metric not in METRICS:
+        raise ValueError(f"FAISS_METRIC tidak dikenal: {metric} (pilihan: {', '.join(METRICS)})")
+    return metric
+
+
+def metric_of(index) -> str:
+    return "ip" if index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2"
+
+
+def unit_rows(vectors: np.ndarray) -> np.ndarray:
+    """Salinan float32 dengan tiap baris dinormalisasi (baris nol tetap nol)."""
+    vectors = np.array(vectors, dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def score_threshold(index, min_similarity: float = RETRIEVER_MIN_SCORE) -> float:
+    """Kemiripan kosinus minimum → `score_threshold` LangChain untuk metrik index."""
+    if metric_of(index) == "ip":
+        return min_similarity
+    return 2.0 - 2.0 * min_similarity
+
+
+def similarity(index, score: float) -> float:
+    """Skor mentah FAISS (IP atau L2²) → kemiripan kosinus, dengan asumsi vektor satuan."""
+    return float(score) if metric_of(index) == "ip" else 1.0 - float(score) / 2.0
+
+
+def resolve_codec(index_type: str, codec: str | None = FAISS_VECTOR_CODEC) -> str | None:
+    """Codec penyimpanan vektor untuk tipe index (None untuk PQ)."""
+    if index_type in LOSSY_TYPES:
+        return None
+    codec = codec or "float32"
+    if codec not in VECTOR_CODECS:
+        raise ValueError(f"FAISS_VECTOR_CODEC tidak dikenal: {codec} (pilihan: {', '.join(VECTOR_CODECS)})")
+    return codec
+
+
+class IndexSpec(NamedTuple):
+    index_type: str
+    metric: str
+    codec: str | None
+
+    def __str__(self) -> str:
+        return "/".join(part for part in self if part)
+
+    @property
+    def lossy(self) -> bool:
+        """Vektor reconstruct-nya aproksimasi → pindah spec harus dari vektor asli (cache embedding)."""
+        return self.index_type in LOSSY_TYPES or self.codec in LOSSY_CODECS
+
+
+def target_spec(n: int) -> IndexSpec:
+    """Spec yang dibangun builder untuk n vektor (FAISS_INDEX_TYPE/FAISS_METRIC/FAISS_VECTOR_CODEC)."""
+    index_type = resolve_index_type(FAISS_INDEX_TYPE, n)
+    return IndexSpec(index_type, resolve_metric(FAISS_METRIC), resolve_codec(index_type))
+
+
+def factory_string(index_type: str, dim: int, n: int, codec: str | None = FAISS_VECTOR_CODEC) -> str:
+    """Deskripsi `faiss.index_factory` untuk tipe + ukuran korpus + codec penyimpanan."""
+    storage = VECTOR_CODECS.get(resolve_codec(index_type, codec))
+    if index_type == "flat":
+        return storage
+    if index_type == "hnsw":
+        return f"HNSW{FAISS_HNSW_M},{storage}"
+    if index_type == "ivf-flat":
+        return f"IVF{ivf_nlist(n)},{storage}"
+    m = pq_m(dim)
+    desc = f"IVF{ivf_nlist(n)},PQ{m}x8np"  # np: tanpa training polysemous (tidak dipakai, ±5× lebih lama)
+    return f"OPQ{m},{desc}" if index_type == "opq+ivf-pq" else desc
+
+
+def _unwrap(index):
+    """IndexIDMap2 → index di dalamnya (sudah di-downcast)."""
+    index = faiss.downcast_index(index)
+    return faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+
+
+def index_type_of(index) -> str:
+    inner = _unwrap(index)
+    opq = isinstance(inner, faiss.IndexPreTransform)
+    core = faiss.downcast_index(inner.index) if opq else inner
+    if isinstance(core, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(core, faiss.IndexIVFPQ):
+        return "opq+ivf-pq" if opq else "ivf-pq"
+    if isinstance(core, faiss.IndexIVF):
+        return "ivf-flat"
+    if isinstance(core, (faiss.IndexFlat, faiss.IndexScalarQuantizer)):
+        return "flat"
+    raise ValueError(f"tipe index FAISS tidak didukung: {type(core).__name__}")
+
+
+def codec_of(index) -> str | None:
+    inner = _unwrap(index)
+    if index_type_of(index) in LOSSY_TYPES:
+        return None
+    if isinstance(inner, faiss.IndexHNSW):
+        inner = faiss.downcast_index(inner.storage)
+    if isinstance(inner, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        return "float16" if inner.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "int8"
+    return "float32"
+
+
+def index_spec(index) -> IndexSpec:
+    return IndexSpec(index_type_of(index), metric_of(index), codec_of(index))
+
+
+def configure_search(index, nprobe: int = FAISS_IVF_NPROBE, ef_search: int = FAISS_HNSW_EF_SEARCH):
+    """Pasang parameter query (tidak ikut tersimpan di index.faiss)."""
+    inner = _unwrap(index)
+    ivf = faiss.try_extract_index_ivf(inner)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    core = faiss.downcast_index(inner.index) if isinstance(inner, faiss.IndexPreTransform) else inner
+    if isinstance(core, faiss.IndexHNSW):
+        core.hnsw.efSearch = ef_search
+    return index
+
+
+def search_rows(index, queries: np.ndarray, k: int, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cari hanya di antara baris `rows` (IDSelector, sebelum skor dihitung) → (skor, baris; -1 = kosong).
+    Baris = posisi di index dalam IndexIDMap2 = baris docstore kolumnar. nprobe/efSearch
+    dinaikkan sebanding selektivitas filter supaya kandidat yang diperiksa tetap ±sama.
+    """
+    inner = _unwrap(index)
+    mask = np.zeros(inner.ntotal, dtype=bool)
+    mask[rows] = True
+    bitmap = np.packbits(mask, bitorder="little")  # IDSelectorBitmap tidak menyalin: harus hidup selama search
+    sel = faiss.IDSelectorBitmap(inner.ntotal, faiss.swig_ptr(bitmap))
+    boost = max(1, inner.ntotal // max(len(rows), 1))
+    opq = isinstance(inner, faiss.IndexPreTransform)
+    core = faiss.downcast_index(inner.index) if opq else inner
+    ivf = faiss.try_extract_index_ivf(core)
+    if ivf is not None:
+        params = faiss.SearchParametersIVF(sel=sel, nprobe=min(ivf.nlist, ivf.nprobe * boost))
+    elif isinstance(core, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=sel, efSearch=min(1024, max(k, core.hnsw.efSearch) * boost))
+    else:
+        params = faiss.SearchParameters(sel=sel)
+    outer = faiss.SearchParametersPreTransform(index_params=params) if opq else params
+    return inner.search(np.ascontiguousarray(queries, dtype="float32"), k, params=outer)
+
+
+def _training_rows(n: int, seed: int = 0) -> np.ndarray | None:
+    """Baris sampel training (None = semua baris)."""
+    if n <= MAX_TRAIN_VECTORS:
+        return None
+    return np.sort(np.random.default_rng(seed).choice(n, MAX_TRAIN_VECTORS, replace=False))
+
+
+def new_inner_index(index_type: str, dim: int, n: int, training, metric: str = FAISS_METRIC,
+                    codec: str | None = FAISS_VECTOR_CODEC):
+    """
+    Index kosong untuk n vektor, sudah dilatih bila tipenya butuh training.
+    `training()` baru dipanggil saat itu → sampel tidak dibuat untuk flat/HNSW float.
+    """
+    index_type = resolve_index_type(index_type, n)
+    inner = faiss.index_factory(dim, factory_string(index_type, dim, n, codec), METRICS[resolve_metric(metric)])
+    core = faiss.downcast_index(inner)
+    if isinstance(core, faiss.IndexHNSW):
+        core.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+    if not inner.is_trained:
+        sample = training()
+        inner.train(unit_rows(sample) if metric == "ip" else np.ascontiguousarray(sample, dtype="float32"))
+    ivf = faiss.try_extract_index_ivf(inner)
+    if ivf is not None:
+        ivf.set_direct_map_type(faiss.DirectMap.Array)  # reconstruct per baris (intent classifier, konversi)
+    return inner
+
+
+def build_index(vectors: np.ndarray, labels: np.ndarray, index_type: str = FAISS_INDEX_TYPE,
+                metric: str = FAISS_METRIC, codec: str | None = FAISS_VECTOR_CODEC):
+    """`IndexIDMap2` bertipe `index_type`, dilatih dari & berisi `vectors` dengan id `labels`."""
+    vectors = unit_rows(vectors) if metric == "ip" else np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    rows = _training_rows(n)
+    inner = new_inner_index(index_type, dim, n, lambda: vectors if rows is None else vectors[rows], metric, codec)
+    index = faiss.IndexIDMap2(inner)
+    index.add_with_ids(vectors, np.asarray(labels, dtype="int64"))
+    return configure_search(index)
+
+
+def convert_index(index, index_type: str = FAISS_INDEX_TYPE, metric: str | None = None, codec: str | None = None):
+    """
+    Bangun ulang IndexIDMap2 ke tipe/metrik/codec lain dari vektor yang ter-reconstruct:
+    hanya sampel training + satu batch `CONVERT_BATCH` yang disalin sekaligus.
+    Urutan baris (dan label) tetap, jadi docstore kolumnar tidak perlu ditulis ulang.
+    metric/codec None = sama dengan index sumber.
+    """
+    metric = resolve_metric(metric or metric_of(index))
+    codec = codec or codec_of(index)
+    inner = _unwrap(index)
+    n, rows = inner.ntotal, _training_rows(inner.ntotal)
+    new_inner = new_inner_index(
+        index_type, index.d, n,
+        lambda: inner.reconstruct_n(0, n) if rows is None else inner.reconstruct_batch(rows),
+        metric, codec,
+    )
+    converted = faiss.IndexIDMap2(new_inner)
+    labels = faiss.vector_to_array(index.id_map)
+    for start in range(0, n, CONVERT_BATCH):
+        count = min(CONVERT_BATCH, n - start)
+        batch = inner.reconstruct_n(start, count)
+        converted.add_with_ids(unit_rows(batch) if metric == "ip" else batch, labels[start : start + count])
+    return configure_search(converted)
+
+
+def _renumber_ivf_ids(ivf, new_row: np.ndarray):
+    """Id baris di inverted list → posisi baru setelah baris lain dihapus."""
+    invlists = ivf.invlists
+    for list_no in range(ivf.nlist):
+        size = invlists.list_size(list_no)
+        if size:
+            ids = faiss.rev_swig_ptr(invlists.get_ids(list_no), size)
+            ids[:] = new_row[ids]
+
+
+def remove_labels(index, labels) -> tuple[object, int]:
+    """
+    Hapus vektor ber-label `labels` dari IndexIDMap2 tipe apa pun.
+    Mengembalikan (index — bisa objek baru untuk HNSW, jumlah vektor terhapus).
+    """
+    labels = np.asarray(labels, dtype="int64")
+    index_type = index_type_of(index)
+    if index_type == "flat":
+        return index, int(index.remove_ids(labels))
+    id_map = faiss.vector_to_array(index.id_map)
+    drop = np.isin(id_map, labels)
+    if not drop.any():
+        return index, 0
+    inner = _unwrap(index)
+    if index_type == "hnsw":
+        keep = ~drop
+        vectors = inner.reconstruct_n(0, inner.ntotal)[keep]
+        rebuilt = faiss.clone_index(inner)
+        rebuilt.reset()
+        new = faiss.IndexIDMap2(rebuilt)
+        new.add_with_ids(vectors, id_map[keep])
+        return configure_search(new), int(drop.sum())
+    ivf = faiss.extract_index_ivf(inner)
+    ivf.set_direct_map_type(faiss.DirectMap.NoMap)
+    removed = inner.remove_ids(faiss.IDSelectorBatch(np.flatnonzero(drop).astype("int64")))
+    _renumber_ivf_ids(ivf, (np.cumsum(~drop) - 1).astype("int64"))
+    ivf.set_direct_map_type(faiss.DirectMap.Array)
+    faiss.copy_array_to_vector(id_map[~drop], index.id_map)
+    index.ntotal = inner.ntotal
+    index.construct_rev_map()
+    return index, int(removed)
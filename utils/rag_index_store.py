@@ -0,0 +1,112 @@
+"""
+rag_index_store.py — Direktori FAISS index berversi + pointer "CURRENT" atomik
+------------------------------------------------------------------------------
+Layout:
+    mkhuda_faiss_index/
+      CURRENT                      ← nama versi aktif (diganti atomik via os.replace)
+      versions/
+        20250101T020000-3f9a/      ← index.faiss + docstore (lihat rag_doc_store.py)
+        20250103T020000-81c2/
+
+- Builder menulis versi baru ke direktori sementara, me-rename-nya ke
+  `versions/<nama>`, lalu baru mengganti CURRENT → pembaca tidak pernah
+  melihat index setengah jadi.
+- API cukup memantau CURRENT dan memuat versi baru di background.
+- Layout lama (index.faiss langsung di root) tetap terbaca sebagai versi "legacy".
+"""
+
+import os
+import secrets
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+LEGACY_VERSION = "legacy"
+
+
+def current_version(root: Path) -> str | None:
+    """Nama versi aktif, "legacy" untuk layout lama, atau None jika belum ada index."""
+    root = Path(root)
+    pointer = root / CURRENT_FILE
+    if pointer.exists():
+        name = pointer.read_text(encoding="utf-8").strip()
+        if name and (root / VERSIONS_DIR / name).is_dir():
+            return name
+    if (root / "index.faiss").exists():
+        return LEGACY_VERSION
+    return None
+
+
+def version_dir(root: Path, version: str) -> Path:
+    root = Path(root)
+    return root if version == LEGACY_VERSION else root / VERSIONS_DIR / version
+
+
+def current_index_dir(root: Path) -> Path | None:
+    version = current_version(root)
+    return version_dir(root, version) if version else None
+
+
+def new_version_name() -> str:
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(2)}"
+
+
+def staging_dir(root: Path) -> Path:
+    """Direktori kerja untuk menulis versi baru (belum terlihat oleh pembaca)."""
+    path = Path(root) / VERSIONS_DIR / f".staging-{new_version_name()}"
+    path.mkdir(parents=True, exist_ok=False)
+    return path
+
+
+def publish_version(root: Path, staged: Path) -> str:
+    """Pindahkan direktori staging menjadi versi resmi lalu ganti CURRENT secara atomik."""
+    root = Path(root)
+    name = new_version_name()
+    final = root / VERSIONS_DIR / name
+    os.rename(staged, final)
+    os.utime(final)  # mtime direktori = waktu publish (dipakai gc_old_versions)
+    tmp_pointer = root / f".{CURRENT_FILE}.{os.getpid()}.tmp"
+    tmp_pointer.write_text(name + "\n", encoding="utf-8")
+    os.replace(tmp_pointer, root / CURRENT_FILE)
+    return name
+
+
+def gc_old_versions(root: Path, grace_seconds: float = 3600, keep: int = 1) -> list[str]:
+    """
+    Hapus versi lama yang bukan CURRENT. `keep` versi sebelumnya selalu disisakan
+    (untuk rollback), dan versi yang pensiun kurang dari `grace_seconds` lalu juga
+    dibiarkan karena request di worker lain mungkin masih memakainya.
+    """
+    root = Path(root)
+    versions = root / VERSIONS_DIR
+    if not versions.is_dir():
+        return []
+    active = current_version(root)
+    now = time.time()
+    removed = []
+    published = []
+    for path in versions.iterdir():
+        if not path.is_dir() or path.name == active:
+            continue
+        if path.name.startswith(".staging-"):
+            # staging yatim dari builder yang crash
+            if now - path.stat().st_mtime > grace_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path.name)
+            continue
+        published.append(path)
+
+    # terbaru dulu; versi ke-i pensiun ketika versi sesudahnya (atau CURRENT) dipublish
+    published.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    pointer = root / CURRENT_FILE
+    retired_at = pointer.stat().st_mtime if pointer.exists() else now
+    for i, path in enumerate(published):
+        published_at = path.stat().st_mtime
+        if i >= keep and now - retired_at > grace_seconds:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path.name)
+        retired_at = published_at
+    return removed
@@ -0,0 +1,134 @@
+"""
+rag_intent_classifier.py — Intent routing lokal (tanpa network) untuk mkhuda.com
+-------------------------------------------------------------------------------
+Pengganti murah untuk `pre_reasoning()` (gpt-4o-mini) pada keputusan biner
+"rag_search" vs "out_of_scope":
+- Embedding query (yang memang dibutuhkan untuk retrieval) dibandingkan dengan
+  centroid korpus yang ter-index + contoh pertanyaan berlabel.
+- Skor = cosine tertinggi ke sisi in-scope − cosine tertinggi ke sisi out-of-scope.
+- |skor| adalah confidence; di bawah threshold → boleh fallback ke LLM router.
+
+Satu klasifikasi hanya berupa satu perkalian matriks kecil (mikrodetik).
+"""
+
+import numpy as np
+
+IN_SCOPE_EXAMPLES = [
+    "Apa itu HTMX?",
+    "Framework ringan apa yang dibahas di mkhuda.com?",
+    "Tips pakai Alpine.js untuk interaksi web?",
+    "Ada artikel tentang PHP modern?",
+    "Bagaimana cara membuat video dengan veo?",
+    "Cara deploy Laravel ke server",
+    "Perbedaan React dan Vue",
+    "Apa itu prompt engineering?",
+    "Artikel terbaru tentang AI",
+    "Tutorial Next.js untuk pemula",
+    "Bagaimana cara optimasi performa website?",
+    "Rekomendasi tools AI untuk developer",
+    "Cara pakai ChatGPT untuk coding",
+    "Artikel bulan Juli 2024",
+    "Apa kelebihan Tailwind CSS?",
+    "Gimana cara bikin REST API?",
+]
+
+OUT_OF_SCOPE_EXAMPLES = [
+    "Bagaimana cuaca hari ini di Jakarta?",
+    "Buatkan puisi cinta untuk pacarku",
+    "Gosip artis terbaru minggu ini",
+    "Kata-kata motivasi untuk pagi hari",
+    "Resep rendang yang enak",
+    "Siapa yang menang pertandingan bola semalam?",
+    "Ramalan zodiak hari ini",
+    "Harga cabai di pasar sekarang berapa?",
+    "Ceritakan lelucon lucu",
+    "Rekomendasi film romantis",
+    "Bagaimana cara menurunkan berat badan?",
+    "Lirik lagu dangdut terbaru",
+]
+
+OUT_OF_SCOPE_MESSAGE = (
+    "Maaf, saya hanya bisa membantu menjawab pertanyaan seputar teknologi, AI, "
+    "dan artikel di mkhuda.com. Coba tanyakan topik seperti HTMX, Laravel, atau AI tools."
+)
+
+
+def _unit_rows(m: np.ndarray) -> np.ndarray:
+    m = np.asarray(m, dtype="float32")
+    if m.ndim == 1:
+        m = m[None, :]
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.maximum(norms, 1e-12)
+
+
+def corpus_centroids(vectors: np.ndarray, n_clusters: int = 16, seed: int = 1234) -> np.ndarray:
+    """Ringkas vektor korpus menjadi beberapa centroid (spherical k-means)."""
+    vectors = _unit_rows(vectors)
+    if len(vectors) <= n_clusters:
+        return vectors
+    import faiss
+
+    km = faiss.Kmeans(vectors.shape[1], n_clusters, niter=20, seed=seed, spherical=True, verbose=False)
+    km.train(vectors)
+    return _unit_rows(km.centroids)
+
+
+class LocalIntentClassifier:
+    """Klasifikasi intent berbasis kemiripan embedding terhadap dua kumpulan prototipe."""
+
+    def __init__(self, labelled_in: np.ndarray, out_of_scope: np.ndarray,
+                 corpus: np.ndarray | None = None, threshold: float = 0.04):
+        self.labelled_in = _unit_rows(labelled_in)
+        self.out_of_scope = _unit_rows(out_of_scope)
+        self.corpus = _unit_rows(corpus) if corpus is not None and len(corpus) else None
+        self.in_scope = self.labelled_in if self.corpus is None else np.vstack([self.labelled_in, self.corpus])
+        self.threshold = threshold
+
+    @staticmethod
+    def _corpus_from_vectorstore(vectorstore, n_clusters: int) -> np.ndarray | None:
+        index = vectorstore.index
+        if hasattr(index, "id_map"):  # IndexIDMap2: rekonstruksi per baris dari index di dalamnya
+            import faiss
+
+            index = faiss.downcast_index(index.index)
+        if not index.ntotal:
+            return None
+        try:
+            return corpus_centroids(index.reconstruct_n(0, index.ntotal), n_clusters)
+        except RuntimeError:
+            return None  # index tidak mendukung reconstruct → cukup contoh berlabel
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, embeddings, threshold: float = 0.04, n_clusters: int = 16):
+        """
+        Bangun classifier dari FAISS vectorstore LangChain:
+        - centroid korpus dari vektor yang sudah ter-index (tanpa network)
+        - contoh berlabel di-embed sekali (satu request embedding saat startup)
+        """
+        labelled_in = np.asarray(embeddings.embed_documents(IN_SCOPE_EXAMPLES), dtype="float32")
+        out_vectors = np.asarray(embeddings.embed_documents(OUT_OF_SCOPE_EXAMPLES), dtype="float32")
+        corpus = cls._corpus_from_vectorstore(vectorstore, n_clusters)
+        return cls(labelled_in, out_vectors, corpus, threshold=threshold)
+
+    def with_vectorstore(self, vectorstore, n_clusters: int = 16) -> "LocalIntentClassifier":
+        """Classifier baru untuk versi index lain; contoh berlabel dipakai ulang (tanpa network)."""
+        corpus = self._corpus_from_vectorstore(vectorstore, n_clusters)
+        return LocalIntentClassifier(self.labelled_in, self.out_of_scope, corpus, threshold=self.threshold)
+
+    def score(self, query_vector) -> float:
+        """Margin cosine: positif → in-scope, negatif → out-of-scope."""
+        q = _unit_rows(query_vector)[0]
+        return float((self.in_scope @ q).max() - (self.out_of_scope @ q).max())
+
+    def classify(self, query_vector) -> tuple[dict, float]:
+        """
+        Mengembalikan (intent, confidence) dengan format intent yang sama
+        seperti `pre_reasoning()`.
+        """
+        margin = self.score(query_vector)
+        if margin >= 0:
+            return {"intent": "rag_search"}, abs(margin)
+        return {"intent": "out_of_scope", "message": OUT_OF_SCOPE_MESSAGE}, abs(margin)
+
+    def is_confident(self, confidence: float) -> bool:
+        return confidence >= self.threshold
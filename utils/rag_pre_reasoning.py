@@ -9,9 +9,12 @@ Tahapan:
      "intent": "rag_search" | "out_of_scope",
      "message": "..."  # opsional saran ke user
    }
+
+Tersedia versi sinkron (`pre_reasoning`) untuk CLI/Gradio dan versi async
+(`apre_reasoning`, pakai AsyncOpenAI) untuk FastAPI supaya event loop tidak ter-blok.
 """
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import os, json
 from dotenv import load_dotenv
 load_dotenv()
@@ -21,15 +24,9 @@ if not api_key:
     raise ValueError("❌ OPENAI_API_KEY tidak ditemukan di .env")
 
 client = OpenAI(api_key=api_key)
+async_client = AsyncOpenAI(api_key=api_key)
 
-def pre_reasoning(user_query: str) -> dict:
-    """
-    Analisis maksud pertanyaan user.
-    - Jika masih relevan dengan artikel mkhuda.com → intent = "rag_search"
-    - Jika di luar topik → intent = "out_of_scope" + message
-    """
-
-    system_prompt = """
+PRE_REASONING_SYSTEM_PROMPT = """
     Kamu adalah asisten untuk situs mkhuda.com.
     Tugasmu: pahami maksud pertanyaan user dan tentukan apakah perlu pencarian artikel (RAG) atau tidak. bisa jadi user menggunakan bahasa gaul atau formal.
 
@@ -45,24 +42,40 @@ def pre_reasoning(user_query: str) -> dict:
     }
     """
 
-    completion = client.chat.completions.create(
+
+def _completion_kwargs(user_query: str) -> dict:
+    return dict(
         model="gpt-4o-mini",
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": PRE_REASONING_SYSTEM_PROMPT},
             {"role": "user", "content": user_query},
         ],
         response_format={"type": "json_object"},
         temperature=0.2,
     )
 
-    usage_metadata = completion.usage
 
+def _parse_intent(completion) -> dict:
     try:
-        result = json.loads(completion.choices[0].message.content)
+        return json.loads(completion.choices[0].message.content)
     except Exception:
-        result = {"intent": "rag_search"}  # fallback aman
+        return {"intent": "rag_search"}  # fallback aman
+
+
+def pre_reasoning(user_query: str) -> dict:
+    """
+    Analisis maksud pertanyaan user.
+    - Jika masih relevan dengan artikel mkhuda.com → intent = "rag_search"
+    - Jika di luar topik → intent = "out_of_scope" + message
+    """
+    completion = client.chat.completions.create(**_completion_kwargs(user_query))
+    return _parse_intent(completion), completion.usage
+
 
-    return result, usage_metadata
+async def apre_reasoning(user_query: str) -> dict:
+    """Versi async dari `pre_reasoning` (non-blocking, untuk FastAPI)."""
+    completion = await async_client.chat.completions.create(**_completion_kwargs(user_query))
+    return _parse_intent(completion), completion.usage
 
 
 # --- Quick test (jalankan file langsung) ---
@@ -71,5 +84,5 @@ if __name__ == "__main__":
         q = input("🧠 Pertanyaan: ")
         if q.lower() in {"exit", "quit"}:
             break
-        res = pre_reasoning(q)
+        res, _ = pre_reasoning(q)
         print(json.dumps(res, indent=2, ensure_ascii=False))
@@ -0,0 +1,199 @@
+"""
+rag_snapshot.py — Snapshot korpus streaming (JSONL terkompresi) untuk builder
+---------------------------------------------------------------------------
+Builder tidak lagi menumpuk seluruh korpus di list hanya untuk `json.dump`:
+dokumen ditulis satu per satu saat lewat di pipeline (`tee`, ke writer apa
+pun yang punya `write(obj)`).
+
+- Snapshot (`SnapshotWriter` / `read_snapshot`), format utama builder FAISS
+  (docs.snap, backup): JSON Lines terkompresi zstd
+  (bila paket `zstandard` ada) atau gzip, diawali header teks lebar tetap
+  (`SNAPSHOT_HEADER_SIZE` byte, tidak terkompresi):
+      MKSNAP1 <codec> <done|open> <jumlah record> <sha256 JSONL mentah>
+  Header ditulis sebagai placeholder lalu ditimpa saat `close()`, jadi
+  jumlah & hash tersedia tanpa membaca ulang isi. Pembaca men-stream record
+  dan memverifikasi jumlah + hash di akhir (`SnapshotError` bila tidak cocok).
+- `JsonArrayWriter`: list JSON biasa, hanya untuk dump debug yang dibaca
+  manusia (docs.json builder LlamaIndex).
+- Keduanya ditulis ke file sementara lalu `os.replace` → file lama tidak
+  pernah setengah tertulis; bila pipeline gagal, file sementara dibuang.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import textwrap
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Protocol
+
+try:
+    import zstandard
+except ImportError:  # opsional: tanpa zstandard → gzip
+    zstandard = None
+
+SNAPSHOT_MAGIC = "MKSNAP1"
+SNAPSHOT_HEADER_SIZE = 128
+SNAPSHOT_CODEC = os.getenv("SNAPSHOT_CODEC", "auto")  # auto | zstd | gzip
+
+
+class SnapshotError(ValueError):
+    """Snapshot tidak lengkap, rusak, atau tidak cocok dengan header-nya."""
+
+
+class RecordWriter(Protocol):
+    """Tujuan `tee`: `SnapshotWriter` atau `JsonArrayWriter`."""
+
+    def write(self, obj) -> None: ...
+
+
+class JsonArrayWriter:
+    """Tulis elemen list JSON satu per satu; `close()` memindahkan file secara atomik."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.count = 0
+        self._f = open(self.tmp_path, "w", encoding="utf-8")
+        self._f.write("[")
+
+    def write(self, obj):
+        item = json.dumps(obj, ensure_ascii=False, indent=2)
+        self._f.write(("," if self.count else "") + "\n" + textwrap.indent(item, "  "))
+        self.count += 1
+
+    def close(self):
+        self._f.write("\n]" if self.count else "]")
+        self._f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._f.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def tee(items: Iterable, writer: RecordWriter, to_json=lambda item: item) -> Iterator:
+    """Teruskan item ke tahap berikutnya sambil menuliskannya ke `writer`."""
+    for item in items:
+        writer.write(to_json(item))
+        yield item
+
+
+def _codec(name: str = SNAPSHOT_CODEC) -> str:
+    if name == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if name == "zstd" and zstandard is None:
+        raise SnapshotError("SNAPSHOT_CODEC=zstd butuh paket `zstandard`")
+    if name not in ("zstd", "gzip"):
+        raise SnapshotError(f"SNAPSHOT_CODEC tidak dikenal: {name}")
+    return name
+
+
+def _header(codec: str, state: str, count: int, digest: str) -> bytes:
+    line = f"{SNAPSHOT_MAGIC} {codec} {state} {count} {digest}"
+    return line.ljust(SNAPSHOT_HEADER_SIZE - 1).encode("ascii") + b"\n"
+
+
+def snapshot_info(path: str | Path) -> dict:
+    """Baca header saja: codec, jumlah record, sha256 (tanpa dekompresi)."""
+    with open(path, "rb") as f:
+        raw = f.read(SNAPSHOT_HEADER_SIZE)
+    parts = raw.decode("ascii", errors="replace").split()
+    if len(raw) != SNAPSHOT_HEADER_SIZE or len(parts) != 5 or parts[0] != SNAPSHOT_MAGIC:
+        raise SnapshotError(f"{path}: bukan snapshot {SNAPSHOT_MAGIC}")
+    if parts[2] != "done":
+        raise SnapshotError(f"{path}: snapshot tidak selesai ditulis")
+    return {"codec": parts[1], "count": int(parts[3]), "sha256": parts[4]}
+
+
+class SnapshotWriter:
+    """Tulis record JSONL terkompresi satu per satu; header diisi saat `close()`."""
+
+    def __init__(self, path: str | Path, codec: str | None = None, level: int = 3):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.codec = _codec(codec or SNAPSHOT_CODEC)
+        self.count = 0
+        self._hash = hashlib.sha256()
+        self._raw = open(self.tmp_path, "wb")
+        self._raw.write(_header(self.codec, "open", 0, "-" * 64))
+        if self.codec == "zstd":
+            self._out = zstandard.ZstdCompressor(level=level).stream_writer(self._raw, closefd=False)
+        else:
+            self._out = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=level, mtime=0)
+
+    def write(self, obj):
+        line = (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        self._hash.update(line)
+        self._out.write(line)
+        self.count += 1
+
+    def close(self):
+        self._out.close()
+        self._raw.seek(0)
+        self._raw.write(_header(self.codec, "done", self.count, self._hash.hexdigest()))
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        try:
+            self._out.close()
+        finally:
+            self._raw.close()
+            self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def read_snapshot(path: str | Path, verify: bool = True) -> Iterator[dict]:
+    """
+    Stream record snapshot. Dengan `verify`, jumlah & sha256 dicek setelah
+    record terakhir → `SnapshotError` sebelum pemanggil menganggap stream selesai.
+    """
+    info = snapshot_info(path)
+    with open(path, "rb") as raw:
+        raw.seek(SNAPSHOT_HEADER_SIZE)
+        if info["codec"] == "zstd":
+            if zstandard is None:
+                raise SnapshotError(f"{path}: snapshot zstd butuh paket `zstandard`")
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = gzip.GzipFile(fileobj=raw, mode="rb")
+        digest, count = hashlib.sha256(), 0
+        errors = (OSError, EOFError, ValueError) + ((zstandard.ZstdError,) if zstandard else ())
+        with stream, io.BufferedReader(stream) as lines:
+            while True:
+                try:
+                    line = lines.readline()
+                    record = json.loads(line) if line else None
+                except errors as e:
+                    raise SnapshotError(f"{path}: rusak setelah {count} record ({e})") from e
+                if not line:
+                    break
+                if verify:
+                    digest.update(line)
+                count += 1
+                yield record
+    if verify and (count != info["count"] or digest.hexdigest() != info["sha256"]):
+        raise SnapshotError(f"{path}: isi tidak cocok dengan header ({count}/{info['count']} record)")
+
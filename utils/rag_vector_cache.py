@@ -0,0 +1,171 @@
+"""
+rag_vector_cache.py — Cache embedding dokumen berbasis content hash (persisten, mmap)
+-----------------------------------------------------------------------------------
+Rebuild "dari NOL" (index rusak, ganti format, chunking ulang) tidak perlu
+lagi meng-embed ulang teks yang vektornya sudah pernah dihitung.
+
+- Kunci: SHA-256 dari (nama model, teks yang dinormalisasi: NFC + spasi dirapikan).
+- Per model file append-only di `EMBED_VECTOR_CACHE_DIR`
+  (default `mkhuda_embedding_cache/`):
+    <model>.f32    ← matriks float32 [n, dim], dibaca lewat np.memmap
+    <model>.keys   ← digest SHA-256 (32 byte) per baris, urut sama dengan .f32
+    <model>.json   ← dimensi vektor
+  Baris baru ditulis ke .f32 dulu baru ke .keys, jadi key selalu punya vektor.
+- Dipakai oleh semua builder (FAISS, Chroma, LlamaIndex) sebelum memanggil OpenAI.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+EMBED_VECTOR_CACHE_DIR = Path(os.getenv("EMBED_VECTOR_CACHE_DIR", BASE_DIR / "mkhuda_embedding_cache"))
+DIGEST_SIZE = 32
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class EmbeddingVectorCache:
+    """Cache vektor dokumen per model; lookup O(1) via dict digest → baris."""
+
+    def __init__(self, model: str, cache_dir: str | Path = EMBED_VECTOR_CACHE_DIR):
+        self.model = model
+        self.dir = Path(cache_dir)
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.vec_path = self.dir / f"{safe}.f32"
+        self.key_path = self.dir / f"{safe}.keys"
+        self.meta_path = self.dir / f"{safe}.json"
+        self.dim: int | None = None
+        self._rows: dict[bytes, int] = {}
+        self._n = 0  # jumlah baris valid di disk
+        self._matrix: np.ndarray | None = None
+        self._pending_keys: list[bytes] = []
+        self._pending_vecs: list[np.ndarray] = []
+        self.hits = 0
+        self.misses = 0
+        self._open()
+
+    def _open(self):
+        if not (self.meta_path.exists() and self.vec_path.exists() and self.key_path.exists()):
+            return
+        self.dim = int(json.loads(self.meta_path.read_text(encoding="utf-8"))["dim"])
+        keys = self.key_path.read_bytes()
+        n_vecs = self.vec_path.stat().st_size // 4 // self.dim
+        n = min(len(keys) // DIGEST_SIZE, n_vecs)  # tulisan terakhir yang terputus diabaikan
+        self._n = n
+        if n == 0:
+            return
+        self._matrix = np.memmap(self.vec_path, dtype="float32", mode="r", shape=(n, self.dim))
+        for row in range(n):
+            self._rows[keys[row * DIGEST_SIZE : (row + 1) * DIGEST_SIZE]] = row
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model}\x00{normalize_text(text)}".encode("utf-8")).digest()
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending_keys)
+
+    def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        pending = {k: i for i, k in enumerate(self._pending_keys)}
+        out = []
+        for text in texts:
+            k = self.key(text)
+            if k in self._rows:
+                out.append(np.array(self._matrix[self._rows[k]]))
+            elif k in pending:
+                out.append(self._pending_vecs[pending[k]])
+            else:
+                out.append(None)
+        found = sum(v is not None for v in out)
+        self.hits += found
+        self.misses += len(out) - found
+        return out
+
+    def put_many(self, texts: list[str], vectors):
+        vectors = np.asarray(vectors, dtype="float32")
+        if len(vectors) and self.dim is None:
+            self.dim = vectors.shape[1]
+        seen = set(self._rows) | set(self._pending_keys)
+        for text, vec in zip(texts, vectors):
+            k = self.key(text)
+            if k not in seen and vec.shape[0] == self.dim:
+                seen.add(k)
+                self._pending_keys.append(k)
+                self._pending_vecs.append(vec)
+
+    def flush(self):
+        """Tulis baris baru ke disk (append) dan buka ulang mmap-nya."""
+        if not self._pending_keys:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if not self.meta_path.exists():
+            self.meta_path.write_text(json.dumps({"model": self.model, "dim": self.dim}), encoding="utf-8")
+        n = self._n
+        # buang ekor yang tidak lengkap dari run sebelumnya supaya baris .f32 dan .keys sejajar
+        for path, row_bytes in ((self.vec_path, self.dim * 4), (self.key_path, DIGEST_SIZE)):
+            if path.exists() and path.stat().st_size != n * row_bytes:
+                with open(path, "r+b") as f:
+                    f.truncate(n * row_bytes)
+        with open(self.vec_path, "ab") as f:
+            np.vstack(self._pending_vecs).astype("<f4").tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.key_path, "ab") as f:
+            f.write(b"".join(self._pending_keys))
+        self._pending_keys, self._pending_vecs = [], []
+        self._rows.clear()
+        self._open()
+
+
+def embed_with_cache(texts: list[str], cache: EmbeddingVectorCache | None, embed_fn) -> tuple[np.ndarray, int]:
+    """
+    Ambil vektor dari cache, panggil `embed_fn(list_teks_miss)` hanya untuk yang
+    belum ada, simpan hasilnya, lalu kembalikan (matriks urut input, jumlah hit).
+    """
+    if cache is None:
+        return np.asarray(embed_fn(texts), dtype="float32"), 0
+    found = cache.get_many(texts)
+    missing = [i for i, v in enumerate(found) if v is None]
+    if missing:
+        fresh = np.asarray(embed_fn([texts[i] for i in missing]), dtype="float32")
+        cache.put_many([texts[i] for i in missing], fresh)
+        cache.flush()
+        for i, vec in zip(missing, fresh):
+            found[i] = vec
+    vectors = np.vstack(found) if found else np.zeros((0, cache.dim or 0), dtype="float32")
+    return vectors, len(texts) - len(missing)
+
+
+def default_vector_cache(model: str) -> EmbeddingVectorCache | None:
+    """Cache default untuk builder; `EMBED_VECTOR_CACHE=0` mematikannya."""
+    if os.getenv("EMBED_VECTOR_CACHE", "1") == "0":
+        return None
+    return EmbeddingVectorCache(model)
+
+
+class CachedDocumentEmbeddings(Embeddings):
+    """
+    Embeddings LangChain yang mengecek cache content-hash untuk `embed_documents`
+    (dipakai builder Chroma). `embed_fn` default-nya `base.embed_documents`.
+    """
+
+    def __init__(self, base: Embeddings, cache: EmbeddingVectorCache | None, embed_fn=None):
+        self.base = base
+        self.cache = cache
+        self.embed_fn = embed_fn or base.embed_documents
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors, _ = embed_with_cache(texts, self.cache, self.embed_fn)
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.base.embed_query(text)
@@ -0,0 +1,155 @@
+"""
+rag_wp_source.py — Ekstraksi post WordPress secara incremental (high-water mark)
+------------------------------------------------------------------------------
+Sebelumnya setiap build menarik SELURUH isi `wp_posts` (termasuk HTML penuh)
+hanya untuk menemukan beberapa post baru.
+
+- High-water mark = `post_modified` terbesar + ID terbesar yang sudah di-index,
+  disimpan bersama metadata index (`sync_state.json` di direktori versi FAISS,
+  `high_water_mark` di mkhuda_chroma_meta.json).
+- Build incremental hanya mengambil baris dengan `post_modified >= mark` atau
+  `ID > mark` (baris di detik yang sama diambil ulang; yang tidak berubah
+  tersaring oleh content hash di rag_faiss_sync.py).
+- Satu query ringan `SELECT ID` (tanpa body) mendeteksi post yang dihapus /
+  di-unpublish, sekaligus post yang baru publish dengan `post_modified` lama
+  (mis. post terjadwal) — isinya diambil lewat `WHERE ID IN (...)`.
+- `iter_posts` men-stream baris lewat cursor unbuffered (`fetchmany`
+  `WP_FETCH_SIZE` baris) sehingga korpus tidak pernah dimuat utuh ke memori.
+- Bekerja dengan koneksi `mysql.connector` maupun `sqlite3` (stand-in untuk uji).
+"""
+
+import json
+import os
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+WP_POST_URL = "https://mkhuda.com/?p="
+POST_COLUMNS = "ID, post_title, post_content, post_date, post_modified"
+PUBLISHED = "post_status = 'publish' AND post_type = 'post'"
+SYNC_STATE_FILE = "sync_state.json"
+ID_BATCH = 1000
+WP_FETCH_SIZE = int(os.getenv("WP_FETCH_SIZE", "500"))
+# consumer (embedding) bisa lambat di tengah stream; jangan sampai MySQL memutus koneksi
+WP_NET_WRITE_TIMEOUT = int(os.getenv("WP_NET_WRITE_TIMEOUT", "3600"))
+
+
+def _placeholder(conn) -> str:
+    return "?" if isinstance(conn, sqlite3.Connection) else "%s"
+
+
+def _stream(conn, query: str, params=(), fetch_size: int = WP_FETCH_SIZE) -> Iterator[dict]:
+    """Baris hasil query sebagai dict, diambil per `fetch_size` dari cursor unbuffered."""
+    is_mysql = not isinstance(conn, sqlite3.Connection)
+    if is_mysql:
+        setup = conn.cursor()
+        setup.execute(f"SET SESSION net_write_timeout = {WP_NET_WRITE_TIMEOUT}")
+        setup.close()
+    cur = conn.cursor(buffered=False) if is_mysql else conn.cursor()
+    exhausted = False
+    try:
+        cur.execute(query, params)
+        names = [c[0] for c in cur.description]
+        while rows := cur.fetchmany(fetch_size):
+            for row in rows:
+                yield dict(zip(names, row))
+        exhausted = True
+    finally:
+        if is_mysql and not exhausted:
+            conn.consume_results()  # stream dihentikan di tengah → buang sisa hasil
+        cur.close()
+
+
+def fetch_published_ids(conn) -> set[int]:
+    """ID semua post publish — hanya kolom ID, tanpa body."""
+    return {int(row["ID"]) for row in _stream(conn, f"SELECT ID FROM wp_posts WHERE {PUBLISHED}")}
+
+
+def iter_posts(conn, since: dict | None = None, ids=None, fetch_size: int = WP_FETCH_SIZE) -> Iterator[dict]:
+    """
+    Stream post publish (kolom POST_COLUMNS): semua, yang melewati high-water
+    mark `since`, atau hanya `ids` tertentu. `post_date`/`post_modified` → str.
+    """
+    ph = _placeholder(conn)
+    base = f"SELECT {POST_COLUMNS} FROM wp_posts WHERE {PUBLISHED}"
+    if ids is not None:
+        ids = sorted(int(i) for i in ids)
+        queries = [
+            (f"{base} AND ID IN ({', '.join([ph] * len(batch))})", batch)
+            for batch in (ids[i : i + ID_BATCH] for i in range(0, len(ids), ID_BATCH))
+        ]
+    elif since:
+        queries = [(
+            f"{base} AND (post_modified >= {ph} OR ID > {ph}) ORDER BY post_modified, ID",
+            (since["post_modified"], since["max_id"]),
+        )]
+    else:
+        queries = [(f"{base} ORDER BY post_date DESC", ())]
+    for query, params in queries:
+        for row in _stream(conn, query, params, fetch_size):
+            row["ID"] = int(row["ID"])
+            row["post_date"] = str(row["post_date"])
+            row["post_modified"] = str(row["post_modified"])
+            yield row
+
+
+def fetch_posts(conn, since: dict | None = None, ids=None) -> list[dict]:
+    """`iter_posts` sebagai list — untuk hasil yang kecil (incremental, per ID)."""
+    return list(iter_posts(conn, since=since, ids=ids))
+
+
+class HighWaterMark:
+    """Akumulator mark yang bisa dipasang di tengah stream baris (`track`)."""
+
+    def __init__(self, previous: dict | None = None):
+        self.value = dict(previous) if previous else None
+
+    def update(self, row: dict):
+        if self.value is None:
+            self.value = {"post_modified": row["post_modified"], "max_id": row["ID"]}
+            return
+        self.value["post_modified"] = max(self.value["post_modified"], row["post_modified"])
+        self.value["max_id"] = max(self.value["max_id"], row["ID"])
+
+    def track(self, rows) -> Iterator[dict]:
+        for row in rows:
+            self.update(row)
+            yield row
+
+
+def high_water_mark(rows, previous: dict | None = None) -> dict | None:
+    """Mark baru = maksimum dari mark lama dan baris yang baru diambil."""
+    mark = HighWaterMark(previous)
+    for row in rows:
+        mark.update(row)
+    return mark.value
+
+
+def fetch_changes(conn, since: dict, indexed_ids) -> tuple[list[dict], set[int]]:
+    """
+    Baris yang perlu di-upsert sejak `since` + post_id yang tidak lagi publish.
+    Post publish yang belum ter-index tapi `post_modified`-nya lama ikut diambil.
+    """
+    indexed_ids = set(indexed_ids)
+    published = fetch_published_ids(conn)
+    rows = fetch_posts(conn, since=since)
+    missing = published - indexed_ids - {row["ID"] for row in rows}
+    if missing:
+        rows += fetch_posts(conn, ids=missing)
+    return rows, indexed_ids - published
+
+
+def read_sync_state(index_dir) -> dict | None:
+    """High-water mark yang tersimpan di direktori index (None → build penuh)."""
+    path = Path(index_dir) / SYNC_STATE_FILE if index_dir else None
+    if not path or not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("high_water_mark")
+    except (OSError, ValueError):
+        return None
+
+
+def write_sync_state(index_dir, mark: dict | None):
+    path = Path(index_dir) / SYNC_STATE_FILE
+    path.write_text(json.dumps({"high_water_mark": mark}, indent=2), encoding="utf-8")